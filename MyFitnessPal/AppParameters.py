@@ -2,6 +2,90 @@ class AppConfig:
     app_sw_version              = "24.24.0"
 
     app_interaction_wait_time   = 15    # seconds
+    app_launch_max_wait         = 15    # seconds, maximum time to wait for the app/diary to load (see 'wait_for_settle')
+
+    diary_read_mode             = "snapshot"    # 'snapshot' - parse a single 'page_source' per scroll position
+                                                # 'webelement' - query each diary entry via the driver (original)
+                                                # Applies to both the diary and the food macro reads
+    diary_scroll_mode           = "fling"       # 'fling' - 'mobile: flingGesture' to the top/bottom of the diary
+                                                # 'swipe' - slow drags, comparing the entries seen (original)
+
+    datastore_backend           = "json"        # 'json' - single '.mem' json file (see '_JSON.py')
+                                                # 'sqlite' - '.mem.db' database (see '_SQLite.py'), any existing '.mem'
+                                                # file is migrated into the database when it is first created
+                                                # 'segmented' - '.mem.d' folder of a json file per section per month,
+                                                # with a manifest (see '_Segmented.py'), migrated from any '.mem' file
+    datastore_segment_cache     = 6             # Number of unchanged month segments held in memory ('segmented')
+    datastore_flush_days        = 7             # Write the json datastore once this many days are waiting to be saved,
+    datastore_flush_seconds     = 120           # or once this long (seconds) has passed since it was last written. Any
+                                                # days waiting are written at the end of each scrape/upon exit. '1' day
+                                                # writes the file after every day (original)
+
+    instrument_scrape           = False         # Time every driver command/wait/pause, and report a summary at the end
+                                                # of 'scrap_diary_from_date' (see 'miAndroid/_Instrumentation.py')
+
+    refresh_days                = 14            # Number of days (up to today) re-checked by 'refresh_recent'
+    jobs_retained               = 10            # Number of finished job journals kept within '.jobs' (see '_Jobs.py'),
+                                                # older finished journals are removed. Unfinished jobs are always kept
+
+    pipeline_persist            = True          # Validate/write each scraped date upon a worker thread, whilst the
+                                                # driver moves onto the next date (see '_Pipeline.py'). 'False' writes
+                                                # each date before moving on (original)
+    pipeline_queue_size         = 4             # Dates waiting to be written, before the driver waits for the worker
+    pipeline_batch_size         = 8             # Maximum number of dates written by a single 'write_datastore'
+
+    # Food macro cache (see '_MacroCache.py'):
+    #-------------------------------------------
+    macro_cache_size                = 4096  # Maximum number of foods retained, least recently used are removed first.
+                                            # '0' disables the cache
+    macro_cache_derive_servings     = False # Allow macros of a cached food to be scaled to a different serving count
+    diary_details_serving_format    = r"^(?:.*, )?(?P<servings>\d+(?:[.,]\d+)?) (?P<units>[^,]+)$"
+                                            # Expected format of the diary entry details:'Quaker, 2 cup'
+    # -------------------------------------------
+
+    # Navigation planner (see '_Navigation.py'):
+    #-------------------------------------------
+    navigation_costs    = {             # Initial cost (seconds) of each primitive, replaced by measurements
+        "day_arrow":    1.0,
+        "calendar":     4.0,
+        "month_arrow":  1.0,
+        "year_picker":  3.0,
+        "year_scroll":  5.0,
+        "text_input":   3.0
+    }
+    navigation_cost_smoothing   = 0.3   # Weight of each new measurement, once a primitive has been measured
+    navigation_years_per_scroll = 12    # Number of years that a single scroll of the year selector moves
+    # -------------------------------------------
+
+    # Screen classifier (see 'AndroidCtrl.classify_screen' for the format of each signature):
+    #-------------------------------------------
+    # Checked in order, so the calendar (a dialog on top of the diary) is before the diary. 'MFP_OTHER' is any other
+    # view within the app (interface ribbon present)
+    view_signatures = [
+        ("CALENDAR_YEARS",  {"resource_ids": ["com.myfitnesspal.android:id/mtrl_calendar_year_selector_frame"],
+                             "data": {"selected_date": "com.myfitnesspal.android:id/mtrl_picker_header_selection_text",
+                                      "pending_month": "com.myfitnesspal.android:id/month_navigation_fragment_toggle"}}),
+        ("CALENDAR_TEXT",   {"resource_ids": ["com.myfitnesspal.android:id/mtrl_picker_text_input_date"],
+                             "data": {"selected_date": "com.myfitnesspal.android:id/mtrl_picker_header_selection_text"}}),
+        ("CALENDAR",        {"resource_ids": ["com.myfitnesspal.android:id/mtrl_calendar_selection_frame"],
+                             "data": {"selected_date": "com.myfitnesspal.android:id/mtrl_picker_header_selection_text",
+                                      "pending_month": "com.myfitnesspal.android:id/month_navigation_fragment_toggle"}}),
+        ("FOOD_DETAIL",     {"resource_ids": [("com.myfitnesspal.android:id/txtFoodName",
+                                               "com.myfitnesspal.android:id/txtTotalCarbs",
+                                               "com.myfitnesspal.android:id/txtSodium",
+                                               "com.myfitnesspal.android:id/txtIron")],
+                             "data": {"name": "com.myfitnesspal.android:id/txtFoodName"}}),
+        ("DIARY",           {"resource_ids": ["com.myfitnesspal.android:id/bottomContainer",
+                                              "com.myfitnesspal.android:id/date_bar"],
+                             "text": {"com.myfitnesspal.android:id/toolbar_container": "Diary"},
+                             "data": {"date": "com.myfitnesspal.android:id/btnDate",
+                                      "goal": "com.myfitnesspal.android:id/goal",
+                                      "calories": "com.myfitnesspal.android:id/food"}}),
+        ("HOME_TAB",        {"resource_ids": ["com.myfitnesspal.android:id/bottomContainer"],
+                             "text": {"layoutDashboardParentColumn": "Today"}}),
+        ("MFP_OTHER",       {"resource_ids": ["com.myfitnesspal.android:id/bottomContainer"]}),
+    ]
+    # -------------------------------------------
 
     # Dates (reference - https://strftime.org/):
     #-------------------------------------------
@@ -9,6 +93,91 @@ class AppConfig:
     calendar_xml_datestamp_format_w_year    = "%a, %b %#d, %Y"  # Expected format of the datestamp:'Fri, Jan 3, 2025'
                                                                 # on Linux change '#' to '-'
     diary_datestamp_format          = "%A, %b %d, %Y"           # Expected format of the datestamp:'Saturday, Jan 4, 2025'
+    calendar_text_input             = True          # Enter the date into the calendar text input (rather than stepping
+                                                    # through the months/years), falls back to stepping if this fails
+    calendar_text_input_format      = "%m/%d/%Y"    # Format of the calendar text input (locale dependent, see the hint
+                                                    # within the field):'01/04/2025'
+    calendar_text_input_max_failures = 3            # Consecutive failures, after which the text input is no longer tried
+    # -------------------------------------------
+
+    # Locators of the MyFitnessPal elements (in addition to 'PhoneConfig.locators'), see 'miAndroid/_Locators.py'.
+    # Those marked as "within" are looked up from a parent element
+    #-------------------------------------------
+    locators = {
+        "app_icon":                 [("-android uiautomator", 'new UiSelector().text("MyFitnessPal")'),
+                                     ("xpath", "//*[@text='MyFitnessPal']")],
+        "interface_ribbon":         [("id", "com.myfitnesspal.android:id/bottomContainer"),
+                                     ("xpath", ".//*[@resource-id='com.myfitnesspal.android:id/bottomContainer']")],
+        "diary_tab":                [("id", "com.myfitnesspal.android:id/action_diary"),
+                                     ("xpath", "//*[contains(@resource-id, 'com.myfitnesspal.android:id/action_diary')]")],
+        "home_dashboard":           [("-android uiautomator", 'new UiSelector().resourceId("layoutDashboardParentColumn")'),
+                                     ("xpath", "//*[@resource-id='layoutDashboardParentColumn']")],
+        "toolbar_container":        [("id", "com.myfitnesspal.android:id/toolbar_container"),
+                                     ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/toolbar_container']")],
+        "text_view":                [("class name", "android.widget.TextView")],     # Within a view
+
+        # Diary
+        "date_bar":                 [("id", "com.myfitnesspal.android:id/date_bar"),
+                                     ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/date_bar']")],
+        "diary_date":               [("id", "com.myfitnesspal.android:id/btnDate"),
+                                     ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/btnDate']")],
+        "previous_day":             [("id", "com.myfitnesspal.android:id/btnPrevious"),
+                                     ("xpath", ".//*[@resource-id='com.myfitnesspal.android:id/btnPrevious']")],
+        "next_day":                 [("id", "com.myfitnesspal.android:id/btnNext"),
+                                     ("xpath", ".//*[@resource-id='com.myfitnesspal.android:id/btnNext']")],
+        "calorie_goal":             [("id", "com.myfitnesspal.android:id/goal"),
+                                     ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/goal']")],
+        "calorie_total":            [("id", "com.myfitnesspal.android:id/food"),
+                                     ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/food']")],
+        "diary_complete":           [("id", "com.myfitnesspal.android:id/btnComplete"),
+                                     ("xpath", ".//*[@resource-id='com.myfitnesspal.android:id/btnComplete']")],
+        "diary_entries":            [("xpath", "//*[@resource-id='com.myfitnesspal.android:id/diary_recycler_view']"
+                                               "/child::*")],       # Immediate children only, so xpath
+        "entry_children":           [("xpath", ".//child::*")],     # Within a diary entry
+        "section_header":           [("id", "com.myfitnesspal.android:id/txtSectionHeader"),        # Within a diary entry
+                                     ("xpath", ".//*[@resource-id='com.myfitnesspal.android:id/txtSectionHeader']")],
+        "item_description":         [("id", "com.myfitnesspal.android:id/txtItemDescription"),      # Within a diary entry
+                                     ("xpath", ".//*[@resource-id='com.myfitnesspal.android:id/txtItemDescription']")],
+        "item_details":             [("id", "com.myfitnesspal.android:id/txtItemDetails"),          # Within a diary entry
+                                     ("xpath", ".//*[@resource-id='com.myfitnesspal.android:id/txtItemDetails']")],
+        "item_calories":            [("id", "com.myfitnesspal.android:id/txtCalories"),             # Within a diary entry
+                                     ("xpath", ".//*[@resource-id='com.myfitnesspal.android:id/txtCalories']")],
+        "entry_timestamp":          [("id", "com.myfitnesspal.android:id/entry_timestamp"),         # Within a diary entry
+                                     ("xpath", ".//*[@resource-id='com.myfitnesspal.android:id/entry_timestamp']")],
+
+        # Calendar
+        "calendar_input_toggle":    [("id", "com.myfitnesspal.android:id/mtrl_picker_header_toggle"),
+                                     ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/mtrl_picker_header_toggle']")],
+        "calendar_text_input":      [("-android uiautomator",
+                                      'new UiSelector().resourceId("com.myfitnesspal.android:id/mtrl_picker_text_input_date")'
+                                      '.childSelector(new UiSelector().className("android.widget.EditText"))'),
+                                     ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/mtrl_picker_text_input_date']"
+                                               "//android.widget.EditText")],
+        "calendar_selected_date":   [("id", "com.myfitnesspal.android:id/mtrl_picker_header_selection_text"),
+                                     ("xpath", "//*[@resource-id="
+                                               "'com.myfitnesspal.android:id/mtrl_picker_header_selection_text']")],
+        "calendar_pending_date":    [("id", "com.myfitnesspal.android:id/month_navigation_fragment_toggle"),
+                                     ("xpath", "//*[@resource-id="
+                                               "'com.myfitnesspal.android:id/month_navigation_fragment_toggle']")],
+        "calendar_selection_frame": [("id", "com.myfitnesspal.android:id/mtrl_calendar_selection_frame"),
+                                     ("xpath", "//*[@resource-id="
+                                               "'com.myfitnesspal.android:id/mtrl_calendar_selection_frame']")],
+        "calendar_year_selector":   [("id", "com.myfitnesspal.android:id/mtrl_calendar_year_selector_frame"),
+                                     ("xpath", "//*[@resource-id="
+                                               "'com.myfitnesspal.android:id/mtrl_calendar_year_selector_frame']")],
+        "calendar_years":           [("-android uiautomator",
+                                      'new UiSelector().descriptionMatches("Navigate to (current )?year .*")'),
+                                     ("xpath", "//*[contains(@content-desc, 'Navigate to ') and "
+                                               "contains(@content-desc, ' year ')]")],
+        "calendar_month_previous":  [("id", "com.myfitnesspal.android:id/month_navigation_previous"),
+                                     ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/month_navigation_previous']")],
+        "calendar_month_next":      [("id", "com.myfitnesspal.android:id/month_navigation_next"),
+                                     ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/month_navigation_next']")],
+        "calendar_confirm":         [("id", "com.myfitnesspal.android:id/confirm_button"),
+                                     ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/confirm_button']")],
+        "calendar_cancel":          [("id", "com.myfitnesspal.android:id/cancel_button"),
+                                     ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/cancel_button']")],
+    }
     # -------------------------------------------
 
     # MyFitnessPal "XPATH" parameters
@@ -3,38 +3,142 @@
 
 from MyFitnessPal._MyFitnessPalApp_Controller import MyFitnessPalAppControl as phone_app
 from MyFitnessPal._JSON import JSONCtrl as archieve
+from MyFitnessPal._SQLite import SQLiteCtrl
+from MyFitnessPal._Segmented import SegmentedJSONCtrl
+from MyFitnessPal._MacroCache import MacroCache
+from MyFitnessPal._Parallel import ScrapeCollector, shard_dates
+from MyFitnessPal._Backfill import find_incomplete_dates, group_runs, check_consistency, food_rows
+from MyFitnessPal._Jobs import ScrapeJob
+from MyFitnessPal._Pipeline import PersistPipeline
 from MyFitnessPal.AppParameters import AppConfig as dv
 from MyFitnessPal.FileLocations import LocalFileLocations as ls
+from miAndroid.PhoneParameters import PhoneConfig
+
+from concurrent.futures import ProcessPoolExecutor
 
 from datetime import datetime, date, timedelta
 
-import time
+import hashlib
+import json
 import os
+import shutil
 
 
 # noinspection PyRedundantParentheses
 class MyFitnessPal:
-    def __init__(self, internal_appium_service = True):
+    def __init__(self, internal_appium_service = True, driver = None, server_url = None, capabilities = None,
+                 datastore = None):
+        # 'datastore' - where the scraped data is to be appended, if not the datastore within the folder root (see
+        # 'scrap_diary_parallel'). In which case the datastore/macro cache files are owned by another process, and are
+        # only read
         self.folder_root = ls.rootFolder  # Default the folder root to the specified location
         self.diary_calories = {}
         self.diary_contents = {}
         self.diary_macro    = {}
 
-        self.app = phone_app(internal_appium_service)
-        self.json = archieve(f"{os.path.join(self.folder_root, ".mem")}")
+        self.app = phone_app(internal_appium_service, driver, server_url, capabilities)
+        if (dv.instrument_scrape is True):
+            self.app.enable_instrumentation()
+
+        if (datastore is None):
+            self.json = MyFitnessPal.open_datastore(self.folder_root)
+        else:
+            self.json = datastore
+
+        if (dv.macro_cache_size > 0):
+            # Stored next to the datastore, so that foods seen in previous runs don't need to be opened again
+            self.app.macro_cache = MacroCache(f"{os.path.join(self.folder_root, ".macro_cache")}",
+                                              read_only=(datastore is not None))
+
+        # Each scraped date is validated/saved by the pipeline, upon a worker thread whilst scraping a number of dates
+        self.pipeline = PersistPipeline(self.json, self.app.macro_cache, MyFitnessPal.scrap_consistancy_check)
+
+        # Locators found to be fastest against this version of the app, by a previous 'benchmark_locators'
+        self.app.locators.load(os.path.join(self.folder_root, ".locators.json"), dv.app_sw_version)
+
+    def benchmark_locators(self):
+        # Benchmark the locator strategies upon the diary/calendar/food views, and save the fastest for later runs.
+        # Assumes 'goto_diary_page'
+        if (self.app.benchmark_app_locators() == 0):
+            return 0
+
+        self.app.locators.save(os.path.join(self.folder_root, ".locators.json"), dv.app_sw_version)
+        return 1
+
+    @staticmethod
+    def open_datastore(folder_root, backend=dv.datastore_backend):
+        json_file = os.path.join(folder_root, ".mem")
+
+        if (backend == "sqlite"):
+            database_file = f"{json_file}.db"
+            if (os.path.exists(database_file) is False and os.path.exists(json_file) is True):
+                # Imported into a temporary database which is renamed into place once complete, so an interrupted
+                # migration leaves no database behind and is carried out again upon the next run
+                temporary_file = f"{database_file}.tmp"
+                if (os.path.exists(temporary_file) is True):
+                    os.remove(temporary_file)
+
+                print(f"Migrating '{json_file}' into '{database_file}'...", end='')
+                migration = SQLiteCtrl(temporary_file)
+                migration.import_json(json_file)
+                migration.close_datastore()
+
+                os.replace(temporary_file, database_file)
+                print("OK")
+
+            return SQLiteCtrl(database_file)
+
+        if (backend == "segmented"):
+            folder = f"{json_file}.d"
+            if (os.path.exists(os.path.join(folder, SegmentedJSONCtrl.manifest_name)) is False and
+                    os.path.exists(json_file) is True):
+                # Imported into a temporary folder which is renamed into place once complete, so an interrupted
+                # migration leaves no manifest behind and is carried out again upon the next run
+                temporary_folder = f"{folder}.tmp"
+                shutil.rmtree(temporary_folder, ignore_errors=True)
+
+                print(f"Migrating '{json_file}' into '{folder}'...", end='')
+                migration = SegmentedJSONCtrl(temporary_folder)
+                migration.import_json(json_file)
+                migration.close_datastore()
+
+                shutil.rmtree(folder, ignore_errors=True)   # Without a manifest, anything here is incomplete
+                os.replace(temporary_folder, folder)
+                print("OK")
+
+            return SegmentedJSONCtrl(folder)
+
+        return archieve(json_file)
 
     def goto_diary_page(self):
+        if (self.app.session_attached is True):
+            # The app is left open by the previous run when sharing the session of the 'SessionDaemon', in which case
+            # carry on from where it was left (rather than re-opening it)
+            screen = self.app.classify_view()
+            if (screen["view"] == "DIARY"):
+                return 1
+            if (screen["view"] in ("HOME_TAB", "MFP_OTHER")):
+                return self.app.open_diary_tab()
+
+            if (screen["view"] != "LAUNCHER_HOME"):
+                # Somewhere unexpected (i.e. a food/calendar view), so close everything and start afresh
+                self.app.close_all_apps()
+
         if (self.app.open() == 0):
             return 0
-        time.sleep(2)
 
         if (self.app.open_diary_tab() == 0):  # Open the "Diary Tab" of today
             return 0
-        time.sleep(2)
 
-        time.sleep(10)
+        # Diary entries may load after the tab has been opened, so wait for these to be present
+        self.app.wait_for_settle(resource_id=dv.meal_name_header, max_wait=dv.app_launch_max_wait)
+        return 1
 
-    def scrap_active_diary(self):
+    def scrap_active_diary(self, expected_date=None, on_persisted=None):
+        # Read the diary of the current date, and hand it to the 'pipeline' to be validated/saved. Which is done upon
+        # the worker thread (if started, see 'scrap_diary_dates'), so this returns once the diary has been read.
+        # 'expected_date' - date which the diary should be showing (checked by 'scrap_consistancy_check')
+        # 'on_persisted' - optional function(record) called once saved, see 'PersistPipeline.submit'
         self.diary_calories = {}
         self.diary_contents = {}
         self.diary_macro    = {}
@@ -45,16 +149,8 @@ class MyFitnessPal:
             return 0
 
         print(f"====={diary_date}=====")
-        print(f"Retrieving the Diary entries for date {diary_date}...", end='')
-        if (self.app.read_diary() == 0):
-            print("Error encountered... exiting scrap...")
-            print(f"=====END=====")
-            return 0
-
-        print("OK!")
-        time.sleep(1)
-        print(f"Retrieving Macros for date {diary_date}...", end='')
-        if (self.app.read_diary_macros() == 0):
+        print(f"Retrieving the Diary entries and Macros for date {diary_date}...", end='')
+        if (self.app.harvest_diary(from_top=False) == 0):    # 'read_diary_date' has already gone to the top
             print("Error encountered... exiting scrap...")
             print(f"=====END=====")
             return 0
@@ -70,59 +166,26 @@ class MyFitnessPal:
         self.diary_macro['contents']    = self.app.diary_macro_list
         self.diary_macro['date']        = str(diary_date.date())
 
-        print("Checking that the data is consistant...", end='')
-        if (self.scrap_consistancy_check == 0):
-            print("error...exiting")
-            return 0
-        print("OK")
-
-        print("Saving to JSON file...", end='')
-        self.json.append_DailySummary(self.diary_calories)
-        self.json.append_Diary(self.diary_contents)
-        self.json.append_Macro(self.diary_macro)
-
-        self.json.write_datastore()
-        print("OK")
+        self.pipeline.submit({"expected_date": None if (expected_date is None) else str(expected_date),
+                              "DailySummary": self.diary_calories, "Diary": self.diary_contents,
+                              "Macro": self.diary_macro}, on_persisted)
 
         print(f"=====END=====")
         return 1
 
-    def scrap_consistancy_check(self, expected_date):
-        calories_burnt_diary = 0
-        calories_burnt_macro = 0
-
-        for i in self.diary_contents:
-            calories_burnt_diary += i['contents']['calories']
-
-        for i in self.diary_macro:
-            calories_burnt_macro += i['contents']['calories']
-
-        if (self.diary_calories['date'] == expected_date):
-            first_check = True
-        else:
-            first_check = False
-
-        if (self.diary_calories['contents']['calories'] == calories_burnt_diary):
-            second_check = True
-        else:
-            second_check = False
-
-        if (self.diary_calories['contents']['calories'] == calories_burnt_macro):
-            third_check = True
-        else:
-            third_check = False
-
-        if ((first_check is False) or (second_check is False) or (third_check is False)):
-            print(f"Error with the scrap, data doesn't match -> Expected date {expected_date}, "
-                  f"Date scrapped -> {self.diary_calories['date']}, "
-                  f"Calories Tally = f{self.diary_calories['contents']['calories']}, "
-                  f"Total from Diary = {calories_burnt_diary}, "
-                  f"Total from Macro = {calories_burnt_macro}, ")
+    @staticmethod
+    def scrap_consistancy_check(record):
+        # Check the record of a scraped date (see 'scrap_active_diary'), before it is saved. The same check is used by
+        # 'backfill' to find incomplete dates (see '_Backfill.check_consistency')
+        reason = check_consistency(record['DailySummary'], record['Diary'], record['Macro'], record['expected_date'])
+        if (reason != ""):
+            print(f"Error with the scrap of {record['DailySummary']['date']}, data doesn't match -> {reason}")
             return 0
-        else:
-            return 1
 
-    def scrap_diary_from_date(self, start_date=datetime.now(), number_of_dates=1, step=-1):
+        return 1
+
+    def scrap_diary_from_date(self, start_date=datetime.now(), number_of_dates=1, step=-1, journal=True):
+        # 'journal' - record the progress as a job (see '_Jobs.py'), so that it can be resumed with 'resume_job'
         if not (isinstance(start_date, datetime) or isinstance(start_date, date)):
             print(f"Provided start date of {start_date}, is not recognised, exiting...")
             return 0
@@ -131,29 +194,290 @@ class MyFitnessPal:
             print("Exiting, cannot scrap '0' days!")
             return 0
 
-        first_pass = True
+        dates = [start_date + timedelta(days=offset * step) for offset in range(number_of_dates)]
+        if (journal is True):
+            return self.run_job(ScrapeJob.create(self.folder_root, "scrap", [MyFitnessPal.as_date(x) for x in dates]))
+
+        return self.scrap_diary_dates(dates)
+
+    @staticmethod
+    def as_date(value):
+        return value.date() if isinstance(value, datetime) else value
+
+    def scrap_diary_dates(self, dates, job=None):
+        # Scrap each of the dates. These are visited in the order determined by the navigation planner (re-using the
+        # current position of the diary), with each date reached by the cheapest route from the previous.
+        # 'job' - optional 'ScrapeJob', which is updated as each food is read and each date is completed (once saved)
+        # Each date is saved upon the pipeline worker (see '_Pipeline.py'), whilst the driver moves onto the next date
+        self.app.current_diary_date()
+        if (dv.pipeline_persist is True):
+            self.pipeline.start()
+
+        for target_date in self.app.navigation.order(dates):
+            if (self.app.goto_diary_date(target_date) == 0):
+                print(f"Unable to open the diary for {target_date}, skipping...")
+                continue
+
+            self.app.wait_for_settle(resource_id='com.myfitnesspal.android:id/diary_recycler_view')
+            if (job is not None):
+                # Foods read before the job stopped (if it stopped partway through this date) are not opened again
+                partial = job.partial_of(target_date)
+                if (partial is not None):
+                    self.app.known_macros = MyFitnessPal.stored_macros_of({"contents": partial["diary"]},
+                                                                          {"contents": partial["macros"]})
+                self.app.progress_callback = lambda rows, macros: job.checkpoint(target_date, rows, macros)
+
+            on_persisted = None
+            if (job is not None):
+                on_persisted = lambda record, completed_date=target_date: job.complete(completed_date)
+
+            try:
+                if (self.scrap_active_diary(target_date, on_persisted) == 0):
+                    print("Error in scrap...exiting...")
+
+            except:
+                print("Unknown error encountered, exiting...")
+                try:
+                    self.app.return_to_diary()  # So that the date isn't taken as already shown, i.e. by 'resume_job'
+                except:
+                    self.app.navigation.set_current_date(None)
+                self.pipeline.stop()
+                self.report_instrumentation()
+                return 0
+
+            finally:
+                self.app.known_macros = None
+                self.app.progress_callback = None
+
+        self.pipeline.stop()
+        self.report_instrumentation()
+        return 1 if (self.pipeline.failed == 0) else 0
+
+    def run_job(self, job):
+        # Scrap the dates of the job which are yet to be completed
+        print(f"Running job {job.summary()}")
+        result = self.scrap_diary_dates(job.pending_dates(), job)
+        print(f"Job {job.summary()}")
+
+        if (job.is_finished() is False):
+            return 0
+
+        ScrapeJob.prune_finished(self.folder_root)
+        return result
+
+    def resume_job(self, job_id=None):
+        # Resume the job (default of the latest job which hasn't finished), from its last checkpoint
+        if (job_id is None):
+            job = ScrapeJob.latest_unfinished(self.folder_root)
+            if (job is None):
+                print("There are no unfinished jobs to resume")
+                return 1
 
-        for offset in range(number_of_dates):
-            date_offset = timedelta(days=offset)
-            target_date = start_date + date_offset
-            if (first_pass is True or abs(step) > 7):
-                self.app.open_diary_date(target_date)
+        else:
+            job_file = os.path.join(ScrapeJob.folder_of(self.folder_root), f"{job_id}.json")
+            if (os.path.exists(job_file) is False):
+                print(f"Job '{job_id}' not found, exiting...")
+                return 0
+
+            job = ScrapeJob(job_file)
+
+        return self.run_job(job)
 
-            else:
-                for j in range(0, abs(step)):
-                    if (step < 0):
-                        self.app.previous_day()
-                    else:
-                        self.app.next_day()
+    def backfill(self, start_date, end_date=None):
+        # Scrap every date between 'start_date' and 'end_date' (default of today), which is missing or incomplete within
+        # the datastore (see '_Backfill.py'). Re-running (i.e. after a failure) only scraps what is still missing, which
+        # after a crash includes any dates that were still waiting to be written (see 'AppConfig.datastore_flush_days')
+        start_date = MyFitnessPal.as_date(start_date)
+        end_date = date.today() if (end_date is None) else MyFitnessPal.as_date(end_date)
 
-            time.sleep(2)
+        incomplete = find_incomplete_dates(self.json, start_date, end_date)
+        if (len(incomplete) == 0):
+            print(f"Nothing to backfill between {start_date} and {end_date}")
+            return 1
+
+        runs = group_runs(incomplete)
+        print(f"Backfilling {len(incomplete)} date(s) between {start_date} and {end_date}, in {len(runs)} run(s):")
+        for first, last in runs:
+            reasons = sorted(set([incomplete[x] for x in incomplete if (first <= x <= last)]))
+            print(f"  {first} -> {last} ({(last - first).days + 1} day(s)) - {', '.join(reasons)}")
+
+        # The dates are visited as a single sweep (see 'NavigationPlanner.order'), so each run is stepped through with
+        # the day arrows, and the jump between runs uses whichever route is the cheapest
+        return self.run_job(ScrapeJob.create(self.folder_root, "backfill", sorted(incomplete)))
+
+    @staticmethod
+    def diary_fingerprint(calorie_tally, diary_rows):
+        # Fingerprint of the calorie tally and the top level diary rows (meal, name, calories) of a date. Used to
+        # determine whether a date has changed since it was stored, without reading any macros
+        contents = [calorie_tally.get('goal'), calorie_tally.get('calories'),
+                    [[x['meal'], x['name'], x['calories']] for x in diary_rows]]
+        return hashlib.sha1(json.dumps(contents).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def stored_macros_of(diary, macro):
+        # (meal, name, calories) -> [macros, ...] of the stored Diary/Macro entries of a date. The Macro entries are in
+        # the same order as the Diary entries, excluding "Water"/"Exercise" (as is the case when these are read)
+        known = {}
+        if (diary is None or macro is None):
+            return known
+
+        foods = food_rows(diary['contents'])
+        if (len(foods) != len(macro['contents'])):
+            return known        # Entries don't line up, so none of the stored macros can be trusted
+
+        for food, macros in zip(foods, macro['contents']):
+            known.setdefault((food['meal'], food['name'], food['calories']), []).append(macros)
+
+        return known
+
+    def refresh_diary_dates(self, dates):
+        # Re-check dates which have already been stored, for edits made after they were scraped. Only the calorie tally
+        # and top level diary rows are read, and if their fingerprint matches what is stored the date is skipped.
+        # Otherwise the date is scraped again, with the stored macros re-used for every row that is unchanged (so only
+        # new/modified foods are opened)
+        skipped = 0
+        self.app.current_diary_date()
+        if (dv.pipeline_persist is True):
+            self.pipeline.start()
+
+        for target_date in self.app.navigation.order(dates):
+            text = str(target_date)
+            with self.pipeline.lock:    # The worker may be writing a previous date
+                summary = self.json.read_entry("DailySummary", text)
+                diary = self.json.read_entry("Diary", text)
+                macro = self.json.read_entry("Macro", text)
+
+            if (self.app.goto_diary_date(target_date) == 0):
+                print(f"Unable to open the diary for {target_date}, skipping...")
+                continue
+
+            self.app.wait_for_settle(resource_id='com.myfitnesspal.android:id/diary_recycler_view')
+            if (summary is not None and diary is not None):
+                if (self.app.read_diary() == 0):
+                    print(f"Unable to read the diary for {target_date}, skipping...")
+                    continue
+
+                if (self.app.calorie_tally != 0 and
+                        MyFitnessPal.diary_fingerprint(self.app.calorie_tally, self.app.diary_top_list) ==
+                        MyFitnessPal.diary_fingerprint(summary['contents'], diary['contents'])):
+                    print(f"{target_date} is unchanged")
+                    skipped += 1
+                    continue
+
+            print(f"{target_date} has changed, re-scraping...")
+            self.app.known_macros = MyFitnessPal.stored_macros_of(diary, macro)
             try:
-                if (self.scrap_active_diary() == 0):
-                    print("Error in scrap...exiting...")
+                if (self.scrap_active_diary(target_date) == 0):
+                    print("Error in scrap...")
 
             except:
                 print("Unknown error encountered, exiting...")
+                try:
+                    self.app.return_to_diary()  # So that the date isn't taken as already shown, i.e. by 'resume_job'
+                except:
+                    self.app.navigation.set_current_date(None)
+                self.pipeline.stop()
+                self.report_instrumentation()
                 return 0
 
+            finally:
+                self.app.known_macros = None
+
+        self.pipeline.stop()
+        print(f"{skipped} of {len(dates)} date(s) unchanged")
+        self.report_instrumentation()
+        return 1 if (self.pipeline.failed == 0) else 0
+
+    def refresh_recent(self, days=dv.refresh_days):
+        # Re-check the last 'days' days (up to and including today), see 'refresh_diary_dates'
+        today = date.today()
+        return self.refresh_diary_dates([today - timedelta(days=x) for x in range(days)])
+
+    @staticmethod
+    def scrap_diary_parallel(start_date=datetime.now(), number_of_dates=1, step=-1, devices=None,
+                             driver_factory=None):
+        # Parallel version of 'scrap_diary_from_date'. The dates are split into a contiguous block per device (default
+        # of 'PhoneConfig.parallel_devices'), with each device scraped by a separate process. The results of every
+        # device are then appended to the datastore by this process - the single writer.
+        # 'driver_factory' - optional (picklable) callable returning a stand-in driver for each device, i.e.
+        # 'MyFitnessPal._FakeApp.create_fake_driver'
+        if (devices is None):
+            devices = PhoneConfig.parallel_devices
+
+        if (number_of_dates == 0 or len(devices) == 0):
+            print("Exiting, cannot scrap '0' days or with '0' devices!")
+            return 0
 
-            first_pass = False
\ No newline at end of file
+        blocks = shard_dates(start_date, number_of_dates, step, len(devices))
+        folder_root = ls.rootFolder
+        datastore = MyFitnessPal.open_datastore(folder_root)
+        macro_cache = None
+        if (dv.macro_cache_size > 0):
+            macro_cache = MacroCache(f"{os.path.join(folder_root, ".macro_cache")}")
+
+        result = 1
+        with ProcessPoolExecutor(max_workers=len(blocks)) as pool:
+            futures = [pool.submit(_scrap_diary_shard, device, block_start, block_dates, step, driver_factory)
+                       for (device, (block_start, block_dates)) in zip(devices, blocks)]
+
+            for device, (block_start, block_dates), future in zip(devices, blocks, futures):
+                try:
+                    status, records, cache_entries = future.result()
+
+                except Exception as e:
+                    print(f"Scrap of {block_dates} date(s) from {block_start} on {device.get('server_url')} failed - "
+                          f"{e}")
+                    result = 0
+                    continue
+
+                # Whatever has been scraped is kept, but the shard has only succeeded if every one of its dates was
+                # (i.e. none were rejected by the consistency check)
+                ScrapeCollector.merge_into(datastore, records)
+                if (macro_cache is not None):
+                    macro_cache.merge(cache_entries)
+
+                scraped = ScrapeCollector.dates_of(records)
+                block = [str(MyFitnessPal.as_date(block_start + timedelta(days=x * step))) for x in range(block_dates)]
+                missing = [x for x in block if (x not in scraped)]
+                if (status == 0 or len(missing) != 0):
+                    print(f"Scrap of {block_dates} date(s) from {block_start} on {device.get('server_url')} is "
+                          f"incomplete, missing {missing}")
+                    result = 0
+
+        datastore.flush()
+        if (macro_cache is not None):
+            macro_cache.write_cache()
+
+        return result
+
+    def report_instrumentation(self):
+        # Print the summary of the driver instrumentation (if enabled), and export it alongside the datastore. Along
+        # with any operations which needed to be retried
+        self.app.retry.print_summary()
+        self.pipeline.print_summary()
+        if (self.app.instrumentation is None):
+            return
+
+        self.app.instrumentation.print_summary()
+        self.app.instrumentation.export_json(
+            os.path.join(self.folder_root, f"instrumentation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"))
+
+
+def _scrap_diary_shard(device, start_date, number_of_dates, step, driver_factory):
+    # Worker process of 'scrap_diary_parallel', returns the status of the scrap (1/0) along with what has been scraped
+    # (and any new macro cache entries) rather than writing to the datastore
+    status = 0
+    collector = ScrapeCollector()
+    mfp = MyFitnessPal(internal_appium_service=device.get('internal_appium_service', True),
+                       driver=(driver_factory() if (driver_factory is not None) else None),
+                       server_url=device.get('server_url'), capabilities=device.get('capabilities'),
+                       datastore=collector)
+    try:
+        if (mfp.goto_diary_page() != 0):
+            status = mfp.scrap_diary_from_date(start_date, number_of_dates, step, journal=False)
+
+    finally:
+        mfp.app.quit()
+
+    cache_entries = mfp.app.macro_cache.new_entries() if (mfp.app.macro_cache is not None) else []
+    return status, collector.records, cache_entries
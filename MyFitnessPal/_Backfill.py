@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+# Determine which dates of the datastore ('JSONCtrl'/'SQLiteCtrl') still need to be scraped (see
+# 'MyFitnessPal.backfill'). A date is complete once it has a DailySummary, Diary and Macro entry, which are consistent
+# with each other. Re-running after a failure only finds what is still missing within the datastore. As writes are
+# buffered (see 'AppConfig.datastore_flush_days'), up to that many of the dates scraped before a crash may not have been
+# written, and are scraped again.
+
+
+def calories_of(value):
+    # Calories are stored as the text shown within the app, i.e. '1,274'
+    try:
+        return int(str(value).replace(',', ''))
+    except ValueError:
+        return None
+
+
+def food_rows(diary_rows):
+    # Diary rows which have macros, the macros of "Water"/"Exercise" rows are not read
+    return [x for x in diary_rows if (x['meal'] != "Water" and x['meal'] != "Exercise")]
+
+
+def check_consistency(summary, diary, macro, expected_date=None):
+    # Return "" if the entries of a date are consistent, otherwise the reason that they are not. The date must be the
+    # one expected (if given), and the calorie tally must match the total of the food rows, as must the total of the
+    # macros. Used both before a scraped date is saved (see 'MyFitnessPal.scrap_consistancy_check') and to find the
+    # stored dates which are incomplete, so that the two agree
+    if (expected_date is not None and summary['date'] != str(expected_date)):
+        return f"date {summary['date']} scraped, but {expected_date} was expected"
+
+    if (isinstance(summary['contents'], dict) is False):
+        return "calorie tally was not read"
+
+    foods = food_rows(diary['contents'])
+    if (len(foods) != len(macro['contents'])):
+        return f"{len(foods)} Diary food entries, but {len(macro['contents'])} Macro entries"
+
+    tally = calories_of(summary['contents']['calories'])
+    diary_total = sum([calories_of(x['calories']) or 0 for x in foods])
+    macro_total = sum([calories_of(x['calories']) or 0 for x in macro['contents']])
+
+    if (tally != diary_total or tally != macro_total):
+        return f"calories don't match - tally {tally}, Diary {diary_total}, Macro {macro_total}"
+
+    return ""
+
+
+def check_stored_date(summary, diary, macro):
+    # Return "" if the entries of the date are complete and consistent, otherwise the reason that they are not
+    if (summary is None):
+        return "no DailySummary"
+    if (diary is None):
+        return "no Diary"
+    if (macro is None):
+        return "no Macro"
+
+    return check_consistency(summary, diary, macro)
+
+
+def find_incomplete_dates(datastore, start_date, end_date):
+    # Return {date: reason} for every date between 'start_date' and 'end_date' (inclusive) which is missing or
+    # incomplete within the datastore
+    incomplete = {}
+
+    current = start_date
+    while (current <= end_date):
+        text = str(current)
+        reason = check_stored_date(datastore.read_entry("DailySummary", text), datastore.read_entry("Diary", text),
+                                   datastore.read_entry("Macro", text))
+        if (reason != ""):
+            incomplete[current] = reason
+
+        current += timedelta(days=1)
+
+    return incomplete
+
+
+def group_runs(dates):
+    # Group the dates into runs of consecutive dates, [(first date, last date), ...] in date order
+    runs = []
+    for current in sorted(dates):
+        if (len(runs) != 0 and (current - runs[-1][1]).days == 1):
+            runs[-1] = (runs[-1][0], current)
+        else:
+            runs.append((current, current))
+
+    return runs
@@ -0,0 +1,541 @@
+# Simulation of the MyFitnessPal app, to be hosted within the 'FakePhone' of 'miAndroid._FakeDriver'. This allows the
+# 'MyFitnessPalAppControl' (and 'MyFitnessPal') to be run without a live emulator, with the diary contents either
+# provided or generated (deterministically) per date.
+#
+# Simulated views:
+#   'HOME_TAB'  - app home/dashboard tab
+#   'DIARY'     - diary tab for 'diary_date', scrollable
+#   'FOOD'      - food details (macros) of a diary entry, scrollable
+#   'CALENDAR'  - date picker opened from the diary date bar
+#   'CALENDAR_TEXT' - text input mode of the date picker
+#   'YEARS'     - year selector of the date picker, scrollable
+
+# External imports/from statements
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from datetime import date, datetime, timedelta
+import random
+
+from selenium.common.exceptions import WebDriverException
+
+# Internal imports/from statements
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from miAndroid._FakeDriver import FakeDriver, FakePhone
+from MyFitnessPal.AppParameters import AppConfig as dv
+from MyFitnessPal._MyFitnessPalApp_Controller import MyFitnessPalAppControl
+
+
+def create_fake_driver(diaries=None, seed=0):
+    # Return a 'FakeDriver' with the MyFitnessPal app installed within the app folder, ready to be provided to
+    # 'MyFitnessPalAppControl'/'MyFitnessPal' as the 'driver'
+    return FakeDriver(FakePhone({"MyFitnessPal": FakeMyFitnessPalApp(diaries, seed)}))
+
+
+# noinspection PyRedundantParentheses
+class FakeMyFitnessPalApp():
+    mfp = "com.myfitnesspal.android:id"
+    width = 1080
+
+    # Vertical layout of the diary view
+    recycler_top    = 560
+    recycler_bottom = 2300
+    ribbon_top      = 2200
+    header_height   = 110
+    food_height     = 200
+    complete_height = 250
+
+    # Vertical layout of the food details view
+    details_top     = 210
+    details_bottom  = 2300
+    macro_height    = 140
+
+    meals = ["Breakfast", "Lunch", "Dinner", "Snacks"]
+
+    # description, brand, units, calories, carbohydrates, fat, protein (per serving)
+    food_catalogue = [
+        ("Porridge Oats", "Quaker", "cup", 300, 54, 6, 10),
+        ("Semi Skimmed Milk", "Tesco", "ml", 50, 5, 2, 4),
+        ("Banana", "Generic", "medium", 105, 27, 0, 1),
+        ("Chicken Breast", "Generic", "g", 165, 0, 4, 31),
+        ("Brown Rice", "Tilda", "cup", 215, 45, 2, 5),
+        ("Broccoli", "Generic", "cup", 31, 6, 0, 3),
+        ("Protein Shake", "MyProtein", "scoop", 103, 1, 2, 21),
+        ("Wholemeal Bread", "Hovis", "slice", 80, 14, 1, 4),
+        ("Peanut Butter", "Whole Earth", "tbsp", 95, 3, 8, 4),
+        ("Greek Yoghurt", "Fage", "pot", 130, 6, 5, 15),
+    ]
+
+    def __init__(self, diaries=None, seed=0):
+        # 'diaries' - dictionary of date -> [(meal name, [food, ...]), ...], where 'food' is the output of 'create_food'.
+        #             Any date not present is generated from the 'seed'
+        self.diaries = {} if (diaries is None) else diaries
+        self.today = date.today()   # Must be the actual date, as the controller interprets 'Today' etc. against it
+        self.seed = seed
+
+        self.screen = "HOME_TAB"
+        self.diary_date = self.today
+        self.diary_offset = 0
+        self.food = None
+        self.food_offset = 0
+        self.calendar_selected = self.today
+        self.calendar_pending = (self.today.year, self.today.month)
+        self.calendar_text = ""
+        self.year_offset = 0
+
+    # =================================================================================================================
+    # DIARY CONTENTS
+    # =================================================================================================================
+    @staticmethod
+    def create_food(description, brand, units, servings, calories, carbohydrates, fat, protein, meal="", time=""):
+        # Return a diary food, with the macros in the format of 'MyFitnessPalAppControl.macro_food_template'. The
+        # nutrients not provided are derived from the ones which are
+        macros = {
+            "meal": meal,
+            "time": time,
+            "name": description,
+            "units": f"1 {units}",
+            "servings": f"{servings:.1f}",
+
+            "calories": f"{round(calories * servings)}",
+            "carbohydrates": f"{round(carbohydrates * servings)}g",
+            "fat": f"{round(fat * servings)}g",
+            "protein": f"{round(protein * servings)}g",
+            "vitamin a": f"{round(2 * servings)}%",
+            "cholesterol": f"{round(fat * 3 * servings)}mg",
+            "saturated fat": f"{round(fat * 0.4 * servings)}g",
+            "polyunsaturated fat": f"{round(fat * 0.2 * servings)}g",
+            "monounsaturated fat": f"{round(fat * 0.3 * servings)}g",
+            "trans fat": "0g",
+            "sodium": f"{round(calories * 0.5 * servings)}mg",
+            "potassium": f"{round(calories * 1.2 * servings)}mg",
+            "fiber": f"{round(carbohydrates * 0.1 * servings)}g",
+            "sugar": f"{round(carbohydrates * 0.2 * servings)}g",
+            "vitamin c": f"{round(servings)}%",
+            "calcium": f"{round(3 * servings)}%",
+            "iron": f"{round(4 * servings)}%"
+        }
+
+        return {
+            "description": description,
+            "details": f"{brand}, {servings:g} {units}",
+            "calories": macros["calories"],
+            "time": time,
+            "macros": macros
+        }
+
+    def diary_of(self, diary_date):
+        if (diary_date not in self.diaries):
+            generator = random.Random((diary_date.toordinal() * 31) + self.seed)
+            diary = []
+
+            for meal_index, meal in enumerate(FakeMyFitnessPalApp.meals):
+                foods = []
+                for food_index in range(generator.randint(1 if (meal_index == 0) else 0, 3)):
+                    food = generator.choice(FakeMyFitnessPalApp.food_catalogue)
+                    servings = generator.choice([1, 1, 1, 2, 0.5])
+                    time = f"{7 + (meal_index * 4)}:{15 * food_index:02d} AM" if (food_index == 0) else ""
+                    foods.append(FakeMyFitnessPalApp.create_food(food[0], food[1], food[2], servings, *food[3:],
+                                                                 meal=meal, time=time))
+                diary.append((meal, foods))
+
+            self.diaries[diary_date] = diary
+
+        return self.diaries[diary_date]
+
+    def diary_rows(self):
+        # Return the rows of the diary as [(type, y position within the list, height, data), ...]
+        rows = []
+        y = 0
+
+        for meal_index, (meal, foods) in enumerate(self.diary_of(self.diary_date)):
+            rows.append(("Meal", y, FakeMyFitnessPalApp.header_height, meal))
+            y += FakeMyFitnessPalApp.header_height
+
+            for food_index, food in enumerate(foods):
+                rows.append(("Food", y, FakeMyFitnessPalApp.food_height, (meal_index, food_index, food)))
+                y += FakeMyFitnessPalApp.food_height
+
+        rows.append(("Complete", y, FakeMyFitnessPalApp.complete_height, None))
+        return rows
+
+    def diary_max_offset(self):
+        rows = self.diary_rows()
+        list_height = rows[-1][1] + rows[-1][2] + 20     # Padding, so that the last row clears the interface ribbon
+        return max(0, list_height - (FakeMyFitnessPalApp.ribbon_top - FakeMyFitnessPalApp.recycler_top))
+
+    def diary_date_text(self):
+        if (self.diary_date == self.today):
+            return "Today"
+        if (self.diary_date == self.today - timedelta(days=1)):
+            return "Yesterday"
+        if (self.diary_date == self.today + timedelta(days=1)):
+            return "Tomorrow"
+        if (self.diary_date.year == self.today.year):
+            return self.diary_date.strftime("%A, %b %d")
+
+        return self.diary_date.strftime(dv.diary_datestamp_format)
+
+    # =================================================================================================================
+    # VIEWS
+    # =================================================================================================================
+    @staticmethod
+    def clip(bounds, top, bottom):
+        # Clip the bounds to the visible region of a scrolling view. 'None' if not visible at all
+        if (bounds[3] <= top or bounds[1] >= bottom):
+            return None
+
+        return (bounds[0], max(bounds[1], top), bounds[2], min(bounds[3], bottom))
+
+    def __add_ribbon(self, parent):
+        ribbon = FakePhone.add_node(parent, 'android.widget.FrameLayout',
+                                    (0, FakeMyFitnessPalApp.ribbon_top, self.width, FakeMyFitnessPalApp.recycler_bottom),
+                                    resource_id=f"{self.mfp}/bottomContainer")
+        for index, (name, action) in enumerate([("dashboard", "tab_home"), ("diary", "tab_diary"),
+                                                ("plans", None), ("more", None)]):
+            attributes = {"resource_id": f"{self.mfp}/action_{name}", "content_desc": name.capitalize()}
+            if (action is not None):
+                attributes["fake_action"] = action
+            FakePhone.add_node(ribbon, 'android.widget.FrameLayout',
+                               (270 * index, FakeMyFitnessPalApp.ribbon_top, 270 * (index + 1),
+                                FakeMyFitnessPalApp.recycler_bottom), **attributes)
+
+    def __build_home_tab(self, top):
+        column = FakePhone.add_node(top, 'android.view.View', (0, 210, self.width, FakeMyFitnessPalApp.ribbon_top),
+                                    resource_id="layoutDashboardParentColumn")
+        FakePhone.add_node(column, 'android.widget.TextView', (40, 250, 400, 330), text="Today")
+        self.__add_ribbon(top)
+
+    def __build_diary(self, top):
+        toolbar = FakePhone.add_node(top, 'android.view.ViewGroup', (0, 63, self.width, 210),
+                                     resource_id=f"{self.mfp}/toolbar_container")
+        FakePhone.add_node(toolbar, 'android.widget.TextView', (40, 90, 400, 180), text="Diary")
+
+        date_bar = FakePhone.add_node(top, 'android.view.ViewGroup', (0, 210, self.width, 340),
+                                      resource_id=f"{self.mfp}/date_bar", fake_action="open_calendar")
+        FakePhone.add_node(date_bar, 'android.widget.ImageButton', (0, 210, 150, 340),
+                           resource_id=f"{self.mfp}/btnPrevious", fake_action="previous_day")
+        FakePhone.add_node(date_bar, 'android.widget.TextView', (150, 210, 930, 340),
+                           resource_id=f"{self.mfp}/btnDate", text=self.diary_date_text(), fake_action="open_calendar")
+        FakePhone.add_node(date_bar, 'android.widget.ImageButton', (930, 210, self.width, 340),
+                           resource_id=f"{self.mfp}/btnNext", fake_action="next_day")
+
+        diary = self.diary_of(self.diary_date)
+        total = sum([int(food["calories"]) for (meal, foods) in diary for food in foods])
+        summary = FakePhone.add_node(top, 'android.view.ViewGroup', (0, 340, self.width, 560))
+        FakePhone.add_node(summary, 'android.widget.TextView', (40, 400, 300, 500),
+                           resource_id=f"{self.mfp}/goal", text="2000")
+        FakePhone.add_node(summary, 'android.widget.TextView', (340, 400, 600, 500),
+                           resource_id=f"{self.mfp}/food", text=str(total))
+        FakePhone.add_node(summary, 'android.widget.TextView', (740, 400, 1040, 500),
+                           resource_id=f"{self.mfp}/remaining", text=str(2000 - total))
+
+        recycler = FakePhone.add_node(top, 'androidx.recyclerview.widget.RecyclerView',
+                                      (0, FakeMyFitnessPalApp.recycler_top, self.width,
+                                       FakeMyFitnessPalApp.recycler_bottom),
+                                      resource_id=f"{self.mfp}/diary_recycler_view")
+
+        for index, (row_type, y, height, data) in enumerate(self.diary_rows()):
+            screen_y = FakeMyFitnessPalApp.recycler_top + y - self.diary_offset
+            bounds = FakeMyFitnessPalApp.clip((0, screen_y, self.width, screen_y + height),
+                                              FakeMyFitnessPalApp.recycler_top, FakeMyFitnessPalApp.recycler_bottom)
+            if (bounds is None):
+                continue
+
+            row = FakePhone.add_node(recycler, 'android.widget.LinearLayout', bounds, fake_id=f"diary-row-{index}")
+
+            def child(parent, cls, offset_y, child_height, **attributes):
+                # Children are clipped to the visible part of the row (with zero height if not visible at all)
+                child_bounds = FakeMyFitnessPalApp.clip(
+                    (40, screen_y + offset_y, 1040, screen_y + offset_y + child_height), bounds[1], bounds[3])
+                if (child_bounds is None):
+                    child_bounds = (40, bounds[1], 1040, bounds[1])
+                return FakePhone.add_node(parent, cls, child_bounds, **attributes)
+
+            if (row_type == "Meal"):
+                header = child(row, 'android.widget.RelativeLayout', 0, height,
+                               resource_id=f"{self.mfp}/sectionHeaderRelativeLayout", fake_id=f"diary-row-{index}-header")
+                child(header, 'android.widget.TextView', 20, 70, resource_id=f"{self.mfp}/txtSectionHeader",
+                      text=data, fake_id=f"diary-row-{index}-name")
+
+            elif (row_type == "Food"):
+                meal_index, food_index, food = data
+                item = child(row, 'android.view.ViewGroup', 0, height,
+                             resource_id=f"{self.mfp}/foodSearchViewFoodItem",
+                             fake_action=f"open_food:{meal_index}:{food_index}", fake_id=f"diary-row-{index}-item")
+                child(item, 'android.widget.TextView', 20, 70, resource_id=f"{self.mfp}/txtItemDescription",
+                      text=food["description"], fake_id=f"diary-row-{index}-description")
+                child(item, 'android.widget.TextView', 100, 60, resource_id=f"{self.mfp}/txtItemDetails",
+                      text=food["details"], fake_id=f"diary-row-{index}-details")
+                child(item, 'android.widget.TextView', 20, 70, resource_id=f"{self.mfp}/txtCalories",
+                      text=food["calories"], fake_id=f"diary-row-{index}-calories")
+                if (food["time"] != ""):
+                    child(item, 'android.widget.TextView', 160, 30, resource_id=f"{self.mfp}/entry_timestamp",
+                          text=food["time"], fake_id=f"diary-row-{index}-time")
+
+            else:
+                child(row, 'android.widget.Button', 60, 120, resource_id=f"{self.mfp}/btnComplete",
+                      text="Complete Diary", fake_id=f"diary-row-{index}-complete")
+
+        self.__add_ribbon(top)
+
+    def __build_food(self, top):
+        toolbar = FakePhone.add_node(top, 'android.view.ViewGroup', (0, 63, self.width, 210),
+                                     resource_id=f"{self.mfp}/toolbar_container")
+        FakePhone.add_node(toolbar, 'android.widget.TextView', (40, 90, 600, 180), text="Food Details")
+
+        details = FakePhone.add_node(top, 'android.widget.ScrollView',
+                                     (0, FakeMyFitnessPalApp.details_top, self.width, FakeMyFitnessPalApp.details_bottom))
+        macros = self.food["macros"]
+
+        for index, macro in enumerate(MyFitnessPalAppControl.macro_food_template):
+            screen_y = FakeMyFitnessPalApp.details_top + (index * FakeMyFitnessPalApp.macro_height) - self.food_offset
+            bounds = FakeMyFitnessPalApp.clip((0, screen_y, self.width, screen_y + FakeMyFitnessPalApp.macro_height),
+                                              FakeMyFitnessPalApp.details_top, FakeMyFitnessPalApp.details_bottom)
+            if (bounds is None):
+                continue
+
+            row = FakePhone.add_node(details, 'android.widget.LinearLayout', bounds, fake_id=f"macro-row-{index}")
+            FakePhone.add_node(row, 'android.widget.TextView', (40, bounds[1], 540, bounds[3]), text=macro.title())
+            FakePhone.add_node(row, 'android.widget.TextView', (600, bounds[1], 1040, bounds[3]),
+                               resource_id=MyFitnessPalAppControl.macro_food_template[macro], text=macros[macro],
+                               fake_id=f"macro-row-{index}-value")
+
+    def __build_calendar_header(self, dialog):
+        selected = self.calendar_selected
+        FakePhone.add_node(dialog, 'android.widget.TextView', (60, 380, 800, 480),
+                           resource_id=f"{self.mfp}/mtrl_picker_header_selection_text",
+                           text=f"{selected:%b} {selected.day}, {selected.year}")
+        if (self.screen == "CALENDAR_TEXT"):
+            FakePhone.add_node(dialog, 'android.widget.ImageButton', (900, 380, 1020, 480),
+                               resource_id=f"{self.mfp}/mtrl_picker_header_toggle",
+                               content_desc="Switch to calendar input mode", fake_action="toggle_input")
+            return
+
+        FakePhone.add_node(dialog, 'android.widget.ImageButton', (900, 380, 1020, 480),
+                           resource_id=f"{self.mfp}/mtrl_picker_header_toggle", content_desc="Switch to text input mode",
+                           fake_action="toggle_input")
+
+        pending = date(self.calendar_pending[0], self.calendar_pending[1], 1)
+        FakePhone.add_node(dialog, 'android.widget.Button', (60, 520, 500, 620),
+                           resource_id=f"{self.mfp}/month_navigation_fragment_toggle", text=f"{pending:%B %Y}",
+                           fake_action="toggle_years")
+
+    def __build_calendar(self, top):
+        dialog = FakePhone.add_node(top, 'android.widget.FrameLayout', (0, 300, self.width, 2000))
+        self.__build_calendar_header(dialog)
+
+        FakePhone.add_node(dialog, 'android.widget.ImageButton', (780, 520, 880, 620),
+                           resource_id=f"{self.mfp}/month_navigation_previous", fake_action="month_previous")
+        FakePhone.add_node(dialog, 'android.widget.ImageButton', (920, 520, 1020, 620),
+                           resource_id=f"{self.mfp}/month_navigation_next", fake_action="month_next")
+
+        days = FakePhone.add_node(dialog, 'android.widget.GridView', (0, 700, self.width, 1500),
+                                  resource_id=f"{self.mfp}/mtrl_calendar_selection_frame")
+
+        day = date(self.calendar_pending[0], self.calendar_pending[1], 1)
+        first_column = (day.weekday() + 1) % 7
+        while (day.month == self.calendar_pending[1]):
+            position = first_column + day.day - 1
+            x, y = 40 + (position % 7) * 143, 700 + (position // 7) * 120
+
+            if (day == self.today):
+                description = f"Today {day.strftime(dv.calendar_xml_datestamp_format)}"
+            elif (day.year == self.today.year):
+                description = day.strftime(dv.calendar_xml_datestamp_format)
+            else:
+                description = day.strftime(dv.calendar_xml_datestamp_format_w_year)
+
+            FakePhone.add_node(days, 'android.widget.TextView', (x, y, x + 143, y + 120), text=str(day.day),
+                               content_desc=description, fake_action=f"select_day:{day.isoformat()}")
+            day = day + timedelta(days=1)
+
+        FakePhone.add_node(dialog, 'android.widget.Button', (500, 1850, 740, 1950),
+                           resource_id=f"{self.mfp}/cancel_button", text="Cancel", fake_action="cancel")
+        FakePhone.add_node(dialog, 'android.widget.Button', (780, 1850, 1020, 1950),
+                           resource_id=f"{self.mfp}/confirm_button", text="OK", fake_action="confirm")
+
+    def __build_calendar_text(self, top):
+        dialog = FakePhone.add_node(top, 'android.widget.FrameLayout', (0, 300, self.width, 1000))
+        self.__build_calendar_header(dialog)
+
+        text_input = FakePhone.add_node(dialog, 'android.widget.LinearLayout', (60, 560, 1020, 720),
+                                        resource_id=f"{self.mfp}/mtrl_picker_text_input_date")
+        FakePhone.add_node(text_input, 'android.widget.EditText', (60, 580, 1020, 700),
+                           text=(self.calendar_text if (self.calendar_text != "") else "mm/dd/yyyy"),
+                           fake_text=self.calendar_text, fake_action="input_date")
+
+        FakePhone.add_node(dialog, 'android.widget.Button', (500, 850, 740, 950),
+                           resource_id=f"{self.mfp}/cancel_button", text="Cancel", fake_action="cancel")
+        FakePhone.add_node(dialog, 'android.widget.Button', (780, 850, 1020, 950),
+                           resource_id=f"{self.mfp}/confirm_button", text="OK", fake_action="confirm")
+
+    def __build_years(self, top):
+        dialog = FakePhone.add_node(top, 'android.widget.FrameLayout', (0, 300, self.width, 2000))
+        self.__build_calendar_header(dialog)
+
+        selector = FakePhone.add_node(dialog, 'androidx.recyclerview.widget.RecyclerView', (0, 700, self.width, 1800),
+                                      resource_id=f"{self.mfp}/mtrl_calendar_year_selector_frame")
+
+        for year in range(2000, self.today.year + 6):
+            position = year - 2000
+            x, y = 60 + (position % 3) * 320, 700 + (position // 3) * 200 - self.year_offset
+            bounds = FakeMyFitnessPalApp.clip((x, y, x + 320, y + 200), 700, 1800)
+            if (bounds is None or bounds[3] - bounds[1] < 200):
+                continue
+
+            if (year == self.today.year):
+                description = f"Navigate to current year {year}"
+            else:
+                description = f"Navigate to year {year}"
+
+            FakePhone.add_node(selector, 'android.widget.TextView', bounds, text=str(year), content_desc=description,
+                               fake_action=f"select_year:{year}", fake_id=f"year-{year}")
+
+    def build(self, parent):
+        top = FakePhone.add_node(parent, 'android.widget.FrameLayout', (0, 0, self.width, 2400),
+                                 package="com.myfitnesspal.android")
+
+        match self.screen:
+            case "HOME_TAB":
+                self.__build_home_tab(top)
+            case "DIARY":
+                self.__build_diary(top)
+            case "FOOD":
+                self.__build_food(top)
+            case "CALENDAR":
+                self.__build_calendar(top)
+            case "CALENDAR_TEXT":
+                self.__build_calendar_text(top)
+            case "YEARS":
+                self.__build_years(top)
+
+    # =================================================================================================================
+    # EVENTS
+    # =================================================================================================================
+    def __open_diary(self, diary_date):
+        self.screen = "DIARY"
+        self.diary_date = diary_date
+        self.diary_offset = 0
+
+    def __year_offset_of(self, year):
+        # Offset of the year selector, so that the year is on the top row
+        return ((year - 2000) // 3) * 200
+
+    def on_launch(self):
+        self.screen = "HOME_TAB"
+
+    def on_click(self, action):
+        command, _, argument = action.partition(':')
+
+        match command:
+            case "tab_home":
+                self.screen = "HOME_TAB"
+            case "tab_diary":
+                self.__open_diary(self.today)
+            case "previous_day":
+                self.__open_diary(self.diary_date - timedelta(days=1))
+            case "next_day":
+                self.__open_diary(self.diary_date + timedelta(days=1))
+            case "open_food":
+                meal_index, food_index = [int(x) for x in argument.split(':')]
+                self.food = self.diary_of(self.diary_date)[meal_index][1][food_index]
+                self.food_offset = 0
+                self.screen = "FOOD"
+            case "open_calendar":
+                self.screen = "CALENDAR"
+                self.calendar_selected = self.diary_date
+                self.calendar_pending = (self.diary_date.year, self.diary_date.month)
+            case "month_previous":
+                year, month = self.calendar_pending
+                self.calendar_pending = (year - 1, 12) if (month == 1) else (year, month - 1)
+            case "month_next":
+                year, month = self.calendar_pending
+                self.calendar_pending = (year + 1, 1) if (month == 12) else (year, month + 1)
+            case "toggle_years":
+                if (self.screen == "YEARS"):
+                    self.screen = "CALENDAR"
+                else:
+                    self.screen = "YEARS"
+                    self.year_offset = self.__year_offset_of(self.calendar_pending[0])
+            case "toggle_input":
+                self.screen = "CALENDAR" if (self.screen == "CALENDAR_TEXT") else "CALENDAR_TEXT"
+                self.calendar_text = ""
+            case "select_year":
+                self.calendar_pending = (int(argument), self.calendar_pending[1])
+                self.screen = "CALENDAR"
+            case "select_day":
+                self.calendar_selected = date.fromisoformat(argument)
+            case "confirm":
+                self.__open_diary(self.calendar_selected)
+            case "cancel":
+                self.screen = "DIARY"
+
+    def on_text(self, action, text):
+        if (action != "input_date"):
+            return
+
+        # As the picker does, the selection is updated once a valid date has been entered
+        self.calendar_text = text
+        try:
+            self.calendar_selected = datetime.strptime(text, dv.calendar_text_input_format).date()
+        except ValueError:
+            pass
+
+    def __scroll_range(self):
+        # (name of the offset attribute, maximum offset) of the scrollable view of the current screen, 'None' if the
+        # screen doesn't scroll
+        match self.screen:
+            case "DIARY":
+                return ("diary_offset", self.diary_max_offset())
+            case "FOOD":
+                list_height = len(MyFitnessPalAppControl.macro_food_template) * FakeMyFitnessPalApp.macro_height
+                max_offset = list_height + 20 - (FakeMyFitnessPalApp.details_bottom - FakeMyFitnessPalApp.details_top)
+                return ("food_offset", max(0, max_offset))
+            case "YEARS":
+                return ("year_offset", self.__year_offset_of(self.today.year + 5))
+
+        return None
+
+    def on_swipe(self, start, end, duration):
+        distance = start[1] - end[1]
+        if (duration < 200):
+            distance *= 3       # Fling, so the view will continue to move after the gesture
+
+        scroll_range = self.__scroll_range()
+        if (scroll_range is not None):
+            name, max_offset = scroll_range
+            setattr(self, name, min(max(getattr(self, name) + distance, 0), max_offset))
+
+    def on_script(self, script, args):
+        # 'mobile: flingGesture' upon an area of the screen, returning whether the view can still be scrolled further in
+        # the same direction (as UiAutomator2 does)
+        if (script != "mobile: flingGesture"):
+            raise WebDriverException(f"Script '{script}' is not supported")
+
+        area = args[0]
+        x = area['left'] + (area['width'] // 2)
+        top = area['top'] + (area['height'] // 10)
+        bottom = area['top'] + (9 * area['height'] // 10)
+        if (area['direction'].lower() == "down"):
+            self.on_swipe((x, bottom), (x, top), 50)
+        else:
+            self.on_swipe((x, top), (x, bottom), 50)
+
+        scroll_range = self.__scroll_range()
+        if (scroll_range is None):
+            return False
+
+        name, max_offset = scroll_range
+        if (area['direction'].lower() == "down"):
+            return (getattr(self, name) < max_offset)
+        return (getattr(self, name) > 0)
+
+    def on_back(self):
+        match self.screen:
+            case "FOOD" | "CALENDAR" | "CALENDAR_TEXT" | "YEARS":
+                self.screen = "DIARY"
+            case "DIARY":
+                self.screen = "HOME_TAB"
+            case _:
+                return False
+
+        return True
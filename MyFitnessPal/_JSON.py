@@ -1,60 +1,184 @@
+import atexit
 import json     # Import the json module
+import mmap
+import os
+import time
 
 from MyFitnessPal.AppParameters import AppConfig as dv
 
 # Useful links to understand the layout of the below class.
 #https://www.w3schools.com/python/python_lists.asp
 #https://stackabuse.com/reading-and-writing-json-to-a-file-in-python/
+#https://docs.python.org/3/library/os.html#os.replace
+#https://docs.python.org/3/library/mmap.html
+
+# Writes are buffered ("write-behind"), as re-writing the whole file after every scraped day is O(archive size) per
+# day. 'write_datastore' only writes the file once 'AppConfig.datastore_flush_days' days are waiting, or
+# 'AppConfig.datastore_flush_seconds' have passed since the last write; 'flush' writes whatever is waiting (and is
+# called upon exit). The file is written to a temporary file, fsync'd and renamed over the original, so a crash
+# mid-write leaves the previous version intact rather than a half written file.
+#
+# Reads are lazy. The file is still a single json document (one entry per line), but alongside it is an offset index
+# ('.mem.idx') of the date, byte offset and length of every entry. Upon start-up only the index is read, and each
+# entry is read from a memory map of the file when it is needed ('read_entry'), so start-up time and memory don't grow
+# with the archive. Entries which are not touched are copied across as bytes when the file is next written. A file
+# without a matching index (i.e. written before the index existed, or edited by hand) is read in full once, and
+# re-written with its index.
 
 
 class JSONCtrl:
     fileLocation = ""       # Variable to store the path to where the json file is to be stored
-    curContents = {}        # Current contents of OxaLife that have been captured so far
+    sections = ["DailySummary", "Diary", "Macro"]
+    entries = {}            # section -> [(date, offset, length, data), ...], 'data' is 'None' until read from file
+    pending = 0             # Number of 'write_datastore' calls (days) not yet written to the file
+    last_flush = 0          # time.monotonic() of the last write of the file
 
     #=============================================================================================#
     def read_datastore(self):
+        self.__unmap_file()
+        self.entries = {section: [] for section in JSONCtrl.sections}
+        self.version = dv.app_sw_version
+
+        if (self.__read_index() == 1):                      # Only the index is read, entries are read when needed
+            return
+
         try:                                                # Attempt to read the json file
             temp = open(self.fileLocation, 'r')             # If able to read file
-            self.curContents = json.load(temp)              # Capture the contents in class
+            contents = json.load(temp)                      # Capture the contents in class
             temp.close()                                    # close file
 
-        except:                                             # if unable to read (as not there)
-            self.curContents = {}                           # Define a dictionary
-            self.curContents["app_sw_version"] = dv.app_sw_version
-            self.curContents["DailySummary"] = []
-            self.curContents["Diary"] = []
-            self.curContents["Macro"] = []
+            self.version = contents.get("app_sw_version", dv.app_sw_version)
+            for section in JSONCtrl.sections:
+                self.entries[section] = [(x["date"], None, None, x) for x in contents.get(section, [])]
 
-            self.write_datastore()                          # Then export to data to file
+        except:                                             # if unable to read (as not there), start empty
+            self.entries = {section: [] for section in JSONCtrl.sections}
 
-    def write_datastore(self):                              # Export data to the json file, and override!
-        temp = open(self.fileLocation, 'w')                 # Open file in write mode
-        json.dump(self.curContents, temp, indent = 4)       # Dump JSON data, and make easy to read
-        temp.close()                                        # Close file
+        self.flush()                                        # Then export to data to file, along with its index
 
-    def __init__(self, fileLoc):                            # Constructor for "OxaLifeJSON"
-        self.fileLocation = fileLoc
-        self.read_datastore()
+    def __read_index(self):
+        # Use the index of the file, if it was written alongside the current version of the file
+        try:
+            temp = open(f"{self.fileLocation}.idx", 'r')
+            index = json.load(temp)
+            temp.close()
+            stat = os.stat(self.fileLocation)
 
-    @staticmethod
-    def remove_duplicates_by_date(dict_list):
-        seen_dates = set()
-        unique_dicts = []
+        except (OSError, ValueError):
+            return 0
 
-        for d in dict_list:
-            if d['date'] not in seen_dates:
-                seen_dates.add(d['date'])
-                unique_dicts.append(d)
+        if (index.get("size") != stat.st_size or index.get("mtime_ns") != stat.st_mtime_ns):
+            return 0
 
-        return unique_dicts
+        self.version = index["app_sw_version"]
+        for section in JSONCtrl.sections:
+            self.entries[section] = [(x[0], x[1], x[2], None) for x in index["sections"][section]]
 
-    def __append_general(self, dictionary_name, newData):
-        self.curContents[dictionary_name].insert(0, newData.copy())     # Force latest data to front
+        self.__map_file()
+        return 1
+
+    def __map_file(self):
+        temp = open(self.fileLocation, 'rb')
+        self.mapped = mmap.mmap(temp.fileno(), 0, access=mmap.ACCESS_READ)
+        temp.close()                                        # The map remains valid once the file is closed
+
+    def __unmap_file(self):
+        if (self.mapped is not None):
+            self.mapped.close()
+            self.mapped = None
+
+    def __raw(self, entry):
+        # json of the entry (bytes), without parsing it if it is still within the file
+        (entry_date, offset, length, data) = entry
+        if (data is None):
+            return self.mapped[offset:offset + length]
+
+        return json.dumps(data).encode()
+
+    def __data(self, entry):
+        (entry_date, offset, length, data) = entry
+        if (data is None):
+            return json.loads(self.mapped[offset:offset + length])
 
-        self.curContents[dictionary_name] = JSONCtrl.remove_duplicates_by_date(
-            sorted(self.curContents[dictionary_name], key=lambda x: (x["date"])))
-        # This will first sort based upon the date, then remove any duplicates of entries with the same date
-        # only accepting the first entry; which will be the new entry
+        return data
+
+    #=============================================================================================#
+    def write_datastore(self):                              # Export data to the json file, once the flush policy is met
+        # Returns 1 if the file has been written, 0 if the changes are still waiting (see 'flush')
+        self.pending += 1
+        if (self.pending < self.flush_days and time.monotonic() - self.last_flush < self.flush_seconds):
+            return 0
+
+        self.flush()
+        return 1
+
+    def flush(self):                                        # Export data to the json file, and override!
+        # Each entry is written upon its own line, with its offset/length recorded within the index
+        temporary_file = f"{self.fileLocation}.tmp"
+        index = {section: [] for section in JSONCtrl.sections}
+
+        temp = open(temporary_file, 'wb')                   # Open the temporary file in write mode
+        offset = temp.write(f'{{\n    "app_sw_version": {json.dumps(self.version)}'.encode())
+        for section in JSONCtrl.sections:
+            offset += temp.write(f',\n    "{section}": ['.encode())
+            for number, entry in enumerate(self.entries[section]):
+                offset += temp.write(b'\n        ' if (number == 0) else b',\n        ')
+                raw = self.__raw(entry)
+                index[section].append([entry[0], offset, len(raw)])
+                offset += temp.write(raw)
+            offset += temp.write(b'\n    ]')
+        temp.write(b'\n}\n')
+
+        temp.flush()
+        os.fsync(temp.fileno())                             # Ensure it is on disk, before it replaces the original
+        temp.close()                                        # Close file
+
+        self.__unmap_file()                                 # The file can't be replaced whilst mapped (on Windows)
+        try:
+            os.replace(temporary_file, self.fileLocation)   # Atomic, the file is either the old or new version
+        except:
+            self.__map_file()                               # Entries not held in memory are still read from the
+            raise                                           # previous version of the file
+        self.__write_index(index)
+
+        # Every entry is now within the file, so is no longer held in memory
+        self.entries = {section: [(x[0], x[1], x[2], None) for x in index[section]] for section in JSONCtrl.sections}
+        self.__map_file()
+
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def __write_index(self, index):
+        # Written after the file, so if interrupted the index doesn't match the file and the file is read in full
+        stat = os.stat(self.fileLocation)
+        temporary_file = f"{self.fileLocation}.idx.tmp"
+        temp = open(temporary_file, 'w')
+        json.dump({"app_sw_version": self.version, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                   "sections": index}, temp)
+        temp.flush()
+        os.fsync(temp.fileno())
+        temp.close()
+        os.replace(temporary_file, f"{self.fileLocation}.idx")
+
+    def close_datastore(self):
+        if (self.pending != 0):
+            self.flush()
+        atexit.unregister(self.close_datastore)             # Otherwise the instance is kept until the process exits
+
+    def __init__(self, fileLoc, flush_days=dv.datastore_flush_days, flush_seconds=dv.datastore_flush_seconds):
+        self.fileLocation = fileLoc
+        self.flush_days = flush_days                        # Write the file once this many days are waiting
+        self.flush_seconds = flush_seconds                  # or once this long has passed since it was last written
+        self.last_flush = time.monotonic()
+        self.mapped = None                                  # Memory map of the file, entries are read from this
+        self.read_datastore()
+        atexit.register(self.close_datastore)               # Anything still waiting is written upon exit
+
+    def __append_general(self, dictionary_name, newData):
+        # The new entry replaces any entry with the same date, and the section is kept sorted by date
+        section = [x for x in self.entries[dictionary_name] if (x[0] != newData["date"])]
+        section.append((newData["date"], None, None, newData.copy()))
+        self.entries[dictionary_name] = sorted(section, key=lambda x: x[0])
 
     def append_DailySummary(self, newData):
         self.__append_general("DailySummary", newData)
@@ -63,4 +187,18 @@ class JSONCtrl:
         self.__append_general("Diary", newData)
 
     def append_Macro(self, newData):
-        self.curContents["Macro"].append(newData.copy())
+        self.entries["Macro"].append((newData["date"], None, None, newData.copy()))
+
+    #=============================================================================================#
+    def read_dates(self, section):
+        # Return all the dates (sorted) which have an entry within the section
+        return sorted(set([x[0] for x in self.entries[section]]))
+
+    def read_entry(self, section, entry_date):
+        # Return the entry of the section for the date (format 'YYYY-MM-DD'), or 'None' if there isn't one. Where there
+        # are multiple entries for the same date, the latest is returned
+        for x in reversed(self.entries[section]):
+            if (x[0] == entry_date):
+                return self.__data(x)
+
+        return None
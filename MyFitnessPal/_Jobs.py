@@ -0,0 +1,136 @@
+import json     # Import the json module
+import os
+import threading
+from datetime import date, datetime
+
+from MyFitnessPal.AppParameters import AppConfig as dv
+
+# Journal of a (long running) scrape job, so that it can be resumed from where it stopped (see 'MyFitnessPal.run_job'
+# and the command line interface within '__main__.py'). Each job is a json file within the '.jobs' folder of the
+# datastore, holding:
+#   spec        - what the job is to do ('kind' and the 'dates' to be scraped)
+#   completed   - dates which have been scraped and written to the datastore
+#   partial     - the date currently being scraped, with the diary rows and macros collected so far. So that the foods
+#                 already read are not opened again when the job is resumed
+# The journal is re-written (via a temporary file) after every checkpoint, so it is never left half written. Dates are
+# completed by the pipeline worker once saved (see '_Pipeline.py'), whilst the driver checkpoints the next date, so every
+# change to the journal is made under 'lock'.
+# Once finished, a journal is only kept for reference ('jobs' command), so only the latest 'AppConfig.jobs_retained'
+# finished journals are kept (see 'prune_finished').
+
+
+# noinspection PyRedundantParentheses
+class ScrapeJob:
+    folder_name = ".jobs"
+
+    def __init__(self, fileLoc):
+        self.fileLocation = fileLoc
+        self.job_id = os.path.splitext(os.path.basename(fileLoc))[0]
+        self.contents = {}
+        self.lock = threading.Lock()
+        self.read_journal()
+
+    #=============================================================================================#
+    @staticmethod
+    def folder_of(folder_root):
+        return os.path.join(folder_root, ScrapeJob.folder_name)
+
+    @staticmethod
+    def create(folder_root, kind, dates):
+        # Create the journal of a new job, to scrape the dates
+        folder = ScrapeJob.folder_of(folder_root)
+        os.makedirs(folder, exist_ok=True)
+
+        job_id = f"{kind}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        job = ScrapeJob(os.path.join(folder, f"{job_id}.json"))
+        job.contents = {
+            "spec": {"kind": kind, "dates": [str(x) for x in dates], "created": datetime.now().isoformat()},
+            "completed": [],
+            "partial": None
+        }
+        job.write_journal()
+        return job
+
+    @staticmethod
+    def list_jobs(folder_root):
+        # All the jobs within the folder root, oldest first
+        folder = ScrapeJob.folder_of(folder_root)
+        if (os.path.isdir(folder) is False):
+            return []
+
+        jobs = [ScrapeJob(os.path.join(folder, x)) for x in sorted(os.listdir(folder)) if (x.endswith(".json"))]
+        return sorted(jobs, key=lambda x: x.contents["spec"]["created"])
+
+    @staticmethod
+    def latest_unfinished(folder_root):
+        unfinished = [x for x in ScrapeJob.list_jobs(folder_root) if (x.is_finished() is False)]
+        if (len(unfinished) == 0):
+            return None
+
+        return unfinished[-1]
+
+    @staticmethod
+    def prune_finished(folder_root, retained=dv.jobs_retained):
+        # Remove all but the latest 'retained' finished jobs, returns the number removed
+        finished = [x for x in ScrapeJob.list_jobs(folder_root) if (x.is_finished() is True)]
+        removed = finished[:max(0, len(finished) - retained)]
+        for job in removed:
+            os.remove(job.fileLocation)
+
+        return len(removed)
+
+    #=============================================================================================#
+    def read_journal(self):
+        try:
+            temp = open(self.fileLocation, 'r')
+            self.contents = json.load(temp)
+            temp.close()
+
+        except (OSError, ValueError):
+            self.contents = {"spec": {"kind": "", "dates": [], "created": ""}, "completed": [], "partial": None}
+
+    def write_journal(self):
+        temporary_file = f"{self.fileLocation}.tmp"
+        temp = open(temporary_file, 'w')
+        json.dump(self.contents, temp, indent = 4)
+        temp.flush()
+        os.fsync(temp.fileno())
+        temp.close()
+        os.replace(temporary_file, self.fileLocation)
+
+    #=============================================================================================#
+    def dates(self):
+        return [date.fromisoformat(x) for x in self.contents["spec"]["dates"]]
+
+    def pending_dates(self):
+        completed = set(self.contents["completed"])
+        return [x for x in self.dates() if (str(x) not in completed)]
+
+    def is_finished(self):
+        return (len(self.pending_dates()) == 0)
+
+    def partial_of(self, scrape_date):
+        # The rows/macros collected so far for the date (if it was being scraped when the job stopped), otherwise 'None'
+        partial = self.contents["partial"]
+        if (partial is None or partial["date"] != str(scrape_date)):
+            return None
+
+        return partial
+
+    def checkpoint(self, scrape_date, diary_rows, macros):
+        with self.lock:
+            self.contents["partial"] = {"date": str(scrape_date), "diary": list(diary_rows), "macros": list(macros)}
+            self.write_journal()
+
+    def complete(self, scrape_date):
+        with self.lock:
+            if (str(scrape_date) not in self.contents["completed"]):
+                self.contents["completed"].append(str(scrape_date))
+            if (self.partial_of(scrape_date) is not None):  # Otherwise the partial is of the date now being scraped
+                self.contents["partial"] = None
+            self.write_journal()
+
+    def summary(self):
+        return (f"{self.job_id}: {self.contents['spec']['kind']}, {len(self.contents['completed'])} of "
+                f"{len(self.contents['spec']['dates'])} date(s) complete" +
+                ("" if (self.contents["partial"] is None) else f", partway through {self.contents['partial']['date']}"))
@@ -0,0 +1,200 @@
+import json     # Import the json module
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from MyFitnessPal.AppParameters import AppConfig as dv
+
+# The majority of the foods within the diary repeat day to day. Therefore, the macros read from a food are retained
+# against the food identity (description/details of the diary entry + the servings/units), so that the next time the
+# same food appears in the diary, the macros can be taken from this cache rather than opening the food within the app.
+# Least recently used foods are removed, once the cache exceeds its maximum size.
+
+
+# noinspection PyRedundantParentheses
+class MacroCache:
+    # Macros which are not scaled, when deriving the macros for a different number of servings
+    unscaled_macros = ["meal", "time", "name", "units"]
+    numeric_format = re.compile(r"^(?P<value>\d[\d,]*(?:\.\d+)?)(?P<suffix>.*)$")
+
+    def __init__(self, fileLoc, max_entries=dv.macro_cache_size, derive_servings=dv.macro_cache_derive_servings,
+                 read_only=False):
+        # 'read_only' - the file is owned by another process (see 'scrap_diary_parallel'), so is never written. Any new
+        # entries can be retrieved with 'new_entries' and passed to the owner with 'merge'
+        self.fileLocation = fileLoc
+        self.read_only = read_only
+        self.max_entries = max_entries
+        self.derive_servings = derive_servings
+
+        self.entries = OrderedDict()    # key -> macros, ordered from least to most recently used
+        self.servings_index = {}        # (description, product) -> key, used to derive macros for new serving counts
+                                        # of the same product (see 'product_of')
+        self.modified = False
+        self.stored = []                # Keys stored since the cache was read
+        self.lock = threading.Lock()    # Written by the pipeline worker (see '_Pipeline.py') whilst the driver thread
+                                        # looks up/stores foods
+
+        # Statistics, to see how effective the cache is
+        self.hits = 0
+        self.derived = 0
+        self.misses = 0
+
+        self.read_cache()
+
+    #=============================================================================================#
+    def read_cache(self):
+        self.entries = OrderedDict()
+        self.servings_index = {}
+
+        try:                                                # Attempt to read the json file
+            temp = open(self.fileLocation, 'r')
+            contents = json.load(temp)
+            temp.close()
+
+        except (OSError, ValueError):                       # if unable to read (as not there), start empty
+            return
+
+        if (contents.get("app_sw_version") != dv.app_sw_version):
+            # Resource-ids/layout of the macros may have changed with the app version, so don't trust the contents
+            print("Macro cache was created with a different app version, discarding...")
+            return
+
+        for record in contents.get("entries", []):
+            self.__insert(tuple(record["key"]), record["macros"])
+
+    def write_cache(self):
+        if (self.modified is False or self.read_only is True):
+            return
+
+        with self.lock:
+            contents = {
+                "app_sw_version": dv.app_sw_version,
+                "entries": [{"key": list(key), "macros": macros} for (key, macros) in self.entries.items()]
+            }
+            self.modified = False
+
+        # Written to a temporary file, fsync'd and renamed over the original (as 'ScrapeJob.write_journal'), so a crash
+        # mid-write leaves the previous version of the cache intact
+        temporary_file = f"{self.fileLocation}.tmp"
+        temp = open(temporary_file, 'w')
+        json.dump(contents, temp)
+        temp.flush()
+        os.fsync(temp.fileno())                             # Ensure it is on disk, before it replaces the original
+        temp.close()
+        os.replace(temporary_file, self.fileLocation)       # Atomic, the file is either the old or new version
+
+    #=============================================================================================#
+    @staticmethod
+    def serving_of(details):
+        # Retrieve the number of servings (as a float) and units from the diary entry details. 'None'/"" if the details
+        # are not in the expected format
+        match = re.match(dv.diary_details_serving_format, details)
+        if (match is None):
+            return None, ""
+
+        try:
+            return float(match.group('servings').replace(',', '.')), match.group('units')
+        except ValueError:
+            return None, ""
+
+    @staticmethod
+    def product_of(details):
+        # Details with only the number of servings removed (the brand and units are retained), i.e. 'Quaker, 2 cup' ->
+        # 'Quaker, cup'. So that macros are only derived between servings of the same product. "" if the details are
+        # not in the expected format
+        match = re.match(dv.diary_details_serving_format, details)
+        if (match is None):
+            return ""
+
+        return details[:match.start('servings')] + details[match.end('servings'):].lstrip()
+
+    @staticmethod
+    def servings_key_of(key):
+        return (key[0], MacroCache.product_of(key[1]))
+
+    @staticmethod
+    def key_of(entry):
+        # 'entry' is a diary entry, as returned by 'read_diary_lite_single_entry'
+        servings, units = MacroCache.serving_of(entry['details'])
+        return (entry['description'], entry['details'], units, "" if (servings is None) else f"{servings:g}")
+
+    @staticmethod
+    def scale_macros(macros, ratio):
+        # Return a copy of the macros, with every numeric value multiplied by 'ratio'. 'None' if any of the values
+        # cannot be scaled
+        scaled = macros.copy()
+
+        for macro, value in macros.items():
+            if (macro in MacroCache.unscaled_macros):
+                continue
+
+            match = MacroCache.numeric_format.match(value.strip())
+            if (match is None):
+                return None
+
+            number_text = match.group('value').replace(',', '')
+            decimals = len(number_text.split('.')[1]) if ('.' in number_text) else 0
+            new_value = round(float(number_text) * ratio, decimals)
+            new_text = f"{new_value:.{decimals}f}"
+
+            scaled[macro] = f"{new_text}{match.group('suffix')}"
+
+        return scaled
+
+    #=============================================================================================#
+    def __insert(self, key, macros):
+        self.entries[key] = macros.copy()
+        self.entries.move_to_end(key)
+        if (key[3] != ""):
+            self.servings_index[MacroCache.servings_key_of(key)] = key
+
+        while (len(self.entries) > self.max_entries):
+            old_key, old_macros = self.entries.popitem(last=False)
+            if (self.servings_index.get(MacroCache.servings_key_of(old_key)) == old_key):
+                del self.servings_index[MacroCache.servings_key_of(old_key)]
+
+    def lookup(self, entry):
+        # Return a copy of the cached macros for the diary entry, or 'None' if not known
+        key = MacroCache.key_of(entry)
+        with self.lock:
+            return self.__lookup(key)
+
+    def __lookup(self, key):
+        if (key in self.entries):
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key].copy()
+
+        if (self.derive_servings is True and key[3] != ""):
+            cached_key = self.servings_index.get(MacroCache.servings_key_of(key))
+            if (cached_key is not None and cached_key[3] != "" and float(cached_key[3]) != 0):
+                derived = MacroCache.scale_macros(self.entries[cached_key], float(key[3]) / float(cached_key[3]))
+                if (derived is not None):
+                    self.derived += 1
+                    return derived
+
+        self.misses += 1
+        return None
+
+    def store(self, entry, macros):
+        if (self.max_entries <= 0):
+            return
+
+        with self.lock:
+            self.__insert(MacroCache.key_of(entry), macros)
+            self.stored.append(MacroCache.key_of(entry))
+            self.modified = True
+
+    def new_entries(self):
+        # Entries stored since the cache was read, in a form which can be passed between processes
+        return [(list(key), self.entries[key]) for key in dict.fromkeys(self.stored) if (key in self.entries)]
+
+    def merge(self, entries):
+        # Add the entries (from 'new_entries') of another instance of the cache
+        if (self.max_entries <= 0):
+            return
+
+        for key, macros in entries:
+            self.__insert(tuple(key), macros)
+            self.modified = True
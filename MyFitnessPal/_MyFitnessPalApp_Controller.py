@@ -18,15 +18,25 @@ import time
 # Internal imports/from statements
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 from miAndroid.Controller import AndroidCtrl
+from miAndroid._Snapshot import ScreenSnapshot
 from MyFitnessPal.AppParameters import AppConfig as dv
+from MyFitnessPal._Navigation import NavigationPlanner
 
 
 # noinspection PyRedundantParentheses
 class MyFitnessPalAppControl(AndroidCtrl):
+    locators = AndroidCtrl.locators.extended(dv.locators)   # Phone and MyFitnessPal locators, see 'AndroidCtrl.locator'
 
-    def __init__(self, internal_appium_service=True):
-        AndroidCtrl.__init__(self, internal_appium_service)
+    def __init__(self, internal_appium_service=True, driver=None, server_url=None, capabilities=None,
+                 session_daemon=None):
+        AndroidCtrl.__init__(self, internal_appium_service, driver, server_url, capabilities, session_daemon)
         self.clear_internal_memory_of_diary()
+        self.macro_cache = None     # Optional 'MacroCache', used to skip opening foods whose macros are already known
+        self.navigation = NavigationPlanner()   # Current diary date, and cost of each navigation primitive
+        self.known_macros = None    # Optional (meal, name, calories) -> [macros, ...] of foods already stored for the
+                                    # date being read, see 'MyFitnessPal.refresh_diary_dates'
+        self.progress_callback = None   # Optional function(diary rows, macros), called each time that a food has been
+                                        # opened and its macros read (see 'MyFitnessPal.scrap_diary_dates')
 
         self.app_wait = WebDriverWait(self.driver, dv.app_interaction_wait_time)
 
@@ -43,7 +53,7 @@ class MyFitnessPalAppControl(AndroidCtrl):
     def __check_interface_ribbon(self):
         # Basic interface check, to ensure that the MyFitnessPal app is still up and running
         try:
-            mfp_window = self.driver.find_elements("xpath", "//*[@content-desc]")
+            mfp_window = self.driver.find_elements(*self.locator("described_elements"))
             if (len(mfp_window) < 4):
                 return 0
 
@@ -60,13 +70,26 @@ class MyFitnessPalAppControl(AndroidCtrl):
 
     def __interface_ribbon_location(self):
         try:
-            ribbon = self.driver.find_element("xpath",
-                                              ".//*[@resource-id='com.myfitnesspal.android:id/bottomContainer']")
+            ribbon = self.driver.find_element(*self.locator("interface_ribbon"))
 
             return ribbon.rect
         except NoSuchElementException:
             return 0
 
+    @staticmethod
+    def __interface_ribbon_top_in_snapshot(snapshot):
+        # Snapshot equivalent of the '__interface_ribbon_location' (including the fall back to the navigation bar used
+        # within 'diary_webelement_obscured_level'). If neither are present, then the bottom of the screen is used
+        ribbon = snapshot.find('com.myfitnesspal.android:id/bottomContainer')
+        if (ribbon is None):
+            ribbon = snapshot.find('android:id/navigationBarBackground')
+
+        if (ribbon is None):
+            screen = ScreenSnapshot.rect(snapshot.root[0]) if (len(snapshot.root) != 0) else {'y': 0, 'height': 0}
+            return screen['y'] + screen['height']
+
+        return ScreenSnapshot.rect(ribbon)['y']
+
     def __check_view_is_home_tab(self, silent=False):
         # Verify that the MyFitnessPal app has indeed been opened. This is done by checking for know information on the
         # app main page
@@ -78,10 +101,9 @@ class MyFitnessPalAppControl(AndroidCtrl):
 
         try:
             # Second check, ensure that the 'Today' entry is in current view
-            current_view = self.app_wait.until(EC.visibility_of_element_located(
-                ("xpath", "//*[@resource-id='layoutDashboardParentColumn']")))
+            current_view = self.app_wait.until(EC.visibility_of_element_located(self.locator("home_dashboard")))
 
-            text_element = current_view.find_element("class name", "android.widget.TextView")
+            text_element = current_view.find_element(*self.locator("text_view"))
 
             if (text_element.get_attribute("text").split('\n') == ["Today"]):
                 # Confirm that the only text in the selected element is 'Today'
@@ -114,10 +136,9 @@ class MyFitnessPalAppControl(AndroidCtrl):
 
         try:
             # Second check, ensure that within a tab view, there is text stating "Diary"
-            current_view = self.app_wait.until(EC.visibility_of_element_located(
-                ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/toolbar_container']")))
+            current_view = self.app_wait.until(EC.visibility_of_element_located(self.locator("toolbar_container")))
 
-            text_element = current_view.find_element("class name", "android.widget.TextView")
+            text_element = current_view.find_element(*self.locator("text_view"))
 
             if (text_element.get_attribute("text").split('\n') == ["Diary"]):
                 # Confirm that the only text in the selected element is 'Diary'
@@ -140,35 +161,39 @@ class MyFitnessPalAppControl(AndroidCtrl):
             return 0
 
     def __check_diary_calendar_selected_date(self):
-        selected_date = self.driver.find_element(
-            "xpath", "//*[@resource-id='com.myfitnesspal.android:id/mtrl_picker_header_selection_text']").text
+        selected_date = self.driver.find_element(*self.locator("calendar_selected_date")).text
         selected_date = datetime.strptime(selected_date, "%b %d, %Y").date()
         # Format - Jan 4, 2025
         return selected_date
 
     def __check_diary_calendar_pending_date(self):
-        pending_date = self.driver.find_element(
-            "xpath", "//*[@resource-id='com.myfitnesspal.android:id/month_navigation_fragment_toggle']").text
+        pending_date = self.driver.find_element(*self.locator("calendar_pending_date")).text
         pending_date = datetime.strptime(pending_date, "%B %Y").date()
         # Format - January 2025
         return pending_date
 
+    def classify_view(self, snapshot=None):
+        # Identify the current view (MyFitnessPal or phone) from a single capture of the screen, see
+        # 'AndroidCtrl.classify_screen' and 'AppConfig.view_signatures'. Cheap enough to be used to confirm the state
+        # before/after each navigation action
+        return self.classify_screen(dv.view_signatures, snapshot)
+
     def what_is_active_view(self, silent=True):
-        if (self.__check_view_is_home_tab(silent=silent) == 1):
-            print("The current view is the HOME TAB screen")
-            return 1
+        snapshot = self.wait_for_settle()
+        screen = self.classify_view(snapshot if (snapshot != 0) else None)
+        if (silent is False):
+            print(f"Classified view '{screen['view']}', data - {screen['data']}")
 
-        if (self.__check_view_is_diary(silent=silent) == 1):
-            print("The current view is the DIARY TAB screen")
-            return 1
+        if (screen["view"] == "MFP_OTHER"):
+            print("Unable to determine the viewset, however believe it is not a MyFitnessPal viewset")
+            return 0
 
-        if (self.__check_interface_ribbon() == 0):
+        if (screen["view"] not in [view for (view, signature) in dv.view_signatures]):
             print("The current view is not a recognised MyFitnessPal viewset")
             return 0
 
-        # If reached this point, then unable to determine the view. Hence exit
-        print("Unable to determine the viewset, however believe it is not a MyFitnessPal viewset")
-        return 0
+        print(f"The current view is the {screen['view'].replace('_', ' ')} screen")
+        return 1
 
     @staticmethod
     def check_diary_entry(web_element):
@@ -186,7 +211,7 @@ class MyFitnessPalAppControl(AndroidCtrl):
 
         # Find the immediate children to the element provided as input
         try:
-            element_child = web_element.find_elements("xpath", ".//child::*")
+            element_child = web_element.find_elements(*MyFitnessPalAppControl.locators.get("entry_children"))
             quick_list = [e.get_attribute('resource-id') for e in element_child]
 
         except NoSuchElementException:
@@ -211,6 +236,16 @@ class MyFitnessPalAppControl(AndroidCtrl):
         else:
             return 0
 
+    @staticmethod
+    def check_diary_entry_in_snapshot(node):
+        # Snapshot equivalent of 'check_diary_entry', where 'node' is an element of a 'ScreenSnapshot'
+        quick_list = ScreenSnapshot.resource_ids(node)
+
+        if (dv.meal_name_header in quick_list or dv.diary_entry in quick_list):
+            return 1
+        else:
+            return 0
+
     # =================================================================================================================
     # NAVIGATION
     # ----------
@@ -224,14 +259,15 @@ class MyFitnessPalAppControl(AndroidCtrl):
         # Open up the OxaLife app, which is located within the Top Level Automated Folder
         try:
             self.open_app_folder()  # First open the top level folder (assumes that this hasn't been opened yet)
-            self.app_wait.until(EC.element_to_be_clickable(("xpath", "//*[@text='MyFitnessPal']"))).click()
+            self.app_wait.until(EC.element_to_be_clickable(self.locator("app_icon"))).click()
             # Look for and open the "Oxa Life" App
-            time.sleep(3)
-            # Prior to doing the check, give the app slightly longer to load than typically used. So do 3 checks,
-            # spaced out by ~2s
+            # Prior to doing the check, give the app slightly longer to load than typically used. So wait for the
+            # interface ribbon to be present, and then do up to 3 checks
+            self.wait_for_settle(resource_id='com.myfitnesspal.android:id/bottomContainer',
+                                 max_wait=dv.app_launch_max_wait)
             count = 3
-            while (self.__check_interface_ribbon() != 1 or count == 0):
-                time.sleep(2)
+            while (self.__check_interface_ribbon() != 1 and count > 0):
+                self.wait_for_settle(resource_id='com.myfitnesspal.android:id/bottomContainer')
                 count = count - 1
 
             # Confirm that the app has opened correctly.
@@ -246,9 +282,8 @@ class MyFitnessPalAppControl(AndroidCtrl):
 
     def open_diary_tab(self):
         try:
-            self.app_wait.until(EC.element_to_be_clickable(
-                ("xpath", "//*[contains(@resource-id, 'com.myfitnesspal.android:id/action_diary')]"))).click()
-            time.sleep(3)
+            self.click_element(self.locator("diary_tab"), "open_diary_tab", self.app_wait)
+            self.wait_for_settle(resource_id='com.myfitnesspal.android:id/diary_recycler_view')
 
             # Confirm that the app has opened correctly.
             return self.__check_view_is_diary()
@@ -260,7 +295,44 @@ class MyFitnessPalAppControl(AndroidCtrl):
             print("Encountered a stale WebElement error whilst trying to select the 'Diary' tab...")
             return 0
 
-    def open_diary_date(self, requested_date):
+    def __open_diary_date_by_text(self, requested_date):
+        # Fast path of 'open_diary_date', switch the calendar to its text input mode and type in the date. Returns 0
+        # (with the calendar closed) if this fails, so that the months/years can be stepped through instead, or -1 if
+        # the calendar doesn't have the text input (its toggle/field can't be found)
+        start_time = time.perf_counter()
+        finding_text_input = False      # Whilst the toggle/field are being looked for
+        missing = False
+        try:
+            self.driver.find_element(*self.locator("date_bar")).click()
+            finding_text_input = True
+            self.app_wait.until(EC.element_to_be_clickable(self.locator("calendar_input_toggle"))).click()
+
+            text_field = self.app_wait.until(EC.visibility_of_element_located(self.locator("calendar_text_input")))
+            finding_text_input = False
+            text_field.clear()
+            text_field.send_keys(requested_date.strftime(dv.calendar_text_input_format))
+
+            if (self.__check_diary_calendar_selected_date() == requested_date):
+                print(f"Requested {requested_date} date has been entered")
+                self.driver.find_element(*self.locator("calendar_confirm")).click()
+                self.navigation.record("text_input", time.perf_counter() - start_time)
+                self.navigation.set_current_date(requested_date)
+                return 1
+
+            print(f"Calendar has not accepted '{requested_date.strftime(dv.calendar_text_input_format)}'...")
+
+        except (TimeoutException, NoSuchElementException, StaleElementReferenceException, ValueError) as e:
+            print("Unable to enter the date into the calendar text input...")
+            missing = (finding_text_input is True and isinstance(e, (TimeoutException, NoSuchElementException)))
+
+        # Close the calendar (if open), leaving the diary as it was
+        if (self.classify_view()["view"] != "DIARY"):
+            self.back()
+            self.wait_for_settle(resource_id='com.myfitnesspal.android:id/date_bar')
+        return -1 if (missing is True) else 0
+
+    def open_diary_date(self, requested_date, text_input=True):
+        # 'text_input' - attempt to enter the date as text first (if enabled, see 'AppConfig.calendar_text_input')
         if isinstance(requested_date, date) and not isinstance(requested_date, datetime):
             # Do nothing if the parameter is of type datetime.date
             pass
@@ -280,37 +352,49 @@ class MyFitnessPalAppControl(AndroidCtrl):
         target_date_w_year  = requested_date.strftime(dv.calendar_xml_datestamp_format_w_year)
 
         # First ensure that the current view is the diary:
-        if (self.__check_view_is_diary(silent=True) != 1):
+        if (self.classify_view()["view"] != "DIARY"):
             print("Current view isn't the diary, so exiting...")
             return 0
 
+        if (text_input is True and self.navigation.text_input_available is True):
+            result = self.__open_diary_date_by_text(requested_date)
+            self.navigation.record_text_input(result == 1, missing=(result == -1))
+            if (result == 1):
+                return 1
+
+            print("Falling back to stepping through the calendar...")
+
+        # Time spent in each part, to update the costs used by the navigation planner
+        start_time = time.perf_counter()
+        year_time = 0
+        month_time = 0
+
         try:
             # Open up the diary calendar view:
-            self.driver.find_element("xpath", "//*[@resource-id='com.myfitnesspal.android:id/date_bar']").click()
+            self.driver.find_element(*self.locator("date_bar")).click()
 
             # Confirm view
-            self.app_wait.until(EC.visibility_of_all_elements_located(
-                ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/mtrl_calendar_selection_frame']")))
+            self.app_wait.until(EC.visibility_of_all_elements_located(self.locator("calendar_selection_frame")))
             # NOTE - the entry below this is 'com.myfitnesspal.android:id/mtrl_calendar_day_selector_frame'
 
             # Ready the current date selected, and convert into 'datetime' format, and check against intended date
             if (self.__check_diary_calendar_selected_date() == requested_date):
                 print("Requested date is already in active view")
-                self.driver.find_element("xpath",
-                                         "//*[@resource-id='com.myfitnesspal.android:id/cancel_button']").click()
+                self.driver.find_element(*self.locator("calendar_cancel")).click()
+                self.navigation.set_current_date(requested_date)
                 return 1
 
             # As well as the "SELECTED DATE" (big text on top of window). There is also the 'pending date', which is
             # the date/year that is currently on view for the user to select, and until a new date has been selected the
             # "SELECTED DATE" will not be updated
             if (target_year != self.__check_diary_calendar_pending_date().year):
+                year_start_time = time.perf_counter()
+                year_scrolls = 0
                 # Open year view
-                self.driver.find_element(
-                    "xpath", "//*[@resource-id='com.myfitnesspal.android:id/month_navigation_fragment_toggle']").click()
+                self.driver.find_element(*self.locator("calendar_pending_date")).click()
 
                 # Confirm view
-                self.app_wait.until(EC.visibility_of_all_elements_located(
-                    ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/mtrl_calendar_year_selector_frame']")))
+                self.app_wait.until(EC.visibility_of_all_elements_located(self.locator("calendar_year_selector")))
 
                 # SOME LEVEL OF SCROLLING TO BE INTRODUCED
                 # Confirm if the current view has the year of interest. So create a list of all the years on view, they
@@ -322,10 +406,7 @@ class MyFitnessPalAppControl(AndroidCtrl):
                 while (scroll_attempts != 0):
                     current_years_on_view = [int(x.get_attribute("content-desc").split(' ')[-1])
                                              for x
-                                             in self.driver.find_elements(
-                            "xpath",
-                            "//*[contains(@content-desc, 'Navigate to ') and "
-                            "contains(@content-desc, ' year ')]")]
+                                             in self.driver.find_elements(*self.locator("calendar_years"))]
 
                     if (target_year in current_years_on_view):
                         break
@@ -343,13 +424,16 @@ class MyFitnessPalAppControl(AndroidCtrl):
                         else:
                             max_year_text = f'Navigate to year {max(current_years_on_view)}'
 
-                        min_web_element = self.driver.find_element("xpath", f"//*[@content-desc='{min_year_text}']")
-                        max_web_element = self.driver.find_element("xpath", f"//*[@content-desc='{max_year_text}']")
+                        min_web_element = self.driver.find_element(*self.locator("content_desc", min_year_text))
+                        max_web_element = self.driver.find_element(*self.locator("content_desc", max_year_text))
 
+                        scroll_start_time = time.perf_counter()
                         if (target_year < min(current_years_on_view)):
                             self.driver.scroll(min_web_element, max_web_element, 5000)  # Take 5s
                         else:
                             self.driver.scroll(max_web_element, min_web_element, 5000)  # Take 5s
+                        self.navigation.record("year_scroll", time.perf_counter() - scroll_start_time)
+                        year_scrolls = year_scrolls + 1
 
                         # Some level of infinite loop control
                         scroll_attempts = scroll_attempts - 1
@@ -358,13 +442,17 @@ class MyFitnessPalAppControl(AndroidCtrl):
                     year_string = f'Navigate to current year {target_year}'
                 else:
                     year_string = f'Navigate to year {target_year}'
-                self.driver.find_element("xpath", f"//*[@content-desc='{year_string}']").click()
+                self.driver.find_element(*self.locator("content_desc", year_string)).click()
 
                 # Confirm that the YEAR has been captured in 'pending date'
                 if (target_year != self.__check_diary_calendar_pending_date().year):
                     print("Error encountered when attempting to select the YEAR. Please investigate code...")
                     return 0
 
+                year_time = time.perf_counter() - year_start_time
+                self.navigation.record("year_picker",
+                                       year_time - year_scrolls * self.navigation.costs["year_scroll"])
+
             # CORRECT YEAR SHOULD NOW BE SELECTED
 
             if (target_month != self.__check_diary_calendar_pending_date().month):
@@ -373,13 +461,17 @@ class MyFitnessPalAppControl(AndroidCtrl):
                 # next months
 
                 if (month_delta < 0):
-                    search_text = 'com.myfitnesspal.android:id/month_navigation_previous'
+                    month_button = self.locator("calendar_month_previous")
                 else:
-                    search_text = 'com.myfitnesspal.android:id/month_navigation_next'
+                    month_button = self.locator("calendar_month_next")
 
+                month_start_time = time.perf_counter()
                 for months_to_skip in range(0, abs(month_delta)):
-                    self.driver.find_element("xpath", f"//*[@resource-id='{search_text}']").click()
-                    time.sleep(2)
+                    self.driver.find_element(*month_button).click()
+                    self.wait_for_settle()  # Month change is animated
+
+                month_time = time.perf_counter() - month_start_time
+                self.navigation.record("month_arrow", month_time, abs(month_delta))
 
                 # Confirm that the MONTH has been captured in 'pending date'
                 if (target_month != self.__check_diary_calendar_pending_date().month):
@@ -393,19 +485,20 @@ class MyFitnessPalAppControl(AndroidCtrl):
                     target_date_text = f"Today {target_date_text}"
 
                 print(f"Searching for -> '{target_date_text}' ", end="")
-                self.driver.find_element("xpath", f"//*[@content-desc='{target_date_text}']").click()
+                self.driver.find_element(*self.locator("content_desc", target_date_text)).click()
                 print("Success!")
 
             except NoSuchElementException:
                 print("Failure...attempting including year...")
                 print(f"Searching for -> '{target_date_w_year}'")
-                self.driver.find_element("xpath", f"//*[@content-desc='{target_date_w_year}']").click()
+                self.driver.find_element(*self.locator("content_desc", target_date_w_year)).click()
 
             # Confirm that the date has been selected
             if (self.__check_diary_calendar_selected_date() == requested_date):
                 print(f"Requested {requested_date} date has been selected")
-                self.driver.find_element("xpath",
-                                         "//*[@resource-id='com.myfitnesspal.android:id/confirm_button']").click()
+                self.driver.find_element(*self.locator("calendar_confirm")).click()
+                self.navigation.record("calendar", time.perf_counter() - start_time - year_time - month_time)
+                self.navigation.set_current_date(requested_date)
                 return 1
 
             else:
@@ -418,9 +511,9 @@ class MyFitnessPalAppControl(AndroidCtrl):
 
     def previous_day(self):
         try:
-            day_navigation = self.app_wait.until(EC.visibility_of_element_located(
-                ("xpath", ".//*[@resource-id='com.myfitnesspal.android:id/btnPrevious']")))
-            day_navigation.click()
+            self.click_element(self.locator("previous_day"), "previous_day", self.app_wait)
+            if (self.navigation.current_date is not None):
+                self.navigation.set_current_date(self.navigation.current_date + timedelta(days=-1))
             return 1
 
 
@@ -429,22 +522,101 @@ class MyFitnessPalAppControl(AndroidCtrl):
 
     def next_day(self):
         try:
-            day_navigation = self.app_wait.until(EC.visibility_of_element_located(
-                ("xpath", ".//*[@resource-id='com.myfitnesspal.android:id/btnNext']")))
-            day_navigation.click()
+            self.click_element(self.locator("next_day"), "next_day", self.app_wait)
+            if (self.navigation.current_date is not None):
+                self.navigation.set_current_date(self.navigation.current_date + timedelta(days=1))
             return 1
 
 
         except (TimeoutException, NoSuchElementException, StaleElementReferenceException) as e:
             return 0
 
+    def current_diary_date(self):
+        # Date shown by the diary (as known by the navigation planner), read from the screen if not known. 'None' if
+        # the diary isn't the current view, or its date isn't recognised
+        if (self.navigation.current_date is None):
+            screen = self.classify_view()
+            if (screen["view"] == "DIARY" and screen["data"]["date"] is not None):
+                try:
+                    self.navigation.set_current_date(MyFitnessPalAppControl.parse_diary_date(screen["data"]["date"]))
+                except ValueError:
+                    pass    # Date not recognised, so the planner will use the calendar
+
+        return self.navigation.current_date
+
+    def goto_diary_date(self, requested_date):
+        # Move the diary to the requested date, using whichever route the navigation planner determines to be the
+        # cheapest from the current date - the day arrows, or the calendar ('open_diary_date')
+        requested_date = NavigationPlanner.as_date(requested_date)
+
+        if (self.current_diary_date() is None):
+            if (self.classify_view()["view"] != "DIARY"):
+                print("Current view isn't the diary, so exiting...")
+                return 0
+
+        route = self.navigation.plan(requested_date)
+        if (route == "none"):
+            if (self.classify_view()["view"] == "DIARY"):
+                return 1
+
+            # Left upon another view (i.e. a food, by a scrap which failed partway through), so the diary may no longer
+            # be showing the date that the planner holds
+            print(f"Current view isn't the diary of {requested_date}, returning to the diary...")
+            self.return_to_diary()
+            if (self.current_diary_date() is None):
+                print("Current view isn't the diary, so exiting...")
+                return 0
+
+            route = self.navigation.plan(requested_date)
+            if (route == "none"):
+                return 1
+
+        if (route == "day_arrow"):
+            start_time = time.perf_counter()
+            days = (requested_date - self.navigation.current_date).days
+
+            for step in range(abs(days)):
+                result = self.previous_day() if (days < 0) else self.next_day()
+                if (result == 0):
+                    break
+            click_time = time.perf_counter() - start_time   # Settling excluded, as is the case for the calendar
+
+            snapshot = self.wait_for_settle(resource_id='com.myfitnesspal.android:id/diary_recycler_view')
+            screen = self.classify_view(snapshot if (snapshot != 0) else None)
+            try:
+                if (screen["view"] == "DIARY" and screen["data"]["date"] is not None and
+                        MyFitnessPalAppControl.parse_diary_date(screen["data"]["date"]).date() == requested_date):
+                    self.navigation.record("day_arrow", click_time, abs(days))
+                    return 1
+            except ValueError:
+                pass
+
+            # Clicks may have been missed, so the current date is no longer known. Fall back to the calendar
+            print(f"Diary isn't showing {requested_date} after {abs(days)} day(s), using the calendar...")
+            self.navigation.set_current_date(None)
+
+        result = self.retry.run("open_diary_date", self.open_diary_date, requested_date,
+                                text_input=(route != "calendar"), retry_if=lambda x: x == 0,
+                                recover=self.return_to_diary)
+        if (result == 0):
+            self.return_to_diary()    # So that the following date can still be attempted
+        return result
+
+    def return_to_diary(self):
+        # Recovery between retries (see '_Retry.py') or after a failed scrap, back out of the food/calendar view that a
+        # failed operation may have left open. The date shown may then no longer be the one expected, so it is read
+        # again when next needed
+        self.navigation.set_current_date(None)
+        if (self.classify_view()["view"] in ("FOOD_DETAIL", "CALENDAR", "CALENDAR_TEXT", "CALENDAR_YEARS")):
+            self.back()
+            self.wait_for_settle(resource_id='com.myfitnesspal.android:id/diary_recycler_view')
+
     def find_diary_entries(self):
         # Function will retrieve and return all WebElements which are determined to be valid diary entries
         try:
             # XPATH search for an element with resource-id = "com.myfitnesspal.android:id/diary_recycler_view", and
             # return ALL child under this WebElement (/child::*)
-            diary_recycler = self.driver.find_elements("xpath",
-                              "//*[@resource-id='com.myfitnesspal.android:id/diary_recycler_view']/child::*")
+            diary_recycler = self.driver.find_elements(*self.locator("diary_entries"))
 
             return [entry for entry in diary_recycler if self.check_diary_entry(entry) == 1]
 
@@ -456,9 +628,65 @@ class MyFitnessPalAppControl(AndroidCtrl):
             return 0
 
     def __find_visible_diary_entries(self):
-        current_web_entries = self.find_diary_entries()  # Get all the current diary entries
-        current_web_entries = [x for x in current_web_entries if (self.diary_webelement_obscured_level(x) == 0)]
-        return (current_web_entries)
+        return [web_element for (web_element, rect) in self.__find_visible_diary_entries_with_rects()]
+
+    def __find_visible_diary_entries_with_rects(self):
+        # Returns a list of (WebElement, rect) for every diary entry which isn't obscured by the interface ribbon. The
+        # bounds of the entries (and of the ribbon) are taken from a single capture of the screen, and matched to the
+        # WebElements by their position within the recycler view. So that filtering costs no request per entry
+        try:
+            diary_recycler = self.driver.find_elements(*self.locator("diary_entries"))
+        except NoSuchElementException:
+            return []
+
+        snapshot = self.get_screen_snapshot()
+        nodes = snapshot.children('com.myfitnesspal.android:id/diary_recycler_view')
+        if (len(nodes) != len(diary_recycler)):
+            # Screen has changed between the two requests, so fall back to querying each entry
+            diary_entries = self.find_diary_entries()
+            if (diary_entries == 0):
+                return []
+
+            visible_entries = []
+            for web_element in diary_entries:
+                rect = web_element.rect
+                if (self.diary_webelement_obscured_level(web_element, rect) == 0):
+                    visible_entries.append((web_element, rect))
+            return visible_entries
+
+        ribbon_top = MyFitnessPalAppControl.__interface_ribbon_top_in_snapshot(snapshot)
+        visible_entries = []
+        for web_element, node in zip(diary_recycler, nodes):
+            rect = ScreenSnapshot.rect(node)
+            if (MyFitnessPalAppControl.check_diary_entry_in_snapshot(node) == 1 and
+                    MyFitnessPalAppControl.rect_obscured_level(rect, ribbon_top) == 0):
+                visible_entries.append((web_element, rect))
+
+        return visible_entries
+
+    @staticmethod
+    def find_diary_entries_in_snapshot(snapshot):
+        # Snapshot equivalent of 'find_diary_entries'
+        diary_recycler = snapshot.children('com.myfitnesspal.android:id/diary_recycler_view')
+        return [entry for entry in diary_recycler if MyFitnessPalAppControl.check_diary_entry_in_snapshot(entry) == 1]
+
+    @staticmethod
+    def find_visible_diary_entries_in_snapshot(snapshot):
+        # Returns a list of (entry, rect) for every diary entry in the snapshot, which isn't obscured by the interface
+        # ribbon. Where 'entry' is in the same format as returned by 'read_diary_lite_single_entry'
+        ribbon_top = MyFitnessPalAppControl.__interface_ribbon_top_in_snapshot(snapshot)
+        visible_entries = []
+
+        for node in MyFitnessPalAppControl.find_diary_entries_in_snapshot(snapshot):
+            rect = ScreenSnapshot.rect(node)
+            if (MyFitnessPalAppControl.rect_obscured_level(rect, ribbon_top) != 0):
+                continue
+
+            entry = MyFitnessPalAppControl.read_diary_lite_single_entry_in_snapshot(snapshot, node)
+            if (entry != 0):
+                visible_entries.append((entry, rect))
+
+        return visible_entries
 
     # =================================================================================================================
     # READ DATA
@@ -478,7 +706,9 @@ class MyFitnessPalAppControl(AndroidCtrl):
         "type": "",  # 'Meal', 'Food', 'Water', 'Fasting'
         "name": "",
         "time": "",
-        "calories": ""
+        "calories": "",
+        "description": "",  # 'name' is made up of "<description>, <details>", both of which are retained separately
+        "details": ""       # for use within the 'MacroCache'
     }
     external_food_diary_template = {
         "meal": "",
@@ -498,7 +728,7 @@ class MyFitnessPalAppControl(AndroidCtrl):
 
         try:
             # Of the web_element provided, retrieve the elements directly below this
-            element_child = web_element.find_elements("xpath", ".//child::*")
+            element_child = web_element.find_elements(*MyFitnessPalAppControl.locators.get("entry_children"))
             quick_list = [e.get_attribute('resource-id') for e in element_child]
 
         except NoSuchElementException:
@@ -514,9 +744,7 @@ class MyFitnessPalAppControl(AndroidCtrl):
         try:
             if dv.meal_name_header in quick_list:
                 # If the element is a "Meal Header" than
-                meal_name = web_element.find_element(
-                    "xpath", ".//*[@resource-id='com.myfitnesspal.android:id/txtSectionHeader']"
-                ).text
+                meal_name = web_element.find_element(*MyFitnessPalAppControl.locators.get("section_header")).text
                 toplevel_diary_entry['type'] = 'Meal'
                 toplevel_diary_entry['name'] = meal_name
                 return toplevel_diary_entry
@@ -534,28 +762,22 @@ class MyFitnessPalAppControl(AndroidCtrl):
         try:
             if dv.diary_entry in quick_list:
                 # If the element is a "Diary Entry" than
-                item_description = web_element.find_element(
-                    "xpath", ".//*[@resource-id='com.myfitnesspal.android:id/txtItemDescription']"
-                ).text
+                item_description = web_element.find_element(*MyFitnessPalAppControl.locators.get("item_description")).text
                 textfound = f"Found 'Description' - {item_description}"
 
-                item_details = web_element.find_element(
-                    "xpath", ".//*[@resource-id='com.myfitnesspal.android:id/txtItemDetails']"
-                ).text
+                item_details = web_element.find_element(*MyFitnessPalAppControl.locators.get("item_details")).text
                 textfound = f"{textfound}Found 'Details' - {item_details}"
 
-                item_calories = web_element.find_element(
-                    "xpath", ".//*[@resource-id='com.myfitnesspal.android:id/txtCalories']"
-                ).text
+                item_calories = web_element.find_element(*MyFitnessPalAppControl.locators.get("item_calories")).text
                 textfound = f"{textfound}Found 'Calories' - {item_calories}"
                 # TODO, can I make use of EC.staleness_of()
 
                 try:
-                    entry_time = web_element.find_element(
-                        "xpath", ".//*[@resource-id='com.myfitnesspal.android:id/entry_timestamp']"
-                    ).text
+                    entry_time = web_element.find_element(*MyFitnessPalAppControl.locators.get("entry_timestamp")).text
                     toplevel_diary_entry['type'] = 'Food'
                     toplevel_diary_entry['name'] = f"{item_description}, {item_details}"
+                    toplevel_diary_entry['description'] = item_description
+                    toplevel_diary_entry['details'] = item_details
                     toplevel_diary_entry['time'] = entry_time
                     toplevel_diary_entry['calories'] = item_calories
                     return toplevel_diary_entry
@@ -563,6 +785,8 @@ class MyFitnessPalAppControl(AndroidCtrl):
                 except NoSuchElementException:
                     toplevel_diary_entry['type'] = 'Food'
                     toplevel_diary_entry['name'] = f"{item_description}, {item_details}"
+                    toplevel_diary_entry['description'] = item_description
+                    toplevel_diary_entry['details'] = item_details
                     toplevel_diary_entry['time'] = ""
                     toplevel_diary_entry['calories'] = item_calories
 
@@ -581,21 +805,54 @@ class MyFitnessPalAppControl(AndroidCtrl):
         print("Unrecognised element provided, exiting...")
         return 0
 
-    def diary_webelement_obscured_level(self, web_element):
-        # Function will calculate how obscured the element is, relative to the interface ribbon
+    @staticmethod
+    def read_diary_lite_single_entry_in_snapshot(snapshot, node):
+        # Snapshot equivalent of 'read_diary_lite_single_entry', where 'node' is an element of the 'snapshot'
+        toplevel_diary_entry = MyFitnessPalAppControl.internal_food_dairy_generic_template.copy()
+        quick_list = ScreenSnapshot.resource_ids(node)
+
+        if dv.meal_name_header in quick_list:
+            # If the element is a "Meal Header" than
+            meal_name = snapshot.find_text('com.myfitnesspal.android:id/txtSectionHeader', node)
+            if (meal_name is None):
+                print("Error encountered whilst attempting to retrieve the Meal Name...")
+                return 0
+
+            toplevel_diary_entry['type'] = 'Meal'
+            toplevel_diary_entry['name'] = meal_name
+            return toplevel_diary_entry
+
+        if dv.diary_entry in quick_list:
+            # If the element is a "Diary Entry" than
+            item_description = snapshot.find_text('com.myfitnesspal.android:id/txtItemDescription', node)
+            item_details = snapshot.find_text('com.myfitnesspal.android:id/txtItemDetails', node)
+            item_calories = snapshot.find_text('com.myfitnesspal.android:id/txtCalories', node)
+
+            if (item_description is None or item_details is None or item_calories is None):
+                # TODO May get to this entry if there is a note written. Need to get the function to recognise this
+                print(f"Error encountered whilst attempting to retrieve the Food Diary Entry. Found 'Description' - "
+                      f"{item_description}, 'Details' - {item_details}, 'Calories' - {item_calories}")
+                return 0
+
+            entry_time = snapshot.find_text('com.myfitnesspal.android:id/entry_timestamp', node)
+
+            toplevel_diary_entry['type'] = 'Food'
+            toplevel_diary_entry['name'] = f"{item_description}, {item_details}"
+            toplevel_diary_entry['description'] = item_description
+            toplevel_diary_entry['details'] = item_details
+            toplevel_diary_entry['time'] = entry_time if (entry_time is not None) else ""
+            toplevel_diary_entry['calories'] = item_calories
+            return toplevel_diary_entry
+
+        print("Unrecognised element provided, exiting...")
+        return 0
+
+    @staticmethod
+    def rect_obscured_level(rect, ribbon_top):
+        # Calculate how obscured the 'rect' (format of 'WebElement.rect') is, relative to the top of interface ribbon
         # "0" being not obscured, and "100" being totally hidden
-        ribbon_top = self.__interface_ribbon_location()
-        if (ribbon_top == 0):
-            ribbon = self.driver.find_element(
-                "xpath", ".//*[@resource-id='android:id/navigationBarBackground']")
-
-            ribbon = ribbon.rect
-            ribbon['y'] += 0            # This part of the function isn't really needed, however included as part of
-            ribbon_top = ribbon['y']    # troubleshooting
-        else:
-            ribbon_top = ribbon_top['y']
-        element_top = web_element.rect['y']
-        element_height = web_element.rect['height']
+        element_top = rect['y']
+        element_height = rect['height']
 
         if ((element_top + element_height) < ribbon_top):
             # If the bottom of the element is above the ribbon_top, then return "0"
@@ -617,7 +874,35 @@ class MyFitnessPalAppControl(AndroidCtrl):
 
         return return_element
 
+    def __navigation_bar_location(self):
+        try:
+            return self.driver.find_element(*self.locator("navigation_bar")).rect
+        except NoSuchElementException:
+            return 0
+
+    def diary_webelement_obscured_level(self, web_element, rect=None, view="DIARY"):
+        # Function will calculate how obscured the element is, relative to the interface ribbon
+        # "0" being not obscured, and "100" being totally hidden
+        # 'rect' - bounds of the element, if already known (otherwise read from the element)
+        # 'view' - the food details view ("FOOD_DETAIL") has no interface ribbon, so the navigation bar is used instead
+        # The bounds of the ribbon/navigation bar are only found once per session/orientation ('cached_geometry')
+        ribbon = 0
+        if (view == "DIARY"):
+            ribbon = self.cached_geometry("interface_ribbon", self.__interface_ribbon_location)
+        if (ribbon == 0):
+            ribbon = self.cached_geometry("navigation_bar", self.__navigation_bar_location)
+        if (ribbon == 0):
+            raise NoSuchElementException("Neither the interface ribbon or navigation bar are present")
+
+        rect = web_element.rect if (rect is None) else rect
+        return MyFitnessPalAppControl.rect_obscured_level(rect, ribbon['y'])
+
     def swipe_to_extreme_of_diary(self, direction="BOTTOM"):
+        if (dv.diary_scroll_mode == "fling"):
+            if (self.fling_to_extreme('com.myfitnesspal.android:id/diary_recycler_view', direction) is not None):
+                return 0
+            # Fling gestures not supported, so fall back to swiping
+
         previous_web_entries = []
 
         if (direction == "BOTTOM"):
@@ -628,8 +913,7 @@ class MyFitnessPalAppControl(AndroidCtrl):
             endd = -1
 
         for i in range(1, 64):  # Ensure that the loops are limited, 64 chosen arbitrarily
-            current_web_entries = self.find_diary_entries()
-            current_web_entries = [x for x in current_web_entries if (self.diary_webelement_obscured_level(x) == 0)]
+            current_web_entries = self.__find_visible_diary_entries()
             unique_index = AndroidCtrl.get_unique_index_of_webelement(current_web_entries, previous_web_entries,
                                                                       reverse=False)
 
@@ -672,25 +956,86 @@ class MyFitnessPalAppControl(AndroidCtrl):
         "iron": "com.myfitnesspal.android:id/txtIron"
     }
 
-    def read_macros(self):
+    def read_macros(self, snapshot=None):
+        # 'snapshot' - optional capture of the food details view, to be used for the first pass of the snapshot mode
+        if (dv.diary_read_mode == "snapshot"):
+            return self.read_macros_from_snapshots(snapshot)
+
+        return self.read_macros_from_webelements()
+
+    def read_macros_from_snapshots(self, snapshot=None):
+        # Reads the food macros with a single 'page_source' request per scroll position. Every nutrient resource-id is
+        # resolved from the snapshot in one pass, and the view is only scrolled whilst some are still missing
+        macros = MyFitnessPalAppControl.macro_food_template.copy()
+        resource_to_macro = {resource_id: macro for (macro, resource_id) in macros.items()}
+        macros_outstanding = set(macros)
+
+        previous_page_source = None
+
+        for i in range(1, 8):   # Ensure that the loops are limited, 8 chosen arbitrarily (however as limited data in
+                                # view, this is assumed to be enough)
+            if (snapshot is None):
+                snapshot = self.get_screen_snapshot()
+            if (snapshot.page_source == previous_page_source):
+                # The scroll hasn't changed the view, so the remaining macros will not appear
+                break
+            previous_page_source = snapshot.page_source
+
+            ribbon_top = MyFitnessPalAppControl.__interface_ribbon_top_in_snapshot(snapshot)
+            visible_rects = []
+
+            for resource_id, node in snapshot.index_by_resource_id(resource_to_macro).items():
+                rect = ScreenSnapshot.rect(node)
+                if (MyFitnessPalAppControl.rect_obscured_level(rect, ribbon_top) != 0):
+                    continue
+
+                visible_rects.append(rect)
+
+                macro = resource_to_macro[resource_id]
+                if (macro in macros_outstanding):
+                    macros[macro] = ScreenSnapshot.text(node)
+                    macros_outstanding.remove(macro)
+
+            if (len(macros_outstanding) == 0):
+                break
+
+            if (len(visible_rects) == 0):
+                print("Not matches for macros in the current view, exiting...")
+                return 0
+
+            top_rect    = min(visible_rects, key=lambda x: x['y'])
+            bottom_rect = max(visible_rects, key=lambda x: x['y'])
+            self.swipe_between_rects(bottom_rect, top_rect, 500)
+            snapshot = None
+
+        if (len(macros_outstanding) != 0):
+            print(f"Unable to find some of the macros within the food entry - {sorted(macros_outstanding)}")
+            return 0
+
+        return macros
+
+    def read_macros_from_webelements(self):
         macros = MyFitnessPalAppControl.macro_food_template.copy()
         macro_count = len(macros)
         macros_read = [0] * macro_count
 
-        first_pass = True
-        # variables used to help manage the scrolling of the view
-        top_element     = []
-        bottom_element  = []
+        # Bounds used to manage the scrolling of the view, of the top/bottom macros read at the last scroll position
+        # which had any (bounds rather than the WebElements, as these will have scrolled out of view)
+        top_rect    = None
+        bottom_rect = None
 
         for i in range(1, 8):   # Ensure that the loops are limited, 8 chosen arbitrarily (however as limited data in
                                 # view, this is assumed to be enough)
+            pass_top    = None
+            pass_bottom = None
             for index, macro in enumerate(macros):
                 try:
                     if (macros_read[index] == 1):
                         continue
 
-                    macro_txt = self.driver.find_element("xpath", f".//*[@resource-id='{macros[macro]}']")
-                    if (self.diary_webelement_obscured_level(macro_txt) == 0):
+                    macro_txt = self.driver.find_element(*self.locator("resource_id", macros[macro]))
+                    macro_rect = macro_txt.rect     # Read once, used for both the visibility and scrolling
+                    if (self.diary_webelement_obscured_level(macro_txt, macro_rect, view="FOOD_DETAIL") == 0):
                         # No need to do a check of the visibility of the entries, as this macro view doesn't appear to have
                         # the interface ribbon present.
                         macros_read[index] = 1
@@ -699,30 +1044,28 @@ class MyFitnessPalAppControl(AndroidCtrl):
                         if (macro_count == 0):
                             break
 
-                        if (first_pass is True):
-                            top_element     = macro_txt
-                            bottom_element  = macro_txt
-                            first_pass      = False
+                        if (pass_top is None or macro_rect['y'] < pass_top['y']):
+                            pass_top = macro_rect
 
-                        if (macro_txt.rect['y'] < top_element.rect['y']):
-                            top_element = macro_txt
-
-                        if (macro_txt.rect['y'] > bottom_element.rect['y']):
-                            bottom_element = macro_txt
+                        if (pass_bottom is None or macro_rect['y'] > pass_bottom['y']):
+                            pass_bottom = macro_rect
 
                 except NoSuchElementException:
                     # As are cycling through the WHOLE array, not all entries will be present. So it is expected that
                     # this exception will be used a few times
                     None
 
-            if (top_element == [] or bottom_element == []):
-                print("Not matches for macros in the first pass, exiting...")
-                return 0
+            if (pass_top is not None):
+                top_rect, bottom_rect = pass_top, pass_bottom
 
             if (macro_count == 0):
                 break
 
-            self.driver.scroll(bottom_element, top_element, 500)
+            if (top_rect is None or bottom_rect is None):
+                print("Not matches for macros in the first pass, exiting...")
+                return 0
+
+            self.swipe_between_rects(bottom_rect, top_rect, 500)
 
         if (macro_count != 0):
             print("Unable to find some of the macros within the food entry")
@@ -744,8 +1087,8 @@ class MyFitnessPalAppControl(AndroidCtrl):
         self.diary_current_meal = "Undefined"
         self.diary_entry_type = 'Undefined'
 
-    def __update_internal_memory_of_diary(self, web_elements):
-        entry = MyFitnessPalAppControl.read_diary_lite_single_entry(web_elements)
+    def __update_internal_memory_of_diary(self, entry):
+        # 'entry' is the output of either 'read_diary_lite_single_entry' or 'read_diary_lite_single_entry_in_snapshot'
         if (entry != 0):
             self.diary_entry_type = entry['type']
 
@@ -755,12 +1098,14 @@ class MyFitnessPalAppControl(AndroidCtrl):
                     self.diary_current_time = "No Time"
 
                 case 'Food':
-                    if (self.diary_current_meal != "Water" and self.diary_current_meal != "Exercise"):
-                        self.diary_pre_macro_list.append(entry.copy())
-
                     if (entry['time'] != ''):
                         self.diary_current_time = entry['time']
 
+                    if (self.diary_current_meal != "Water" and self.diary_current_meal != "Exercise"):
+                        # The meal/time of the entry within the diary are retained alongside, for 'read_diary_macros'
+                        self.diary_pre_macro_list.append(
+                            (entry.copy(), self.diary_current_meal, self.diary_current_time))
+
                     food = self.external_food_diary_template.copy()
                     food['meal'] = self.diary_current_meal
                     food['time'] = self.diary_current_time
@@ -773,13 +1118,19 @@ class MyFitnessPalAppControl(AndroidCtrl):
         self.swipe_to_extreme_of_diary("TOP")
 
         try:
-            diary_date = self.app_wait.until(EC.visibility_of_element_located(
-                ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/btnDate']"))).text
+            diary_date = self.element_text(self.locator("diary_date"), "read_diary_date", self.app_wait)
 
         except (TimeoutException, NoSuchElementException, StaleElementReferenceException) as e:
             print("Unable to find the date of this diary entry...")
             return 0
 
+        diary_date = MyFitnessPalAppControl.parse_diary_date(diary_date)
+        self.navigation.set_current_date(diary_date)
+        return diary_date
+
+    @staticmethod
+    def parse_diary_date(diary_date):
+        # Convert the text of the diary date ('btnDate') into a 'datetime'
         today_date = datetime.today()
         # Re-create so as to remove the specific time of the day
         today_date = datetime(year=today_date.year, month=today_date.month, day=today_date.day)
@@ -806,10 +1157,9 @@ class MyFitnessPalAppControl(AndroidCtrl):
 
     def read_daily_calories_tally(self):
         try:
-            calorie_goal = self.app_wait.until(EC.visibility_of_element_located(
-                ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/goal']"))).text
-            calorie_total = self.app_wait.until(EC.visibility_of_element_located(
-                ("xpath", "//*[@resource-id='com.myfitnesspal.android:id/food']"))).text
+            calorie_goal = self.element_text(self.locator("calorie_goal"), "read_daily_calories_tally", self.app_wait)
+            calorie_total = self.element_text(self.locator("calorie_total"), "read_daily_calories_tally",
+                                              self.app_wait)
 
             return_value = {
                 "goal": calorie_goal,
@@ -823,25 +1173,193 @@ class MyFitnessPalAppControl(AndroidCtrl):
             return 0
 
     def read_diary(self):
-        self.clear_internal_memory_of_diary()
+        if (dv.diary_read_mode == "snapshot"):
+            return self.read_diary_from_snapshots()
+
+        return self.read_diary_from_webelements()
+
+    def read_diary_from_snapshots(self):
+        # Reads the diary with a single 'page_source' request per scroll position, rather than querying each of the
+        # diary entries (and their children) via the driver
+        if (self.__walk_diary_snapshots(harvest_macros=False) == 0):
+            return 0
 
         self.swipe_to_extreme_of_diary("TOP")
+
+        return 1
+
+    def harvest_diary(self, from_top=True):
+        # Single top to bottom pass of the diary, which reads the top level entries AND the macros of each food as it
+        # comes into view. Replaces the separate 'read_diary' + 'read_diary_macros' passes, where the later re-scans the
+        # diary from the top for every food.
+        # 'from_top' can be set to False, if the diary is already at the top (i.e. straight after 'read_diary_date')
+        return self.__walk_diary_snapshots(harvest_macros=True, from_top=from_top)
+
+    def __read_cached_macros(self, entry, meal, diary_time):
+        # Return the macros of the diary entry from the 'known_macros' or 'macro_cache' (if present), with the meal/time
+        # updated to those of the entry within the diary. 'None' if the macros are not known
+        known = [] if (self.known_macros is None) else self.known_macros.get(
+            (meal, entry['name'], entry['calories']), [])
+
+        if (len(known) != 0):
+            macros = known.pop(0).copy()
+        elif (self.macro_cache is not None):
+            macros = self.macro_cache.lookup(entry)
+        else:
+            macros = None
+
+        if (macros is None):
+            return None
+
+        macros['meal'] = meal
+        macros['time'] = diary_time
+        return macros
+
+    def __store_cached_macros(self, entry, macros):
+        if (self.macro_cache is not None):
+            self.macro_cache.store(entry, macros)
+
+    def __read_macros_of_visible_entry(self, rect):
+        # Open the food entry at the provided location, read its macros, and then return to the diary
+        self.tap_rect(rect)
+        snapshot = self.wait_for_settle(resource_id=MyFitnessPalAppControl.macro_food_template['name'])
+        macros = self.read_macros(snapshot if (snapshot != 0) else None)
+        self.back()
+        self.wait_for_settle(resource_id='com.myfitnesspal.android:id/diary_recycler_view')
+
+        return macros
+
+    def benchmark_app_locators(self):
+        # Benchmark the locators (see 'AndroidCtrl.benchmark_locators') upon each of the views the scripts visit, the
+        # diary, the calendar (both modes) and a food. Starts from, and returns to, the diary
+        if (self.classify_view()["view"] != "DIARY"):
+            print("Diary must be open to benchmark the locators...")
+            return 0
+
+        results = dict(self.benchmark_locators())
+        calendar = [name for name in self.locators.names() if (name.startswith("calendar_"))]
+        try:
+            self.driver.find_element(*self.locator("date_bar")).click()
+            self.wait_for_settle(resource_id='com.myfitnesspal.android:id/mtrl_picker_header_toggle')
+            results.update(self.benchmark_locators(calendar))
+
+            self.app_wait.until(EC.element_to_be_clickable(self.locator("calendar_input_toggle"))).click()
+            self.wait_for_settle()
+            results.update(self.benchmark_locators(["calendar_text_input"]))
+
+        except (TimeoutException, NoSuchElementException, StaleElementReferenceException):
+            print("Unable to open the calendar, its locators have not been benchmarked...")
+
+        if (self.classify_view()["view"] != "DIARY"):
+            self.back()
+            self.wait_for_settle(resource_id='com.myfitnesspal.android:id/date_bar')
+
+        snapshot = self.get_screen_snapshot()
+        foods = [rect for (entry, rect) in MyFitnessPalAppControl.find_visible_diary_entries_in_snapshot(snapshot)
+                 if (entry["type"] == "Food")]
+        if (len(foods) != 0):
+            self.tap_rect(foods[0])
+            self.wait_for_settle(resource_id=MyFitnessPalAppControl.macro_food_template['name'])
+            results.update(self.benchmark_locators(
+                ["navigation_bar", "resource_id"],
+                {"resource_id": (MyFitnessPalAppControl.macro_food_template['name'],)}))
+            self.back()
+            self.wait_for_settle(resource_id='com.myfitnesspal.android:id/diary_recycler_view')
+
+        return results
+
+    def __walk_diary_snapshots(self, harvest_macros=False, from_top=True):
+        self.clear_internal_memory_of_diary()
+
+        if (from_top is True):
+            self.swipe_to_extreme_of_diary("TOP")
         scan_down_from = 0
+        swiped_entry = None     # The entry (and its expected 'y' position) which was dragged to the top by the swipe
 
         self.calorie_tally = self.read_daily_calories_tally()
 
+        settled_snapshot = 0
+
         for i in range(1, 64):   # Ensure that the loops are limited, 64 chosen arbitrarily
-            current_web_entries = self.__find_visible_diary_entries()
-            if (current_web_entries == 0):
+            if (settled_snapshot != 0):
+                snapshot = settled_snapshot     # Re-use the capture taken when waiting for the swipe to settle
+            else:
+                snapshot = self.get_screen_snapshot()
+            current_entries = MyFitnessPalAppControl.find_visible_diary_entries_in_snapshot(snapshot)
+            if (len(current_entries) == 0):
                 print("Encountered an error with looking at the top level diary entries, exiting...")
                 return 0
 
-                # Filter out any entry which happens to be hidden by the Ribbon Interface, at bottom of screen
-            diary_entries = [x for x in current_web_entries if (x.rect['y'] > scan_down_from)]
-                # This "scan line" has been introduced, as unable to make use of entry matching to discard read entries.
-                # Also cannot make use of the webelements themselves, as they are not always unique.
-                # So, "scan line" will be updated to equal the 'y' entry of the element that is 'swiped' (later on)
-                # Any element which is greater than this line will be included, below this discarded
+            if (swiped_entry is not None):
+                # Same "scan line" approach as 'read_diary_from_webelements'. The line is the new 'y' position of the
+                # entry that was swiped, so locate the matching entry closest to where it is expected to have landed
+                matches = [rect['y'] for (entry, rect) in current_entries if (entry == swiped_entry[0])]
+                if (len(matches) != 0):
+                    scan_down_from = min(matches, key=lambda y: abs(y - swiped_entry[1]))
+                else:
+                    scan_down_from = swiped_entry[1]
+
+            diary_entries = [(entry, rect) for (entry, rect) in current_entries if (rect['y'] > scan_down_from)]
+            for entry, rect in diary_entries:
+                pre_macro_count = len(self.diary_pre_macro_list)
+                self.__update_internal_memory_of_diary(entry)
+
+                if (harvest_macros is True and len(self.diary_pre_macro_list) != pre_macro_count):
+                    # Entry is a food which requires its macros (see '__update_internal_memory_of_diary')
+                    macros = self.__read_cached_macros(entry, self.diary_current_meal, self.diary_current_time)
+                    if (macros is None):
+                        macros = self.retry.run("read_macros_of_visible_entry", self.__read_macros_of_visible_entry,
+                                                rect, retry_if=lambda x: x == 0, recover=self.return_to_diary)
+                        if (macros == 0):
+                            print(f"Unable to read the macros of '{entry['name']}', exiting...")
+                            return 0
+
+                        self.__store_cached_macros(entry, macros)
+                        self.diary_macro_list.append(macros)
+
+                        if (self.progress_callback is not None):
+                            self.progress_callback(self.diary_top_list, self.diary_macro_list)
+
+                    else:
+                        self.diary_macro_list.append(macros)
+
+            complete_diary_button = snapshot.find('com.myfitnesspal.android:id/btnComplete')
+            if (complete_diary_button is not None and
+                    MyFitnessPalAppControl.rect_obscured_level(
+                        ScreenSnapshot.rect(complete_diary_button),
+                        MyFitnessPalAppControl.__interface_ribbon_top_in_snapshot(snapshot)) == 0):
+                break
+
+            first_rect = current_entries[0][1]
+            last_entry, last_rect = current_entries[-1]
+            self.swipe_between_rects(last_rect, first_rect, 500 * len(current_entries))
+            swiped_entry = (last_entry,
+                            last_rect['y'] - (ScreenSnapshot.centre(last_rect)[1] - ScreenSnapshot.centre(first_rect)[1]))
+            settled_snapshot = self.wait_for_settle()
+
+        return 1
+
+    def read_diary_from_webelements(self):
+        self.clear_internal_memory_of_diary()
+
+        self.swipe_to_extreme_of_diary("TOP")
+        scan_down_from = 0
+
+        self.calorie_tally = self.read_daily_calories_tally()
+
+        for i in range(1, 64):   # Ensure that the loops are limited, 64 chosen arbitrarily
+            # The entries are found and read as a single retried operation, so a stale entry is found again rather
+            # than being dropped
+            try:
+                result = self.retry.run("read_visible_diary_entries", self.__read_visible_webelement_entries,
+                                        scan_down_from, retry_if=lambda x: x == 0 or 0 in x[1])
+            except (TimeoutException, StaleElementReferenceException) as e:
+                result = 0
+
+            if (result == 0):
+                print("Encountered an error with looking at the top level diary entries, exiting...")
+                return 0
+            current_web_entries, diary_entries = result
 
             if (len(diary_entries) == 0 or diary_entries == []):    # If nothing to read, keep going till see the
                 continue                                            # 'Diary Complete' button at the bottom
@@ -849,8 +1367,7 @@ class MyFitnessPalAppControl(AndroidCtrl):
             [self.__update_internal_memory_of_diary(x) for x in diary_entries]
 
             try:
-                complete_diary_button = self.driver.find_element(
-                    "xpath", ".//*[@resource-id='com.myfitnesspal.android:id/btnComplete']")
+                complete_diary_button = self.driver.find_element(*self.locator("diary_complete"))
                 if (self.diary_webelement_obscured_level(complete_diary_button) == 0):
                     break
 
@@ -860,16 +1377,34 @@ class MyFitnessPalAppControl(AndroidCtrl):
 
             self.driver.scroll(current_web_entries[-1], current_web_entries[0], 500*len(current_web_entries))
             scan_down_from = current_web_entries[-1].rect['y']
-            time.sleep(1)
+            self.wait_for_settle()
 
         self.swipe_to_extreme_of_diary("TOP")
 
         return 1
 
+    def __read_visible_webelement_entries(self, scan_down_from):
+        # Return (visible entries, the entries below the 'scan_down_from' line as read by 'read_diary_lite_single_entry')
+        visible_entries = self.__find_visible_diary_entries_with_rects()
+        current_web_entries = [web_element for (web_element, rect) in visible_entries]
+
+            # Filter out any entry which happens to be hidden by the Ribbon Interface, at bottom of screen
+        diary_entries = [web_element for (web_element, rect) in visible_entries if (rect['y'] > scan_down_from)]
+            # This "scan line" has been introduced, as unable to make use of entry matching to discard read entries.
+            # Also cannot make use of the webelements themselves, as they are not always unique.
+            # So, "scan line" will be updated to equal the 'y' entry of the element that is 'swiped' (later on)
+            # Any element which is greater than this line will be included, below this discarded
+
+        return (current_web_entries, [MyFitnessPalAppControl.read_diary_lite_single_entry(x) for x in diary_entries])
+
     def read_diary_macros(self):
         self.swipe_to_extreme_of_diary("TOP")
 
-        for macro_to_find in self.diary_pre_macro_list:
+        for macro_to_find, meal, diary_time in self.diary_pre_macro_list:
+            macros = self.__read_cached_macros(macro_to_find, meal, diary_time)
+            if (macros is not None):
+                self.diary_macro_list.append(macros)
+                continue
 
             for i in range(1, 64):   # Ensure that the loops are limited, 64 chosen arbitrarily
                 current_web_entries = self.__find_visible_diary_entries()
@@ -882,10 +1417,13 @@ class MyFitnessPalAppControl(AndroidCtrl):
                     food_to_click = food_in_view.index(macro_to_find)
 
                     current_web_entries[food_to_click].click()
-                    time.sleep(1)
-                    self.diary_macro_list.append(self.read_macros())
-                    time.sleep(1)
+                    self.wait_for_settle(resource_id=MyFitnessPalAppControl.macro_food_template['name'])
+                    macros = self.retry.run("read_macros", self.read_macros, retry_if=lambda x: x == 0)
+                    if (macros != 0):
+                        self.__store_cached_macros(macro_to_find, macros)
+                    self.diary_macro_list.append(macros)
                     self.back()
+                    self.wait_for_settle(resource_id='com.myfitnesspal.android:id/diary_recycler_view')
 
                     break
 
@@ -893,8 +1431,7 @@ class MyFitnessPalAppControl(AndroidCtrl):
                     None
 
                 try:
-                    complete_diary_button = self.driver.find_element(
-                        "xpath", ".//*[@resource-id='com.myfitnesspal.android:id/btnComplete']")
+                    complete_diary_button = self.driver.find_element(*self.locator("diary_complete"))
                     if (self.diary_webelement_obscured_level(complete_diary_button) == 0):
                         break
 
@@ -903,7 +1440,7 @@ class MyFitnessPalAppControl(AndroidCtrl):
                     None
 
                 self.driver.scroll(current_web_entries[-1], current_web_entries[0], 500 * len(current_web_entries))
-                time.sleep(1)
+                self.wait_for_settle()
 
         if (len(self.diary_macro_list) != len(self.diary_pre_macro_list)):
             print("Unable to find all macros of originally read diary entries, exiting...")
@@ -0,0 +1,129 @@
+from datetime import datetime
+
+from MyFitnessPal.AppParameters import AppConfig as dv
+
+# Planner for moving the diary between dates. Retains the date currently shown by the diary, and the cost (seconds) of
+# each navigation primitive:
+#   "day_arrow"     - single 'previous_day'/'next_day' click
+#   "calendar"      - opening the calendar, selecting the day and confirming (fixed part of 'open_diary_date')
+#   "month_arrow"   - single month previous/next click within the calendar
+#   "year_picker"   - opening the year selector and selecting the year (excluding any scrolling)
+#   "year_scroll"   - single scroll of the year selector
+#   "text_input"    - opening the calendar, typing the date into its text input and confirming
+# Costs start from 'AppConfig.navigation_costs', and are updated with the measured time of each primitive as it is
+# used. So that the route chosen to a date is the cheapest on the current device.
+
+
+# noinspection PyRedundantParentheses
+class NavigationPlanner:
+    def __init__(self, costs=None):
+        self.costs = dict(dv.navigation_costs if (costs is None) else costs)
+        self.measurements = {primitive: 0 for primitive in self.costs}  # Number of measurements of each primitive
+        self.current_date = None        # Date shown by the diary, 'None' if not known
+        self.text_input_available = dv.calendar_text_input  # Cleared if entering the date as text keeps failing
+        self.text_input_failures = 0    # Consecutive failures to enter the date as text, see 'record_text_input'
+
+    @staticmethod
+    def as_date(value):
+        if isinstance(value, datetime):
+            return value.date()
+        return value
+
+    def set_current_date(self, value):
+        self.current_date = NavigationPlanner.as_date(value)
+
+    #=============================================================================================#
+    def record(self, primitive, seconds, count=1):
+        # Update the cost of the primitive with a measurement of 'count' uses taking 'seconds'. The first measurement
+        # replaces the default, after which an exponential moving average is used
+        if (count <= 0):
+            return
+
+        per_use = max(0.0, seconds) / count
+        if (sum(self.measurements.values()) == 0 and self.costs.get(primitive, 0) > 0):
+            # First measurement of any primitive, scale all the defaults to suit the speed of this device. So that the
+            # primitives which have not been used yet, remain in proportion with those that have
+            ratio = per_use / self.costs[primitive]
+            self.costs = {name: cost * ratio for (name, cost) in self.costs.items()}
+
+        if (self.measurements.get(primitive, 0) == 0):
+            self.costs[primitive] = per_use
+        else:
+            self.costs[primitive] = ((1 - dv.navigation_cost_smoothing) * self.costs[primitive] +
+                                     dv.navigation_cost_smoothing * per_use)
+
+        self.measurements[primitive] = self.measurements.get(primitive, 0) + 1
+
+    def record_text_input(self, success, missing=False):
+        # Outcome of entering a date as text. A failure only falls back for that date, as the text input is only
+        # disabled (for the rest of the session) if the calendar doesn't have one ('missing'), or after
+        # 'AppConfig.calendar_text_input_max_failures' consecutive failures
+        if (success is True):
+            self.text_input_failures = 0
+            return
+
+        self.text_input_failures += 1
+        if (missing is True or self.text_input_failures >= dv.calendar_text_input_max_failures):
+            self.text_input_available = False
+
+    #=============================================================================================#
+    def day_arrow_cost(self, from_date, to_date):
+        return abs((to_date - from_date).days) * self.costs["day_arrow"]
+
+    def calendar_cost(self, from_date, to_date):
+        # The calendar opens upon the month of the date shown by the diary. The year selector keeps the month, so months
+        # are then stepped within the target year
+        cost = self.costs["calendar"] + abs(to_date.month - from_date.month) * self.costs["month_arrow"]
+
+        if (to_date.year != from_date.year):
+            year_scrolls = abs(to_date.year - from_date.year) // dv.navigation_years_per_scroll
+            cost += self.costs["year_picker"] + year_scrolls * self.costs["year_scroll"]
+
+        return cost
+
+    def routes(self, target_date, from_date=None):
+        # All the routes from 'from_date' (default of the current date) to the target date, as a dictionary of
+        # route -> estimated cost. Empty if the current date isn't known
+        from_date = self.current_date if (from_date is None) else NavigationPlanner.as_date(from_date)
+        target_date = NavigationPlanner.as_date(target_date)
+
+        if (from_date is None):
+            return {}
+
+        if (from_date == target_date):
+            return {"none": 0}
+
+        routes = {"day_arrow": self.day_arrow_cost(from_date, target_date),
+                  "calendar": self.calendar_cost(from_date, target_date)}
+        if (self.text_input_available is True):
+            routes["text_input"] = self.costs["text_input"]
+
+        return routes
+
+    def plan(self, target_date, from_date=None):
+        # Cheapest route (see 'routes'), or the calendar if the current date isn't known
+        routes = self.routes(target_date, from_date)
+        if (len(routes) == 0):
+            return "text_input" if (self.text_input_available is True) else "calendar"
+
+        return min(routes, key=routes.get)
+
+    def cost(self, target_date, from_date=None):
+        routes = self.routes(target_date, from_date)
+        if (len(routes) == 0):
+            return self.costs["text_input" if (self.text_input_available is True) else "calendar"]
+
+        return min(routes.values())
+
+    def order(self, dates):
+        # Order a batch of dates to be visited, so that the position of the diary is re-used. The dates are visited as a
+        # single sweep (one date to the next is then a short hop), starting from whichever end of the batch is the
+        # cheapest to reach from the current date
+        dates = sorted(set([NavigationPlanner.as_date(x) for x in dates]))
+        if (len(dates) <= 1 or self.current_date is None):
+            return dates
+
+        if (self.cost(dates[-1]) < self.cost(dates[0])):
+            dates.reverse()
+
+        return dates
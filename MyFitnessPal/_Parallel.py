@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+# Support for scraping a range of dates across multiple emulators at the same time (see
+# 'MyFitnessPal.scrap_diary_parallel'). Each emulator is driven by a separate process, which collects what has been
+# scraped rather than writing it, so that the datastore only ever has a single writer - the parent process.
+# Useful links to understand the layout of the below class.
+#https://docs.python.org/3/library/concurrent.futures.html#processpoolexecutor
+
+
+# noinspection PyRedundantParentheses
+class ScrapeCollector:
+    # Stand-in for the datastore ('JSONCtrl'/'SQLiteCtrl') within a worker process, which retains the entries so that
+    # they can be returned to the parent process
+    def __init__(self):
+        self.records = []       # [(section, newData), ...] in the order that they were appended
+
+    def append_DailySummary(self, newData):
+        self.records.append(("DailySummary", newData.copy()))
+
+    def append_Diary(self, newData):
+        self.records.append(("Diary", newData.copy()))
+
+    def append_Macro(self, newData):
+        self.records.append(("Macro", newData.copy()))
+
+    def write_datastore(self):                              # Nothing to write, the parent process is the writer
+        return 1
+
+    def flush(self):
+        pass
+
+    @staticmethod
+    def dates_of(records):
+        # Dates (format 'YYYY-MM-DD') which have been collected, every section of a date is appended together
+        return set([newData["date"] for (section, newData) in records if (section == "DailySummary")])
+
+    @staticmethod
+    def merge_into(datastore, records):
+        # Append the collected entries to the (real) datastore
+        for section, newData in records:
+            getattr(datastore, f"append_{section}")(newData)
+
+
+def shard_dates(start_date, number_of_dates, step, shards):
+    # Split the dates into (at most) 'shards' contiguous blocks of (start_date, number_of_dates). Contiguous, so that
+    # within a block each date is reached with 'previous_day'/'next_day' rather than the calendar
+    shards = max(1, min(shards, number_of_dates))
+    size, remainder = divmod(number_of_dates, shards)
+
+    blocks = []
+    first = 0
+    for shard in range(shards):
+        count = size + (1 if (shard < remainder) else 0)
+        blocks.append((start_date + timedelta(days=first * step), count))
+        first += count
+
+    return blocks
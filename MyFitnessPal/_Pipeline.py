@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+
+from MyFitnessPal.AppParameters import AppConfig as dv
+
+# Pipeline between the driver and the datastore (see 'MyFitnessPal.scrap_active_diary'). The driver thread only reads
+# the diary and hands each date over as a record; a worker thread validates the record, appends it to the datastore and
+# writes the datastore/macro cache. So the next date is being navigated to/read whilst the previous is being written.
+# Records which queue up whilst the worker is busy are written together, with a single 'write_datastore'. Where the
+# datastore buffers its writes (see '_JSON.py'), a record only counts as saved - 'on_persisted' - once it has been
+# flushed to disk.
+# Each record is a dict of:
+#   expected_date   - date that was requested (or 'None' if not known)
+#   DailySummary/Diary/Macro - entries to be appended to each section of the datastore
+# Useful links to understand the layout of the below class.
+#https://docs.python.org/3/library/queue.html
+
+
+# noinspection PyRedundantParentheses
+class PersistPipeline:
+    def __init__(self, datastore, macro_cache=None, validate=None, queue_size=dv.pipeline_queue_size,
+                 batch_size=dv.pipeline_batch_size):
+        # 'validate' - function(record) returning 0 if the record is not to be written (see
+        # 'MyFitnessPal.scrap_consistancy_check')
+        self.datastore = datastore
+        self.macro_cache = macro_cache
+        self.validate = validate
+        self.batch_size = batch_size
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.worker = None
+        self.unflushed = []             # [(record, on_persisted), ...] written to the datastore, but not yet to disk
+        self.lock = threading.Lock()    # Held whilst the datastore is being written. To be held by the driver thread
+                                        # when reading the datastore, whilst the worker is running
+
+        # Statistics, to see how much of the writing is hidden behind the navigation
+        self.persisted = 0
+        self.rejected = 0
+        self.failed = 0
+        self.batches = 0
+        self.flushes = 0
+        self.worker_seconds = 0         # Time spent validating/writing
+        self.blocked_seconds = 0        # Time the driver thread has waited upon a full queue/the final drain
+
+    #=============================================================================================#
+    def start(self):
+        # Start the worker thread, until started (or once stopped) each record is written as it is submitted
+        if (self.worker is not None):
+            return
+
+        self.worker = threading.Thread(target=self.__run, name="PersistPipeline", daemon=True)
+        self.worker.start()
+
+    def stop(self):
+        # Wait for every record submitted to be written, stop the worker thread and flush the datastore
+        start_time = time.perf_counter()
+        if (self.worker is not None):
+            self.queue.put(None)
+            self.worker.join()
+            self.worker = None
+
+        self.flush()
+        self.blocked_seconds += time.perf_counter() - start_time
+
+    def flush(self):
+        # Write any records which the datastore is buffering to disk
+        if (len(self.unflushed) == 0):
+            return
+
+        with self.lock:
+            self.datastore.flush()
+        self.__flushed()
+
+    def submit(self, record, on_persisted=None):
+        # 'on_persisted' - optional function(record) called once the record has been written, i.e. to complete the
+        # date within its 'ScrapeJob'
+        start_time = time.perf_counter()
+        if (self.worker is None):
+            self.persist([(record, on_persisted)])
+        else:
+            self.queue.put((record, on_persisted))
+        self.blocked_seconds += time.perf_counter() - start_time
+
+    #=============================================================================================#
+    def __run(self):
+        stopping = False
+        while (stopping is False):
+            batch = [self.queue.get()]
+            while (len(batch) < self.batch_size and self.queue.empty() is False):
+                batch.append(self.queue.get())
+
+            if (None in batch):
+                stopping = True
+                batch = [x for x in batch if (x is not None)]
+
+            try:
+                self.persist(batch)
+            except Exception as e:
+                # Any error is reported, rather than ending the worker (which would leave the driver waiting)
+                print(f"Unable to write {[x['DailySummary']['date'] for (x, on_persisted) in batch]} to the "
+                      f"datastore - {e}")
+                self.failed += len(batch)
+
+    def persist(self, batch):
+        # Validate and append each of the records, then write the datastore (and macro cache) once for the batch
+        if (len(batch) == 0):
+            return
+
+        start_time = time.perf_counter()
+        written = []
+        with self.lock:
+            for record, on_persisted in batch:
+                if (self.validate is not None and self.validate(record) == 0):
+                    print(f"{record['DailySummary']['date']} has not been saved, as it failed the consistency check")
+                    self.rejected += 1
+                    continue
+
+                self.datastore.append_DailySummary(record["DailySummary"])
+                self.datastore.append_Diary(record["Diary"])
+                self.datastore.append_Macro(record["Macro"])
+                written.append((record, on_persisted))
+
+            flushed = 0
+            if (len(written) != 0):
+                self.unflushed.extend(written)
+                flushed = self.datastore.write_datastore()
+                self.batches += 1
+
+        if (flushed == 1):
+            self.__flushed()
+
+        self.persisted += len(written)
+        self.worker_seconds += time.perf_counter() - start_time
+
+    def __flushed(self):
+        # The datastore has been written to disk, so the macro cache is written alongside and each record is complete
+        if (self.macro_cache is not None):
+            self.macro_cache.write_cache()
+
+        self.flushes += 1
+        flushed, self.unflushed = self.unflushed, []
+        for record, on_persisted in flushed:
+            if (on_persisted is not None):
+                on_persisted(record)
+
+    def print_summary(self):
+        if (self.persisted == 0 and self.rejected == 0 and self.failed == 0):
+            return
+
+        print(f"=====Pipeline=====")
+        print(f"{self.persisted} date(s) saved in {self.batches} batch(es) and {self.flushes} flush(es) to disk, "
+              f"{self.rejected} rejected, {self.failed} failed")
+        print(f"Validating/writing took {self.worker_seconds:.2f}s, the driver waited {self.blocked_seconds:.2f}s")
+        print(f"=====END=====")
@@ -0,0 +1,101 @@
+import json     # Import the json module
+import sqlite3
+
+from MyFitnessPal.AppParameters import AppConfig as dv
+
+# SQLite alternative to the 'JSONCtrl' datastore, which has the same interface (append_DailySummary, etc.). Each entry
+# is stored against its section + date (primary key), so adding/replacing a day is an indexed upsert rather than a
+# re-sort of the full list and a re-write of the entire file.
+# Useful links to understand the layout of the below class.
+#https://docs.python.org/3/library/sqlite3.html
+#https://www.sqlite.org/lang_upsert.html
+
+
+# noinspection PyRedundantParentheses
+class SQLiteCtrl:
+    fileLocation = ""       # Variable to store the path to where the database is to be stored
+    sections = ["DailySummary", "Diary", "Macro"]
+
+    #=============================================================================================#
+    def read_datastore(self):
+        # Written from the pipeline worker thread (see '_Pipeline.py'), which serialises access to the connection
+        self.connection = sqlite3.connect(self.fileLocation, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS records ("
+                                "section TEXT NOT NULL, date TEXT NOT NULL, contents TEXT NOT NULL, "
+                                "PRIMARY KEY (section, date)) WITHOUT ROWID")
+        self.connection.execute("INSERT OR IGNORE INTO metadata (key, value) VALUES ('app_sw_version', ?)",
+                                (dv.app_sw_version,))
+        self.connection.commit()
+
+    def write_datastore(self):                              # Commit any outstanding changes to the database
+        self.connection.commit()
+        return 1                                            # Each commit is durable, so nothing is buffered
+
+    def flush(self):
+        self.connection.commit()
+
+    def close_datastore(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def __init__(self, fileLoc):                            # Constructor for "SQLiteCtrl"
+        self.fileLocation = fileLoc
+        self.read_datastore()
+
+    def __append_general(self, section, newData):
+        # Add the entry, replacing any entry which already exists for the same date
+        self.connection.execute("INSERT INTO records (section, date, contents) VALUES (?, ?, ?) "
+                                "ON CONFLICT (section, date) DO UPDATE SET contents = excluded.contents",
+                                (section, newData["date"], json.dumps(newData)))
+
+    def append_DailySummary(self, newData):
+        self.__append_general("DailySummary", newData)
+
+    def append_Diary(self, newData):
+        self.__append_general("Diary", newData)
+
+    def append_Macro(self, newData):
+        self.__append_general("Macro", newData)
+
+    #=============================================================================================#
+    def read_dates(self, section):
+        # Return all the dates (sorted) which have an entry within the section
+        cursor = self.connection.execute("SELECT date FROM records WHERE section = ? ORDER BY date", (section,))
+        return [row[0] for row in cursor]
+
+    def read_entry(self, section, entry_date):
+        # Return the entry of the section for the date (format 'YYYY-MM-DD'), or 'None' if there isn't one
+        row = self.connection.execute("SELECT contents FROM records WHERE section = ? AND date = ?",
+                                      (section, entry_date)).fetchone()
+        if (row is None):
+            return None
+
+        return json.loads(row[0])
+
+    #=============================================================================================#
+    def import_json(self, json_file):
+        # One-shot migration of an existing 'JSONCtrl' datastore into this database
+        temp = open(json_file, 'r')
+        contents = json.load(temp)
+        temp.close()
+
+        for section in SQLiteCtrl.sections:
+            for newData in contents.get(section, []):
+                self.__append_general(section, newData)
+
+        self.write_datastore()
+
+    def export_json(self, json_file):
+        # Export the database in the same format as the 'JSONCtrl' datastore (each section sorted by date)
+        contents = {"app_sw_version": self.connection.execute(
+            "SELECT value FROM metadata WHERE key = 'app_sw_version'").fetchone()[0]}
+
+        for section in SQLiteCtrl.sections:
+            cursor = self.connection.execute("SELECT contents FROM records WHERE section = ? ORDER BY date",
+                                             (section,))
+            contents[section] = [json.loads(row[0]) for row in cursor]
+
+        temp = open(json_file, 'w')
+        json.dump(contents, temp, indent = 4)
+        temp.close()
@@ -0,0 +1,276 @@
+import atexit
+import hashlib
+import json     # Import the json module
+import os
+import time
+from collections import OrderedDict
+
+from MyFitnessPal.AppParameters import AppConfig as dv
+
+# Partitioned alternative to the 'JSONCtrl' datastore, which has the same interface (append_DailySummary, etc.). Rather
+# than a single '.mem' file, each section is split into a json file per month (a "segment"):
+#   .mem.d/manifest.json                - for every segment, its dates, number of entries and checksum (sha256)
+#   .mem.d/<section>/<YYYY-MM>.json     - the entries of the section for the month, sorted by date
+# Only the segments which are read/appended to are loaded, and only those which have changed are written (along with
+# the manifest). Each file is written to a temporary file, fsync'd and renamed over the original, and the manifest is
+# written last. Writes are buffered as within 'JSONCtrl' (see 'AppConfig.datastore_flush_days').
+# Each segment can be checked against the manifest ('verify_partition') or re-written without duplicate entries
+# ('compact_partition') on its own, see the 'verify'/'compact' commands of '__main__.py'.
+# Useful links to understand the layout of the below class.
+#https://docs.python.org/3/library/hashlib.html
+#https://docs.python.org/3/library/os.html#os.replace
+
+
+# noinspection PyRedundantParentheses
+class SegmentedJSONCtrl:
+    folderLocation = ""     # Folder holding the manifest and the segments
+    sections = ["DailySummary", "Diary", "Macro"]
+    manifest_name = "manifest.json"
+
+    #=============================================================================================#
+    def read_datastore(self):
+        os.makedirs(self.folderLocation, exist_ok=True)
+        self.segments = OrderedDict()   # (section, month) -> [entries], ordered from least to most recently used
+        self.dirty = set()              # (section, month) of the segments with changes not yet written
+
+        try:                                                # Attempt to read the manifest
+            temp = open(os.path.join(self.folderLocation, SegmentedJSONCtrl.manifest_name), 'r')
+            self.manifest = json.load(temp)
+            temp.close()
+
+        except (OSError, ValueError):                       # if unable to read (as not there), start empty
+            self.manifest = {"app_sw_version": dv.app_sw_version, "segments": {}}
+            self.__write_manifest()
+
+    def write_datastore(self):                              # Write the changed segments, once the flush policy is met
+        # Returns 1 if the segments have been written, 0 if the changes are still waiting (see 'flush')
+        self.pending += 1
+        if (self.pending < self.flush_days and time.monotonic() - self.last_flush < self.flush_seconds):
+            return 0
+
+        self.flush()
+        return 1
+
+    def flush(self):
+        for (section, month) in sorted(self.dirty):
+            self.__write_segment(section, month, self.segments[(section, month)])
+        self.dirty = set()
+        self.__write_manifest()
+        self.__evict()
+
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def close_datastore(self):
+        if (self.pending != 0 or len(self.dirty) != 0):
+            self.flush()
+        atexit.unregister(self.close_datastore)             # Otherwise the instance is kept until the process exits
+
+    def __init__(self, folderLoc, flush_days=dv.datastore_flush_days, flush_seconds=dv.datastore_flush_seconds,
+                 cache_size=dv.datastore_segment_cache):
+        self.folderLocation = folderLoc
+        self.flush_days = flush_days                        # Write the segments once this many days are waiting
+        self.flush_seconds = flush_seconds                  # or once this long has passed since they were last written
+        self.cache_size = cache_size                        # Number of unchanged segments retained in memory
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        self.read_datastore()
+        atexit.register(self.close_datastore)               # Anything still waiting is written upon exit
+
+    #=============================================================================================#
+    @staticmethod
+    def month_of(entry_date):
+        return entry_date[:7]                               # 'YYYY-MM-DD' -> 'YYYY-MM'
+
+    @staticmethod
+    def segment_name(section, month):
+        return f"{section}/{month}"                         # Key of the segment within the manifest
+
+    def segment_file(self, section, month):
+        return os.path.join(self.folderLocation, section, f"{month}.json")
+
+    @staticmethod
+    def write_atomic(fileLoc, raw):
+        temporary_file = f"{fileLoc}.tmp"
+        temp = open(temporary_file, 'wb')
+        temp.write(raw)
+        temp.flush()
+        os.fsync(temp.fileno())                             # Ensure it is on disk, before it replaces the original
+        temp.close()
+        os.replace(temporary_file, fileLoc)                 # Atomic, the file is either the old or new version
+
+    def __read_segment_file(self, section, month):
+        # (entries, raw bytes) of the segment file, '([], None)' if there isn't one
+        if (SegmentedJSONCtrl.segment_name(section, month) not in self.manifest["segments"] and
+                os.path.exists(self.segment_file(section, month)) is False):
+            return ([], None)
+
+        temp = open(self.segment_file(section, month), 'rb')
+        raw = temp.read()
+        temp.close()
+        return (json.loads(raw), raw)
+
+    def __segment(self, section, month):
+        # Entries of the segment, read from its file if not already held
+        key = (section, month)
+        if (key in self.segments):
+            self.segments.move_to_end(key)
+            return self.segments[key]
+
+        try:
+            entries, raw = self.__read_segment_file(section, month)
+        except OSError:
+            print(f"Segment {SegmentedJSONCtrl.segment_name(section, month)} is missing, see 'verify_partition'")
+            entries, raw = ([], None)
+
+        info = self.manifest["segments"].get(SegmentedJSONCtrl.segment_name(section, month))
+        if (raw is not None and (info is None or info["sha256"] != hashlib.sha256(raw).hexdigest())):
+            print(f"Segment {SegmentedJSONCtrl.segment_name(section, month)} doesn't match the manifest, see "
+                  f"'verify_partition'")
+
+        self.segments[key] = entries
+        self.__evict(keep=key)
+        return entries
+
+    def __evict(self, keep=None):
+        # Drop the least recently used segments (without unwritten changes) beyond 'cache_size'
+        while (len(self.segments) > self.cache_size):
+            unchanged = [key for key in self.segments if (key not in self.dirty and key != keep)]
+            if (len(unchanged) == 0):
+                return
+            del self.segments[unchanged[0]]
+
+    def __write_segment(self, section, month, entries):
+        # Write the segment, and record it within the manifest (which is written separately, see 'flush')
+        raw = json.dumps(entries, indent = 4).encode()
+        os.makedirs(os.path.join(self.folderLocation, section), exist_ok=True)
+        SegmentedJSONCtrl.write_atomic(self.segment_file(section, month), raw)
+
+        self.manifest["segments"][SegmentedJSONCtrl.segment_name(section, month)] = {
+            "dates": sorted(set([x["date"] for x in entries])),
+            "count": len(entries),
+            "sha256": hashlib.sha256(raw).hexdigest()
+        }
+
+    def __write_manifest(self):
+        SegmentedJSONCtrl.write_atomic(os.path.join(self.folderLocation, SegmentedJSONCtrl.manifest_name),
+                                       json.dumps(self.manifest, indent = 4, sort_keys=True).encode())
+
+    #=============================================================================================#
+    def __append_general(self, section, newData):
+        # The new entry replaces any entry with the same date, and the segment is kept sorted by date
+        key = (section, SegmentedJSONCtrl.month_of(newData["date"]))
+        entries = [x for x in self.__segment(*key) if (x["date"] != newData["date"])]
+        entries.append(newData.copy())
+
+        self.segments[key] = sorted(entries, key=lambda x: x["date"])
+        self.dirty.add(key)
+
+    def append_DailySummary(self, newData):
+        self.__append_general("DailySummary", newData)
+
+    def append_Diary(self, newData):
+        self.__append_general("Diary", newData)
+
+    def append_Macro(self, newData):
+        # Appended (a date scraped again has more than one entry, the latest being last), whilst kept sorted by date
+        key = ("Macro", SegmentedJSONCtrl.month_of(newData["date"]))
+        entries = self.__segment(*key) + [newData.copy()]
+
+        self.segments[key] = sorted(entries, key=lambda x: x["date"])
+        self.dirty.add(key)
+
+    #=============================================================================================#
+    def read_dates(self, section):
+        # Return all the dates (sorted) which have an entry within the section, from the manifest (or the segment where
+        # it is held, as it may have changes not yet written)
+        dates = set()
+        for name, info in self.manifest["segments"].items():
+            segment_section, month = name.split('/')
+            if (segment_section == section and (section, month) not in self.segments):
+                dates.update(info["dates"])
+
+        for (segment_section, month), entries in self.segments.items():
+            if (segment_section == section):
+                dates.update([x["date"] for x in entries])
+
+        return sorted(dates)
+
+    def read_entry(self, section, entry_date):
+        # Return the entry of the section for the date (format 'YYYY-MM-DD'), or 'None' if there isn't one. Where there
+        # are multiple entries for the same date, the latest is returned
+        for x in reversed(self.__segment(section, SegmentedJSONCtrl.month_of(entry_date))):
+            if (x["date"] == entry_date):
+                return x
+
+        return None
+
+    #=============================================================================================#
+    def partitions(self, section=None, month=None):
+        # (section, month) of every segment, optionally of a single section/month
+        keys = set([tuple(name.split('/')) for name in self.manifest["segments"]]) | self.dirty
+        return sorted([(x, y) for (x, y) in keys
+                       if ((section is None or x == section) and (month is None or y == month))])
+
+    def verify_partition(self, section, month):
+        # Check the segment file against the manifest. Returns "" if it matches, otherwise the reason that it doesn't
+        if ((section, month) in self.dirty):
+            return "has changes which are yet to be written"
+
+        info = self.manifest["segments"].get(SegmentedJSONCtrl.segment_name(section, month))
+        if (info is None):
+            return "not within the manifest"
+
+        try:
+            entries, raw = self.__read_segment_file(section, month)
+        except OSError:
+            return "segment file is missing"
+        except ValueError:
+            return "segment file is not valid json"
+
+        if (hashlib.sha256(raw).hexdigest() != info["sha256"]):
+            return "checksum doesn't match the manifest"
+        if (len(entries) != info["count"]):
+            return f"{len(entries)} entries, but the manifest has {info['count']}"
+
+        outside = [x["date"] for x in entries if (SegmentedJSONCtrl.month_of(x["date"]) != month)]
+        if (len(outside) != 0):
+            return f"entries of other months - {outside}"
+
+        if ([x["date"] for x in entries] != sorted([x["date"] for x in entries])):
+            return "entries are not sorted by date"
+
+        return ""
+
+    def compact_partition(self, section, month):
+        # Re-write the segment with only the latest entry of each date (Macro entries are appended, so a date that has
+        # been scraped again has more than one), and update the manifest. Returns the number of entries removed
+        entries = self.__segment(section, month)
+        latest = {}
+        for x in entries:
+            latest[x["date"]] = x
+
+        compacted = sorted(latest.values(), key=lambda x: x["date"])
+        self.segments[(section, month)] = compacted
+        self.__write_segment(section, month, compacted)
+        self.dirty.discard((section, month))
+        self.__write_manifest()
+
+        return len(entries) - len(compacted)
+
+    #=============================================================================================#
+    def import_json(self, json_file):
+        # One-shot migration of an existing 'JSONCtrl' datastore into segments
+        temp = open(json_file, 'r')
+        contents = json.load(temp)
+        temp.close()
+
+        for section in SegmentedJSONCtrl.sections:
+            months = {}
+            for newData in contents.get(section, []):
+                months.setdefault(SegmentedJSONCtrl.month_of(newData["date"]), []).append(newData)
+
+            for month, entries in months.items():
+                self.__write_segment(section, month, sorted(entries, key=lambda x: x["date"]))
+
+        self.__write_manifest()
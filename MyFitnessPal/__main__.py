@@ -0,0 +1,107 @@
+# Command line interface for the MyFitnessPal script suite, i.e.
+#   python -m MyFitnessPal scrap --start 2025-03-08 --days 7 --step -1
+#   python -m MyFitnessPal backfill --start 2025-01-01
+#   python -m MyFitnessPal refresh --days 14
+#   python -m MyFitnessPal jobs
+#   python -m MyFitnessPal resume [job_id]
+#   python -m MyFitnessPal benchmark
+#   python -m MyFitnessPal verify --month 2025-03
+#   python -m MyFitnessPal compact --section Macro
+
+import argparse
+from datetime import date
+
+from MyFitnessPal.MyFitnessPal import MyFitnessPal
+from MyFitnessPal.AppParameters import AppConfig as dv
+from MyFitnessPal.FileLocations import LocalFileLocations as ls
+from MyFitnessPal._Jobs import ScrapeJob
+from MyFitnessPal._Segmented import SegmentedJSONCtrl
+
+
+def parse_arguments(arguments=None):
+    parser = argparse.ArgumentParser(prog="MyFitnessPal", description="Scrape the MyFitnessPal diary")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scrap = commands.add_parser("scrap", help="scrape a number of dates, recorded as a resumable job")
+    scrap.add_argument("--start", type=date.fromisoformat, default=date.today(), help="first date (YYYY-MM-DD)")
+    scrap.add_argument("--days", type=int, default=1, help="number of dates")
+    scrap.add_argument("--step", type=int, default=-1, help="days between each date (negative for earlier dates)")
+
+    backfill = commands.add_parser("backfill", help="scrape the dates missing/incomplete within the datastore")
+    backfill.add_argument("--start", type=date.fromisoformat, required=True, help="first date (YYYY-MM-DD)")
+    backfill.add_argument("--end", type=date.fromisoformat, default=None, help="last date (default of today)")
+
+    refresh = commands.add_parser("refresh", help="re-check recently stored dates for changes")
+    refresh.add_argument("--days", type=int, default=dv.refresh_days, help="number of days, up to today")
+
+    commands.add_parser("jobs", help="list the jobs, and their progress")
+
+    resume = commands.add_parser("resume", help="resume a job from its last checkpoint")
+    resume.add_argument("job_id", nargs="?", default=None, help="job to resume (default of the latest unfinished)")
+
+    commands.add_parser("benchmark", help="time the locator strategies against the app, and keep the fastest")
+
+    for command, text in [("verify", "check each month of the segmented datastore against its manifest"),
+                          ("compact", "re-write each month of the segmented datastore without duplicate entries")]:
+        partition = commands.add_parser(command, help=text)
+        partition.add_argument("--section", choices=SegmentedJSONCtrl.sections, default=None, help="single section")
+        partition.add_argument("--month", default=None, help="single month (YYYY-MM)")
+
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+
+    if (arguments.command == "jobs"):
+        for job in ScrapeJob.list_jobs(ls.rootFolder):
+            print(job.summary())
+        return 1
+
+    if (arguments.command in ("verify", "compact")):
+        return partition_command(arguments)
+
+    mfp = MyFitnessPal()
+    try:
+        if (mfp.goto_diary_page() == 0):
+            print("Unable to open the MyFitnessPal diary, exiting...")
+            return 0
+
+        match arguments.command:
+            case "scrap":
+                return mfp.scrap_diary_from_date(arguments.start, arguments.days, arguments.step)
+            case "backfill":
+                return mfp.backfill(arguments.start, arguments.end)
+            case "refresh":
+                return mfp.refresh_recent(arguments.days)
+            case "resume":
+                return mfp.resume_job(arguments.job_id)
+            case "benchmark":
+                return mfp.benchmark_locators()
+
+    finally:
+        mfp.app.quit()
+
+
+def partition_command(arguments):
+    # Verify/compact the partitions of the segmented datastore, one at a time (see '_Segmented.py')
+    datastore = MyFitnessPal.open_datastore(ls.rootFolder)
+    if (isinstance(datastore, SegmentedJSONCtrl) is False):
+        print(f"The '{dv.datastore_backend}' datastore isn't partitioned, see 'AppConfig.datastore_backend'")
+        return 0
+
+    result = 1
+    for section, month in datastore.partitions(arguments.section, arguments.month):
+        if (arguments.command == "verify"):
+            reason = datastore.verify_partition(section, month)
+            print(f"{section} {month}: {'OK' if (reason == '') else reason}")
+            if (reason != ""):
+                result = 0
+        else:
+            print(f"{section} {month}: {datastore.compact_partition(section, month)} duplicate entries removed")
+
+    return result
+
+
+if __name__ == "__main__":
+    exit(0 if (main() == 1) else 1)
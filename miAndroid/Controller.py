@@ -8,11 +8,11 @@ from appium import webdriver
 from appium.options.android import UiAutomator2Options
 from appium.webdriver.appium_service import AppiumService
 
-from appium.webdriver.common.appiumby import AppiumBy
-
 # support of waiting
 from appium.webdriver.extensions.android.nativekey import AndroidKey
 from bs4 import BeautifulSoup   # Used to parser the xml out from the WebElement
+import time
+from urllib.parse import urlparse
 
 # -- libraries needed in children
 from selenium.webdriver.support.ui import WebDriverWait  # Functions for waiting
@@ -22,25 +22,59 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from selenium.common.exceptions import NoSuchElementException
 from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import WebDriverException
 
 # Internal imports/from statements
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 from miAndroid.PhoneParameters import PhoneConfig as dv
+from miAndroid._Snapshot import ScreenSnapshot
+from miAndroid._Instrumentation import DriverInstrumentation, InstrumentedProxy
+from miAndroid._Retry import RetryPolicy
+from miAndroid._Locators import LocatorRegistry
+from miAndroid.SessionDaemon import SessionDaemon
 
 
 # noinspection PyRedundantParentheses
 class AndroidCtrl():
-    def __init__(self, internal_appium_service=True):
+    locators = LocatorRegistry(dv.locators)     # See 'locator', extended by the app controllers with their own locators
+
+    def __init__(self, internal_appium_service=True, driver=None, server_url=None, capabilities=None,
+                 session_daemon=None):
+        # 'driver' allows for a stand-in for the Appium webdriver to be provided (i.e. 'FakeDriver'), in which case no
+        # Appium Service/Server is needed
+        # 'server_url'/'capabilities' select a specific Appium Server and emulator, where more than one is running (see
+        # 'PhoneConfig.parallel_devices'). 'capabilities' are applied on top of 'PhoneConfig.capabilities'
+        # 'session_daemon' - attach to the session of the running 'SessionDaemon' (if there is one), rather than starting
+        # an Appium Service/session of our own. Default of 'PhoneConfig.use_session_daemon'
         self.appium_service = None
         self.internal_appium_service = False    # Stores whether the class will have a active Appium Service internal
+        self.server_url = dv.appium_server_url if (server_url is None) else server_url
+        self.session_attached = False           # Whether the driver is the shared session of the 'SessionDaemon'
+
+        session_daemon = dv.use_session_daemon if (session_daemon is None) else session_daemon
+        if (driver is None and server_url is None and capabilities is None and session_daemon is True):
+            driver = SessionDaemon.attach()
+            if (driver is not None):
+                print(f"Attached to the session daemon ({driver.session_id})")
+                self.session_attached = True
+
+        if (driver is not None):
+            self.driver = driver
 
-        if (internal_appium_service is True):
-            self.start_appium_service()
+        else:
+            if (internal_appium_service is True):
+                self.start_appium_service()
 
-        self.driver = webdriver.Remote(dv.appium_server_url,
-                                       options=UiAutomator2Options().load_capabilities(dv.capabilities))
+            device_capabilities = dict(dv.capabilities)
+            device_capabilities.update(capabilities if (capabilities is not None) else {})
+            self.driver = webdriver.Remote(self.server_url,
+                                           options=UiAutomator2Options().load_capabilities(device_capabilities))
 
         self.phone_wait = WebDriverWait(self.driver, dv.phone_interaction_wait_time)
+        self.instrumentation = None     # See 'enable_instrumentation'
+        self.retry = RetryPolicy(self)  # Retrying of individual operations, see 'click_element'/'element_text'
+        self.screen_rotation = None     # Orientation of the last 'ScreenSnapshot', see 'cached_geometry'
+        self.geometry_cache = {}        # (name, session, rotation) -> bounds, see 'cached_geometry'
         self.am_active = 1
         self.background_view_active = 0     # Assumes that this function has been called whilst phone is NOT in the
                                             # background view
@@ -56,6 +90,12 @@ class AndroidCtrl():
 
     def quit(self):
         print("Closing down Android controller....")
+        if (self.session_attached is True):
+            # The session (and the apps left open) carry on within the daemon, ready for the next run
+            SessionDaemon.release(self.driver)
+            self.am_active = 0
+            return
+
         self.close_all_apps()   # Close every app present (will check if the background view is active and enable if
                                 # not)
         self.driver.quit()      # Close the driver
@@ -68,7 +108,7 @@ class AndroidCtrl():
     def start_appium_service(self):
         print("Starting the Appium Service/Server...", end='')
         self.appium_service = AppiumService()
-        self.appium_service.start()
+        self.appium_service.start(args=['--port', str(urlparse(self.server_url).port or 4723)])
         print("OK")
         self.internal_appium_service = True
 
@@ -78,6 +118,49 @@ class AndroidCtrl():
         self.internal_appium_service = False
         print("OK")
 
+    def enable_instrumentation(self):
+        # Time every driver command/wait/pause from this point onwards (see '_Instrumentation.py'). To be called once
+        # all the waits (i.e. 'phone_wait') have been created, as these are wrapped as well
+        if (self.instrumentation is None):
+            self.instrumentation = DriverInstrumentation(self)
+            self.driver = InstrumentedProxy(self.driver, self.instrumentation)
+
+            for name, value in list(vars(self).items()):
+                if isinstance(value, WebDriverWait):
+                    setattr(self, name, InstrumentedProxy(value, self.instrumentation, kind="wait"))
+
+        return self.instrumentation
+
+    def pause(self, seconds):
+        # Wrapper for 'time.sleep', so that the time spent is captured by the instrumentation (if enabled)
+        if (self.instrumentation is None):
+            time.sleep(seconds)
+        else:
+            self.instrumentation.timed("sleep", f"{seconds}s", time.sleep, seconds)
+
+    def locator(self, name, *args):
+        # Locator (strategy, value) of the named element (see 'PhoneConfig.locators' and '_Locators.py'), '*args' fill
+        # in any '{0}'.. within the value
+        return self.locators.get(name, *args)
+
+    def benchmark_locators(self, names=None, args=None):
+        # Time every candidate of the locators present on the current screen, and use the fastest from now on (see
+        # 'LocatorRegistry.benchmark')
+        results = self.locators.benchmark(self.driver, names, dv.locator_benchmark_repeats, args)
+        LocatorRegistry.print_benchmark(results)
+        return results
+
+    def click_element(self, locator, operation="click_element", wait=None):
+        # Wait for the element to be clickable and click it, retried as a single operation (see '_Retry.py'). The
+        # element is found again upon each attempt, so a stale element is re-resolved rather than failing
+        wait = self.phone_wait if (wait is None) else wait
+        self.retry.run(operation, lambda: wait.until(EC.element_to_be_clickable(locator)).click())
+
+    def element_text(self, locator, operation="element_text", wait=None):
+        # As 'click_element', but returning the text of the element once it is visible
+        wait = self.phone_wait if (wait is None) else wait
+        return self.retry.run(operation, lambda: wait.until(EC.visibility_of_element_located(locator)).text)
+
     def back(self):
         # Wrapper for the 'webdriver' back function
         self.driver.back()
@@ -93,35 +176,203 @@ class AndroidCtrl():
             print(parser_screen, file=f)
             f.close()
 
+    def get_screen_snapshot(self):
+        # Capture the full UI hierarchy in a single request, so that it can be searched locally (see 'ScreenSnapshot')
+        snapshot = ScreenSnapshot(self.driver.page_source)
+        self.screen_rotation = snapshot.rotation()
+        return snapshot
+
+    def cached_geometry(self, name, find):
+        # Bounds of a fixed part of the screen (i.e. the navigation ribbon of an app), which only changes with the
+        # session or orientation. 'find' is called upon the first use for the session/orientation (as last seen by
+        # 'get_screen_snapshot'), and its result is kept unless it is 0 (not found)
+        key = (name, getattr(self.driver, 'session_id', None), self.screen_rotation)
+        if (key not in self.geometry_cache):
+            bounds = find()
+            if (bounds == 0):
+                return 0
+            self.geometry_cache[key] = bounds
+
+        return self.geometry_cache[key]
+
+    def wait_for_settle(self, resource_id=None, max_wait=None):
+        # Replacement for fixed sleeps after an action. Returns as soon as the UI has stabilised - two consecutive
+        # captures of the UI hierarchy being identical - and (if provided) the 'resource_id' is present. The final
+        # 'ScreenSnapshot' is returned so that it can be re-used, or 0 if the UI didn't settle within 'max_wait' seconds
+        # (default of 'PhoneConfig.settle_max_wait')
+        if (max_wait is None):
+            max_wait = dv.settle_max_wait
+
+        end_time = time.monotonic() + max_wait
+        previous_hash = None
+
+        while (True):
+            snapshot = self.get_screen_snapshot()
+            current_hash = hash(snapshot.page_source)
+
+            if (current_hash == previous_hash and (resource_id is None or snapshot.find(resource_id) is not None)):
+                return snapshot
+
+            if (time.monotonic() >= end_time):
+                print(f"UI has not settled within {max_wait}s" +
+                      ("" if (resource_id is None) else f" (waiting for '{resource_id}')"))
+                return 0
+
+            previous_hash = current_hash
+            self.pause(dv.settle_poll_interval)
+
+    @staticmethod
+    def signature_matches(signature, index, content_descs):
+        # 'index' - resource-id -> first element with the resource-id, 'content_descs' - set of all the content-desc
+        for requirement in signature.get("resource_ids", []):
+            options = (requirement,) if isinstance(requirement, str) else requirement
+            if (not any([x in index for x in options])):
+                return False
+
+        for requirement in signature.get("content_desc", []):
+            options = (requirement,) if isinstance(requirement, str) else requirement
+            if (not any([x in content_descs for x in options])):
+                return False
+
+        for resource_id, text in signature.get("text", {}).items():
+            if (resource_id not in index or ScreenSnapshot.first_text(index[resource_id]) != text):
+                return False
+
+        return True
+
+    def classify_screen(self, signatures=(), snapshot=None):
+        # Identify the current view from a single capture of the UI hierarchy, by matching it against a table of view
+        # signatures - the provided (app specific) 'signatures', followed by 'PhoneConfig.view_signatures'. Returns a
+        # dictionary of the view ("UNKNOWN" if nothing matches), the 'data' read from the view and the 'snapshot', so
+        # that it can be re-used by the caller
+        if (snapshot is None):
+            snapshot = self.get_screen_snapshot()
+
+        signatures = list(signatures) + dv.view_signatures
+
+        wanted = set()
+        for view, signature in signatures:
+            for requirement in signature.get("resource_ids", []):
+                wanted.update((requirement,) if isinstance(requirement, str) else requirement)
+            wanted.update(signature.get("text", {}).keys())
+            wanted.update(signature.get("data", {}).values())
+
+        # Single pass over the screen, capturing everything that any of the signatures needs
+        index = {}
+        content_descs = set()
+        for node in snapshot.root.iter():
+            resource_id = node.get('resource-id')
+            if (resource_id in wanted and resource_id not in index):
+                index[resource_id] = node
+            if (node.get('content-desc')):
+                content_descs.add(node.get('content-desc'))
+
+        for view, signature in signatures:
+            if (AndroidCtrl.signature_matches(signature, index, content_descs) is True):
+                data = {name: (ScreenSnapshot.first_text(index[resource_id]) if (resource_id in index) else None)
+                        for (name, resource_id) in signature.get("data", {}).items()}
+
+                if (view == "LAUNCHER_HOME"):
+                    self.background_view_active = 0     # Same as 'check_screen_is_homeview', update state
+
+                return {"view": view, "data": data, "snapshot": snapshot}
+
+        return {"view": "UNKNOWN", "data": {}, "snapshot": snapshot}
+
+    def swipe_between_rects(self, rect_from, rect_to, duration):
+        # Equivalent of 'driver.scroll(element_from, element_to, duration)', however using the bounds of elements
+        # captured within a 'ScreenSnapshot' rather than WebElements
+        start_x, start_y = ScreenSnapshot.centre(rect_from)
+        end_x, end_y = ScreenSnapshot.centre(rect_to)
+        self.driver.swipe(start_x, start_y, end_x, end_y, duration)
+
+    def fling_to_extreme(self, resource_id, direction="BOTTOM", snapshot=None):
+        # Fling the scrollable element with the resource-id to its "TOP"/"BOTTOM" ('mobile: flingGesture'), which is
+        # much faster than the slow drags of 'swipe_between_rects'. The extreme has been reached once the gesture reports
+        # that it can't scroll any further, or two consecutive captures of the element are identical.
+        # Returns the final (settled) 'ScreenSnapshot', 0 if the element isn't present, or 'None' if fling gestures are
+        # not supported (so that the caller can fall back to swiping)
+        snapshot = self.get_screen_snapshot() if (snapshot is None) else snapshot
+        previous_hash = None
+
+        for i in range(dv.fling_max_gestures):
+            element = snapshot.find(resource_id)
+            if (element is None):
+                return 0
+
+            current_hash = ScreenSnapshot.subtree_hash(element)
+            if (current_hash == previous_hash):
+                break
+            previous_hash = current_hash
+
+            rect = ScreenSnapshot.rect(element)
+            try:
+                can_scroll = self.driver.execute_script("mobile: flingGesture", {
+                    "left": rect['x'], "top": rect['y'], "width": rect['width'], "height": rect['height'],
+                    "direction": "up" if (direction == "TOP") else "down", "speed": dv.fling_speed})
+
+            except WebDriverException:
+                return None
+
+            settled_snapshot = self.wait_for_settle(resource_id=resource_id)
+            snapshot = settled_snapshot if (settled_snapshot != 0) else self.get_screen_snapshot()
+            if (can_scroll is False):
+                break
+
+        return snapshot
+
+    def tap_rect(self, rect):
+        # Tap the centre of the bounds of an element captured within a 'ScreenSnapshot'
+        self.driver.tap([ScreenSnapshot.centre(rect)])
+
     def android_backgroundapp_view(self):
         # Trigger the app background view (and confirm that this has been selected)
         self.background_view_active = 1     # background view has been triggered, update state
         self.driver.press_keycode(AndroidKey.APP_SWITCH)
 
+    def probe(self, locator, timeout=dv.probe_wait_time):
+        # Fast-fail alternative to the blocking waits (i.e. 'phone_wait'), for checks where the element is legitimately
+        # expected to be absent. Returns the list of elements matching the locator - empty if there are none - after
+        # at most 'timeout' seconds (by default a single request, with no waiting at all)
+        try:
+            if (timeout <= 0):
+                return self.driver.find_elements(*locator)
+
+            return WebDriverWait(self.driver, timeout, poll_frequency=dv.probe_poll_interval).until(
+                EC.presence_of_all_elements_located(locator))
+
+        except (TimeoutException, NoSuchElementException, StaleElementReferenceException) as e:
+            return []
+
     def android_background_view_is_empty(self):
         # Check if the background view has the "No recent items" text present
-        try:
-            self.phone_wait.until(EC.visibility_of_all_elements_located(
-                ("xpath", "//*[@content-desc='No recent items']")))
+        # Wait for the background view to have finished opening, so that the check below can be a probe rather than
+        # waiting the full 'phone_interaction_wait_time' when there are still apps open (the common case)
+        self.wait_for_settle()
+        if (len(self.probe(self.locator("no_recent_items"))) != 0):
             return 1
 
-        except TimeoutException:
-            print("There are still items in the background view")
-            return 0
+        print("There are still items in the background view")
+        return 0
 
-    def check_screen_is_homeview(self):
+    def check_screen_is_homeview(self, probe=False):
         # This function is to confirm that the current viewset is indeed the homeview, with nothing else visible.
         # This is done by confirming...
         # That there is a "resource-id"="com.google.android.apps.nexuslauncher:id/drag_layer", parameter. That within
         # this there is a "/workspace" parameter as well.
+        # 'probe' is to be set where the homeview is not expected (see 'close_all_apps'), so that the check fails
+        # straight away rather than waiting for the homeview to appear
+        drag_layer_locator = self.locator("launcher_drag_layer")
         try:
             # Check 1, see if
-            drag_layer = self.phone_wait.until(EC.visibility_of_all_elements_located(
-                ("xpath", "//*[contains(@resource-id, 'com.google.android.apps.nexuslauncher:id/drag_layer')]")))
+            if (probe is True):
+                drag_layer = self.probe(drag_layer_locator)
+                if (len(drag_layer) == 0):
+                    raise NoSuchElementException("Homeview 'drag_layer' not present")
+            else:
+                drag_layer = self.phone_wait.until(EC.visibility_of_all_elements_located(drag_layer_locator))
 
-            workspace = drag_layer[0].find_element(by=AppiumBy.XPATH,
-                                                   value=".//*[contains(@resource-id, "
-                                                         "'com.google.android.apps.nexuslauncher:id/workspace')]")
+            workspace = drag_layer[0].find_element(*self.locator("launcher_workspace"))
 
             # Will only get to this point if both of the above don't error. Therefore, this page is indeed the
             # "Homepage" so return 1
@@ -136,14 +387,14 @@ class AndroidCtrl():
         # The structure of my Emulated Android phone, will be to have a folder at the "Home" level with the following
         # name "Auto App Folder". Within this will be ALL the apps that I intend or have automated
         try:
-            folder_object = self.phone_wait.until(EC.element_to_be_clickable(("xpath", "//*[@text='Auto App Folder']")))
+            folder_object = self.phone_wait.until(EC.element_to_be_clickable(self.locator("app_folder")))
             # Look for and open the "Auto App Folder"
             if (folder_object.get_attribute("class") == "android.widget.TextView"):
                 folder_object.click()
 
             # After having clicked, check that this has indeed opened a folder, with the same name + now the class has
             # changed to "EditText"
-            folder_object = self.phone_wait.until(EC.element_to_be_clickable(("xpath", "//*[@text='Auto App Folder']")))
+            folder_object = self.phone_wait.until(EC.element_to_be_clickable(self.locator("app_folder")))
             if (folder_object.get_attribute("class") == "android.widget.EditText"):
                 return 1
             else:
@@ -167,7 +418,7 @@ class AndroidCtrl():
             return
 
         # Now....here, we are in the background view AND there is something that needs to be removed!
-        apps_running = self.driver.find_elements("xpath", "//*[@content-desc]")
+        apps_running = self.driver.find_elements(*self.locator("described_elements"))
         # Whilst in the background view, there should only be two entries which have a 'content-desc'. Which is the top
         # level (with a ''), and the home button (with a 'Home').
         # So will loop, and swipe "up" the last but one entry...
@@ -195,11 +446,12 @@ class AndroidCtrl():
             # work
 
             # Re-calculate the number of apps running
-            if (self.check_screen_is_homeview() == 1):  # If detect that the homepage is active. Then all background
+            self.wait_for_settle()                      # Let the card animation complete, before probing the view
+            if (self.check_screen_is_homeview(probe=True) == 1):  # If detect that the homepage is active. Then all background
                                                         # tasks have been closed
                 break
             else:
-                apps_running = self.driver.find_elements("xpath", "//*[@content-desc]")
+                apps_running = self.driver.find_elements(*self.locator("described_elements"))
 
     @staticmethod
     def confirm_at_least_one_webelement_match(element1, element2):
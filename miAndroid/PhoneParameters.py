@@ -20,4 +20,73 @@ class PhoneConfig:
 
     appium_server_url = 'http://localhost:4723'
 
-    phone_interaction_wait_time = 15        # seconds
\ No newline at end of file
+    # Appium Server + emulator of each device used for the parallel scrape ('MyFitnessPal.scrap_diary_parallel'). Every
+    # device needs its own Appium port, 'udid' and 'systemPort' (port of the UiAutomator2 server upon the host)
+    parallel_devices = [
+        dict(server_url='http://localhost:4723', capabilities=dict(udid='emulator-5554', systemPort=8200)),
+        dict(server_url='http://localhost:4724', capabilities=dict(udid='emulator-5556', systemPort=8201)),
+    ]
+
+    # Long lived session shared between runs, see 'SessionDaemon.py'. Used (if running) by any 'AndroidCtrl' which
+    # isn't given a specific driver/Appium Server/capabilities
+    use_session_daemon              = True
+    session_daemon_address          = ('127.0.0.1', 4790)
+    session_daemon_timeout          = 120   # seconds, allows for the daemon re-creating the session
+    session_daemon_health_interval  = 300   # seconds, between checks of the idle session (less than newCommandTimeout)
+    session_daemon_lease_renewal    = 60    # seconds, between renewals of the session handed out to a running client
+    session_daemon_lease_expiry     = 600   # seconds without a renewal, after which the client is taken to have crashed
+
+    phone_interaction_wait_time = 15        # seconds
+
+    settle_max_wait             = 10        # seconds, maximum time 'wait_for_settle' will wait for the UI to stabilise
+    settle_poll_interval        = 0.25      # seconds, between each capture of the UI whilst waiting for it to settle
+
+    probe_wait_time             = 0         # seconds, default time 'probe' will wait for an element (0 = no waiting)
+    probe_poll_interval         = 0.1       # seconds, between each request whilst a 'probe' is waiting
+
+    fling_speed                 = 7500      # pixels per second, of the 'fling_to_extreme' gestures
+    fling_max_gestures          = 16        # maximum number of flings made by 'fling_to_extreme'
+
+    # Retrying of individual operations, see '_Retry.py'
+    retry_max_attempts          = 3         # attempts of an operation (including the first) before it has failed
+    retry_initial_backoff       = 0.5       # seconds, before the first retry. Doubled for each subsequent retry
+    retry_max_backoff           = 4         # seconds, maximum backoff between attempts
+    retry_budget                = 25        # retries allowed per operation, for the life of the controller
+
+    # Signatures of the phone (launcher) views, see 'classify_screen'. Checked in order, after any app specific
+    # signatures
+    #   'resource_ids'  - every entry must be present, an entry which is a tuple is met by any one of its resource-ids
+    #   'content_desc'  - as above, but for the content-desc of the elements
+    #   'text'          - resource-id -> expected text of the element (or the first element below it with text)
+    #   'data'          - name -> resource-id, whose text is returned with the classified view
+    view_signatures = [
+        ("RECENTS",         {"content_desc": [("No recent items", "Home")]}),
+        ("LAUNCHER_HOME",   {"resource_ids": ["com.google.android.apps.nexuslauncher:id/drag_layer",
+                                              "com.google.android.apps.nexuslauncher:id/workspace"]}),
+    ]
+
+    # Locators of the phone (launcher) elements, see '_Locators.py'. Each is a list of (strategy, value) candidates in
+    # order of preference, the fastest native strategy first and the xpath last. '{0}' is filled in by the caller
+    locator_benchmark_repeats = 3           # times each candidate is looked up by the locator benchmark
+    locators = {
+        "no_recent_items":      [("accessibility id", "No recent items"),
+                                 ("-android uiautomator", 'new UiSelector().description("No recent items")'),
+                                 ("xpath", "//*[@content-desc='No recent items']")],
+        "launcher_drag_layer":  [("id", "com.google.android.apps.nexuslauncher:id/drag_layer"),
+                                 ("xpath", "//*[contains(@resource-id, "
+                                           "'com.google.android.apps.nexuslauncher:id/drag_layer')]")],
+        "launcher_workspace":   [("id", "com.google.android.apps.nexuslauncher:id/workspace"),     # Within drag layer
+                                 ("xpath", ".//*[contains(@resource-id, "
+                                           "'com.google.android.apps.nexuslauncher:id/workspace')]")],
+        "app_folder":           [("-android uiautomator", 'new UiSelector().text("Auto App Folder")'),
+                                 ("xpath", "//*[@text='Auto App Folder']")],
+        "navigation_bar":       [("id", "android:id/navigationBarBackground"),
+                                 ("xpath", ".//*[@resource-id='android:id/navigationBarBackground']")],
+        "described_elements":   [("xpath", "//*[@content-desc]")],  # Every element with a content-desc (even if empty)
+        "content_desc":         [("accessibility id", "{0}"),
+                                 ("-android uiautomator", 'new UiSelector().description("{0}")'),
+                                 ("xpath", "//*[@content-desc='{0}']")],
+        "resource_id":          [("id", "{0}"),
+                                 ("-android uiautomator", 'new UiSelector().resourceId("{0}")'),
+                                 ("xpath", "//*[@resource-id='{0}']")],
+    }
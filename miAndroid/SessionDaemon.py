@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# This script covers a long lived Appium session, which is shared by every run of the scripts (rather than each run
+# starting its own Appium Service/Server and UiAutomator2 session, which takes several seconds).
+# The daemon owns the Appium Service and the driver session, and listens upon a local socket (see
+# 'PhoneConfig.session_daemon_address'). 'AndroidCtrl' asks the daemon for its session upon creation, and attaches to
+# it; falling back to its own session if the daemon isn't running.
+# The session is checked before it is handed out (and every 'PhoneConfig.session_daemon_health_interval' seconds), and
+# is re-created if it has been lost, i.e. the UiAutomator2 server upon the emulator has crashed.
+# Each session handed out is a "lease", which the client renews whilst it is running (every
+# 'PhoneConfig.session_daemon_lease_renewal' seconds, see 'keep_lease') and releases once it is done
+# ('AndroidCtrl.quit'). The periodic check is skipped whilst any lease is held, so the session is never re-created
+# underneath a client mid-scrape (the client's own commands keep it alive). A lease which hasn't been renewed for
+# 'PhoneConfig.session_daemon_lease_expiry' seconds (i.e. the client crashed) is dropped.
+#
+#   python -m miAndroid.SessionDaemon start      - run the daemon (until stopped)
+#   python -m miAndroid.SessionDaemon status     - report the state of the running daemon
+#   python -m miAndroid.SessionDaemon recreate   - force a new session
+#   python -m miAndroid.SessionDaemon stop       - stop the running daemon, along with its session/Appium Service
+
+# External imports/from statements
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from appium import webdriver
+from appium.options.android import UiAutomator2Options
+from appium.webdriver.appium_service import AppiumService
+from selenium.common.exceptions import WebDriverException
+
+import argparse
+import json
+import socket
+import socketserver
+import threading
+import time
+from urllib.parse import urlparse
+
+# Internal imports/from statements
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from miAndroid.PhoneParameters import PhoneConfig as dv
+
+
+# noinspection PyRedundantParentheses
+class AttachedRemote(webdriver.Remote):
+    # 'webdriver.Remote' which joins an existing session (handed out by the daemon), rather than creating a new one.
+    # 'quit' is not to be called upon it, as that would end the session for every other run as well
+    def __init__(self, server_url, session_id, session_capabilities):
+        self.attach_session_id = session_id
+        self.attach_capabilities = session_capabilities
+        webdriver.Remote.__init__(self, server_url, direct_connection=False,
+                                  options=UiAutomator2Options().load_capabilities(dv.capabilities))
+
+    def start_session(self, capabilities, browser_profile=None):
+        self.session_id = self.attach_session_id
+        self.caps = self.attach_capabilities
+
+
+# noinspection PyRedundantParentheses
+class SessionDaemon():
+    def __init__(self, address=dv.session_daemon_address, server_url=dv.appium_server_url, capabilities=None,
+                 internal_appium_service=True):
+        self.address = tuple(address)
+        self.server_url = server_url
+        self.capabilities = dict(dv.capabilities)
+        self.capabilities.update(capabilities if (capabilities is not None) else {})
+
+        self.internal_appium_service = internal_appium_service
+        self.appium_service = None
+        self.driver = None
+        self.lock = threading.Lock()    # Only one request is to act upon the session at a time
+        self.server = None
+        self.started = time.time()
+        self.sessions_created = 0
+        self.last_health_check = None
+        self.leases = {}                # lease -> time it was handed out/last renewed, see 'handle'
+        self.next_lease = 1
+
+    # =================================================================================================================
+    # SESSION
+    # =================================================================================================================
+    def start_appium_service(self):
+        if (self.appium_service is not None and self.appium_service.is_running):
+            return
+
+        print("Starting the Appium Service/Server...", end='')
+        self.appium_service = AppiumService()
+        self.appium_service.start(args=['--port', str(urlparse(self.server_url).port or 4723)])
+        print("OK")
+
+    def create_session(self):
+        self.close_session()
+        if (self.internal_appium_service is True):
+            self.start_appium_service()
+
+        print("Creating a new Appium session...", end='')
+        self.driver = webdriver.Remote(self.server_url,
+                                       options=UiAutomator2Options().load_capabilities(self.capabilities))
+        self.sessions_created += 1
+        print(f"OK ({self.driver.session_id})")
+
+    def close_session(self):
+        if (self.driver is None):
+            return
+
+        try:
+            self.driver.quit()
+        except WebDriverException:
+            None    # Session has already been lost
+        self.driver = None
+
+    def session_is_healthy(self):
+        # Cheap round trip through the Appium Server to the UiAutomator2 server, which also resets the
+        # 'newCommandTimeout' of the session so that it isn't closed whilst idle
+        if (self.driver is None):
+            return False
+
+        if (self.appium_service is not None and self.appium_service.is_running is False):
+            return False
+
+        try:
+            self.driver.current_package
+            self.last_health_check = time.time()
+            return True
+
+        except WebDriverException:
+            return False
+
+    def ensure_session(self):
+        # Return the (healthy) session, re-creating it if needed
+        if (self.session_is_healthy() is False):
+            print("Session is not available...")
+            self.create_session()
+
+        return self.driver
+
+    def describe(self):
+        return {
+            "server_url": self.server_url,
+            "session_id": None if (self.driver is None) else self.driver.session_id,
+            "capabilities": {} if (self.driver is None) else dict(self.driver.caps),
+            "sessions_created": self.sessions_created,
+            "uptime": round(time.time() - self.started),
+            "last_health_check": self.last_health_check,
+            "leases": len(self.leases)
+        }
+
+    def expire_leases(self):
+        expired = [x for (x, y) in self.leases.items() if (time.time() - y > dv.session_daemon_lease_expiry)]
+        for lease in expired:
+            print(f"Lease {lease} has not been renewed/released, dropping it...")
+            del self.leases[lease]
+
+    # =================================================================================================================
+    # SERVER
+    # =================================================================================================================
+    def handle(self, request):
+        # Act upon a single request from a client, returning the response
+        command = request.get("command")
+        with self.lock:
+            try:
+                if (command == "session"):
+                    self.ensure_session()
+                    lease = self.next_lease
+                    self.leases[lease] = time.time()
+                    self.next_lease += 1
+                    return dict(ok=True, lease=lease, **self.describe())
+                elif (command == "renew"):
+                    if (request.get("lease") is None):
+                        return {"ok": False, "error": "No lease to renew"}
+                    self.leases[request["lease"]] = time.time()        # Held once more, if it had been dropped
+                elif (command == "release"):
+                    self.leases.pop(request.get("lease"), None)
+                elif (command == "recreate"):
+                    self.create_session()
+                elif (command == "status"):
+                    None
+                elif (command == "stop"):
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    return {"ok": False, "error": f"Unknown command '{command}'"}
+
+            except WebDriverException as e:
+                return {"ok": False, "error": f"Unable to create a session - {e.msg}"}
+
+            return dict(ok=True, **self.describe())
+
+    def __health_loop(self):
+        while (True):
+            time.sleep(dv.session_daemon_health_interval)
+            with self.lock:
+                self.expire_leases()
+                if (len(self.leases) != 0):
+                    continue    # A client is using the session, which it will recreate (if needed) upon request
+
+                try:
+                    self.ensure_session()
+                except WebDriverException as e:
+                    print(f"Unable to re-create the session - {e.msg}")
+
+    def serve(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    request = json.loads(self.rfile.readline())
+                    response = daemon.handle(request)
+                except ValueError:
+                    response = {"ok": False, "error": "Request is not valid json"}
+
+                self.wfile.write((json.dumps(response) + "\n").encode())
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer(self.address, Handler)
+
+        with self.lock:
+            self.create_session()
+        threading.Thread(target=self.__health_loop, daemon=True).start()
+
+        print(f"Session daemon listening upon {self.address[0]}:{self.address[1]}")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.close_session()
+            if (self.appium_service is not None and self.appium_service.is_running):
+                self.appium_service.stop()
+            print("Session daemon has been stopped")
+
+    # =================================================================================================================
+    # CLIENT
+    # =================================================================================================================
+    @staticmethod
+    def request(command, address=dv.session_daemon_address, timeout=dv.session_daemon_timeout, **arguments):
+        # Send a request to the running daemon, returning its response. 'None' if the daemon isn't running
+        try:
+            with socket.create_connection(tuple(address), timeout=timeout) as connection:
+                connection.sendall((json.dumps(dict(command=command, **arguments)) + "\n").encode())
+                response = connection.makefile('r').readline()
+
+        except OSError:
+            return None
+
+        try:
+            return json.loads(response)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def attach(address=dv.session_daemon_address):
+        # Return a driver attached to the session of the running daemon, or 'None' if there isn't one
+        response = SessionDaemon.request("session", address)
+        if (response is None or response["ok"] is False):
+            if (response is not None):
+                print(f"Session daemon is unable to provide a session - {response['error']}")
+            return None
+
+        driver = AttachedRemote(response["server_url"], response["session_id"], response["capabilities"])
+        driver.daemon_lease = response["lease"]     # To be handed back, see 'release'
+        driver.daemon_lease_released = threading.Event()
+        threading.Thread(target=SessionDaemon.keep_lease, name="SessionDaemonLease", daemon=True,
+                         args=(driver.daemon_lease, driver.daemon_lease_released, address)).start()
+        return driver
+
+    @staticmethod
+    def keep_lease(lease, released, address=dv.session_daemon_address):
+        # Renew the lease for as long as the client is running, until it is released
+        while (released.wait(dv.session_daemon_lease_renewal) is False):
+            if (SessionDaemon.request("renew", address, lease=lease) is None):
+                print("Session daemon is no longer running, unable to renew the lease of the session")
+
+    @staticmethod
+    def release(driver, address=dv.session_daemon_address):
+        # Hand the session that 'driver' is attached to back to the daemon, so that it can check it once more
+        driver.daemon_lease_released.set()
+        SessionDaemon.request("release", address, lease=driver.daemon_lease)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="miAndroid.SessionDaemon", description="Long lived Appium session")
+    parser.add_argument("command", choices=["start", "status", "recreate", "stop"])
+    parser.add_argument("--host", default=dv.session_daemon_address[0], help="address to listen upon/connect to")
+    parser.add_argument("--port", type=int, default=dv.session_daemon_address[1])
+    parser.add_argument("--server-url", default=dv.appium_server_url, help="url of the Appium Server")
+    parser.add_argument("--external-appium", action="store_true", help="Appium Server is already running")
+    arguments = parser.parse_args(arguments)
+    address = (arguments.host, arguments.port)
+
+    if (arguments.command == "start"):
+        SessionDaemon(address, arguments.server_url,
+                      internal_appium_service=(arguments.external_appium is False)).serve()
+        return 1
+
+    response = SessionDaemon.request(arguments.command, address)
+    if (response is None):
+        print(f"Session daemon isn't running upon {address[0]}:{address[1]}")
+        return 0
+
+    print(json.dumps({x: y for (x, y) in response.items() if (x != "capabilities")}, indent=4))
+    return 1 if (response["ok"] is True) else 0
+
+
+if __name__ == "__main__":
+    exit(0 if (main() == 1) else 1)
@@ -0,0 +1,523 @@
+# This script covers an offline stand-in for the Appium 'webdriver.Remote', so that the 'AndroidCtrl' (and its
+# children) can be run without a live emulator, i.e. for benchmarking/regression testing of the scraping.
+# The UI hierarchy ('page_source') is served by a "screen source", which is either:
+#   'RecordedScreens'   - previously exported/recorded xml, moving onto the next screen after every action
+#   'FakePhone'         - simulation of the launcher/recents view, which hosts simulated apps (i.e. 'FakeMyFitnessPalApp')
+# Clicks/scrolls/key presses are passed to the screen source, which updates the screen accordingly.
+#
+# The screen source needs to provide the following functions:
+#   page_source()                   - return the current UI hierarchy xml
+#   on_click(node)                  - element (of the current hierarchy) has been clicked/tapped
+#   on_swipe(start, end, duration)  - swipe/scroll/flick from 'start' (x, y) to 'end' (x, y), duration in ms
+#   on_keycode(keycode)             - 'press_keycode'
+#   on_back()                       - 'back'
+#   on_text(node, text)             - (optional) text of an element has been set, 'send_keys'/'clear'
+#   on_script(script, args)         - (optional) 'execute_script', i.e. "mobile: flingGesture"
+
+# External imports/from statements
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lxml import etree
+import re
+
+from appium.webdriver.common.appiumby import AppiumBy
+from appium.webdriver.extensions.android.nativekey import AndroidKey
+
+# -- Import selenium error messages/exceptions
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import WebDriverException
+
+# Internal imports/from statements
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from miAndroid._Snapshot import ScreenSnapshot
+
+
+# noinspection PyRedundantParentheses
+class FakeWebElement():
+    # Equivalent of the 'WebElement', which refers to an element by a key (the 'fake-id' attribute if the screen source
+    # provides one, otherwise its path in the hierarchy). The element is looked up again upon every use, and will be
+    # 'stale' if no longer present; same as a real WebElement
+    def __init__(self, driver, key):
+        self.driver = driver
+        self.key = key
+
+    def __eq__(self, other):
+        return isinstance(other, FakeWebElement) and (self.key == other.key)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"FakeWebElement({self.key})"
+
+    @property
+    def id(self):
+        return self.key
+
+    @property
+    def node(self):
+        return self.driver.resolve_element(self.key)
+
+    @property
+    def rect(self):
+        self.driver.command_count += 1
+        return ScreenSnapshot.rect(self.node)
+
+    @property
+    def location(self):
+        rect = self.rect
+        return {'x': rect['x'], 'y': rect['y']}
+
+    @property
+    def size(self):
+        rect = self.rect
+        return {'width': rect['width'], 'height': rect['height']}
+
+    @property
+    def text(self):
+        self.driver.command_count += 1
+        return ScreenSnapshot.text(self.node)
+
+    def get_attribute(self, name):
+        self.driver.command_count += 1
+        node = self.node
+
+        if (name == 'outerHTML'):
+            return etree.tostring(node, encoding='unicode')
+        if (name == 'class'):
+            return node.get('class', node.tag)
+
+        return node.get(name)
+
+    def is_displayed(self):
+        return (self.get_attribute('displayed') != 'false')
+
+    def is_enabled(self):
+        return (self.get_attribute('enabled') != 'false')
+
+    def find_element(self, by=AppiumBy.ID, value=None):
+        return self.driver.find_element(by, value, parent=self)
+
+    def find_elements(self, by=AppiumBy.ID, value=None):
+        return self.driver.find_elements(by, value, parent=self)
+
+    def click(self):
+        node = self.node
+        self.driver.command_count += 1
+        self.driver.screen_source.on_click(node)
+        self.driver.screen_changed()
+
+    def send_keys(self, *value):
+        node = self.node
+        self.driver.command_count += 1
+        self.driver.screen_source.on_text(node, node.get('fake-text', '') + ''.join([str(x) for x in value]))
+        self.driver.screen_changed()
+
+    def clear(self):
+        node = self.node
+        self.driver.command_count += 1
+        self.driver.screen_source.on_text(node, '')
+        self.driver.screen_changed()
+
+
+# noinspection PyRedundantParentheses
+class FakeDriver():
+    def __init__(self, screen_source, window_size=(1080, 2400)):
+        self.screen_source = screen_source
+        self.window_size = window_size
+        self.session_id = "fake-session"
+
+        self.command_count = 0      # Number of driver "round trips", for comparison of the approaches of reading
+        self.generation = 0         # Increased every time that the screen may have changed
+
+        self.__snapshot = None
+        self.__snapshot_generation = -1
+        self.__snapshot_keys = {}
+
+    # =================================================================================================================
+    # SCREEN STATE
+    # =================================================================================================================
+    def screen_changed(self):
+        self.generation += 1
+
+    def current_snapshot(self):
+        if (self.__snapshot_generation != self.generation):
+            self.__snapshot = ScreenSnapshot(self.screen_source.page_source())
+            self.__snapshot_generation = self.generation
+
+            tree = self.__snapshot.root.getroottree()
+            self.__snapshot_keys = {FakeDriver.key_of(tree, node): node for node in self.__snapshot.root.iter()}
+
+        return self.__snapshot
+
+    @staticmethod
+    def key_of(tree, node):
+        fake_id = node.get('fake-id')
+        if (fake_id is not None):
+            return fake_id
+
+        return tree.getpath(node)
+
+    def resolve_element(self, key):
+        self.current_snapshot()
+        node = self.__snapshot_keys.get(key)
+        if (node is None):
+            raise StaleElementReferenceException(f"Element '{key}' is no longer present in the current screen")
+
+        return node
+
+    @property
+    def page_source(self):
+        self.command_count += 1
+        return self.screen_source.page_source()
+
+    # =================================================================================================================
+    # FIND ELEMENTS
+    # =================================================================================================================
+    def __search(self, by, value, node):
+        if (by == AppiumBy.XPATH):
+            try:
+                return [x for x in node.xpath(value) if isinstance(x, etree._Element)]
+            except etree.XPathError:
+                raise WebDriverException(f"Invalid xpath - {value}")
+
+        if (by == AppiumBy.CLASS_NAME):
+            return [x for x in node.iterdescendants() if (x.get('class', x.tag) == value)]
+
+        if (by == AppiumBy.ID):
+            return [x for x in node.iterdescendants()
+                    if (x.get('resource-id') == value or x.get('resource-id', '').endswith(f":id/{value}"))]
+
+        if (by == AppiumBy.ACCESSIBILITY_ID):
+            return [x for x in node.iterdescendants() if (x.get('content-desc') == value)]
+
+        if (by == AppiumBy.ANDROID_UIAUTOMATOR):
+            return FakeDriver.__search_ui_selector(value, node)
+
+        raise WebDriverException(f"Locator strategy '{by}' is not supported by the FakeDriver")
+
+    # Subset of the UiSelector ('-android uiautomator' strategy) - attribute methods, and a single 'childSelector'
+    ui_selector_method = re.compile(r'\.(\w+)\("((?:[^"\\]|\\.)*)"\)')
+    ui_selector_attributes = {
+        "resourceId":           lambda node, arg: node.get('resource-id', '') == arg,
+        "resourceIdMatches":    lambda node, arg: re.fullmatch(arg, node.get('resource-id', '')) is not None,
+        "text":                 lambda node, arg: node.get('text', '') == arg,
+        "textContains":         lambda node, arg: arg in node.get('text', ''),
+        "textStartsWith":       lambda node, arg: node.get('text', '').startswith(arg),
+        "textMatches":          lambda node, arg: re.fullmatch(arg, node.get('text', '')) is not None,
+        "description":          lambda node, arg: node.get('content-desc', '') == arg,
+        "descriptionContains":  lambda node, arg: arg in node.get('content-desc', ''),
+        "descriptionStartsWith": lambda node, arg: node.get('content-desc', '').startswith(arg),
+        "descriptionMatches":   lambda node, arg: re.fullmatch(arg, node.get('content-desc', '')) is not None,
+        "className":            lambda node, arg: node.get('class', node.tag) == arg,
+    }
+
+    @staticmethod
+    def __parse_ui_selector(selector):
+        # Return the [(method, argument), ...] of a 'new UiSelector()...' chain
+        selector = selector.strip()
+        if (selector.startswith("new UiSelector()") is False):
+            raise WebDriverException(f"Invalid UiSelector - {selector}")
+
+        methods = selector[len("new UiSelector()"):]
+        parsed = [(x.group(1), x.group(2).replace('\\"', '"')) for x in FakeDriver.ui_selector_method.finditer(methods)]
+        if ("".join([x.group(0) for x in FakeDriver.ui_selector_method.finditer(methods)]) != methods):
+            raise WebDriverException(f"UiSelector not supported by the FakeDriver - {selector}")
+
+        for method, argument in parsed:
+            if (method not in FakeDriver.ui_selector_attributes):
+                raise WebDriverException(f"UiSelector method '{method}' is not supported by the FakeDriver")
+
+        return parsed
+
+    @staticmethod
+    def __search_ui_selector(value, node):
+        parent_selector, separator, child_selector = value.partition(".childSelector(")
+        parent_methods = FakeDriver.__parse_ui_selector(parent_selector)
+
+        def matches(methods, x):
+            return all([FakeDriver.ui_selector_attributes[method](x, argument) for (method, argument) in methods])
+
+        matched = [x for x in node.iterdescendants() if (matches(parent_methods, x))]
+        if (separator == ""):
+            return matched
+
+        child_methods = FakeDriver.__parse_ui_selector(child_selector.strip()[:-1])     # Remove the closing ')'
+        children = []
+        for parent in matched:
+            children += [x for x in parent.iterdescendants() if (matches(child_methods, x) and x not in children)]
+
+        return children
+
+    def find_elements(self, by=AppiumBy.ID, value=None, parent=None):
+        self.command_count += 1
+        snapshot = self.current_snapshot()
+        node = snapshot.root if (parent is None) else parent.node
+
+        tree = snapshot.root.getroottree()
+        return [FakeWebElement(self, FakeDriver.key_of(tree, x)) for x in self.__search(by, value, node)]
+
+    def find_element(self, by=AppiumBy.ID, value=None, parent=None):
+        elements = self.find_elements(by, value, parent)
+        if (len(elements) == 0):
+            raise NoSuchElementException(f"Unable to find element using '{by}' - {value}")
+
+        return elements[0]
+
+    # =================================================================================================================
+    # ACTIONS
+    # =================================================================================================================
+    def __node_at(self, x, y):
+        # The deepest element which contains the point (x, y)
+        match = None
+        for node in self.current_snapshot().root.iter():
+            rect = ScreenSnapshot.rect(node)
+            if (rect['x'] <= x < rect['x'] + rect['width'] and rect['y'] <= y < rect['y'] + rect['height']):
+                match = node
+
+        return match
+
+    def __swipe(self, start, end, duration):
+        self.command_count += 1
+        self.screen_source.on_swipe(start, end, duration)
+        self.screen_changed()
+        return self
+
+    def scroll(self, origin_el, destination_el, duration=None):
+        return self.__swipe(ScreenSnapshot.centre(origin_el.rect), ScreenSnapshot.centre(destination_el.rect),
+                            600 if (duration is None) else duration)
+
+    def swipe(self, start_x, start_y, end_x, end_y, duration=0):
+        return self.__swipe((start_x, start_y), (end_x, end_y), duration)
+
+    def flick(self, start_x, start_y, end_x, end_y):
+        return self.__swipe((start_x, start_y), (end_x, end_y), 0)
+
+    def tap(self, positions, duration=None):
+        self.command_count += 1
+        node = self.__node_at(*positions[0])
+        if (node is not None):
+            self.screen_source.on_click(node)
+            self.screen_changed()
+        return self
+
+    def press_keycode(self, keycode, metastate=None, flags=None):
+        self.command_count += 1
+        self.screen_source.on_keycode(keycode)
+        self.screen_changed()
+        return self
+
+    def back(self):
+        self.command_count += 1
+        self.screen_source.on_back()
+        self.screen_changed()
+
+    def execute_script(self, script, *args):
+        self.command_count += 1
+        if (hasattr(self.screen_source, "on_script") is False):
+            raise WebDriverException(f"Script '{script}' is not supported by the screen source")
+
+        result = self.screen_source.on_script(script, args)
+        self.screen_changed()
+        return result
+
+    def get_window_size(self):
+        return {'width': self.window_size[0], 'height': self.window_size[1]}
+
+    def implicitly_wait(self, time_to_wait):
+        None
+
+    def quit(self):
+        None
+
+
+# noinspection PyRedundantParentheses
+class RecordedScreens():
+    # Serves recorded 'page_source' xml (either file paths, or the xml itself) in order, moving onto the next screen
+    # after every action (staying on the last screen once reached)
+    def __init__(self, screens):
+        self.screens = screens
+        self.index = 0
+
+    def page_source(self):
+        screen = self.screens[self.index]
+        if (screen.lstrip().startswith('<')):
+            return screen
+
+        f = open(screen, 'r')
+        contents = f.read()
+        f.close()
+        return contents
+
+    def __next_screen(self, *args):
+        self.index = min(self.index + 1, len(self.screens) - 1)
+
+    on_click = __next_screen
+    on_swipe = __next_screen
+    on_keycode = __next_screen
+    on_back = __next_screen
+    on_text = __next_screen
+
+
+# noinspection PyRedundantParentheses
+class FakePhone():
+    # Simulation of the Android launcher (Home view + the app folder), and the background/recents view. Simulated apps
+    # are provided as a dictionary of name -> app, where the app is expected to provide:
+    #   build(parent)                   - add the app's view to the 'parent' element
+    #   on_launch()                     - app has been opened from the launcher
+    #   on_click(action)                - element with the 'fake-action' has been clicked
+    #   on_swipe(start, end, duration)
+    #   on_back()                       - return False if the app is to be closed (i.e. back from its home view)
+    #   on_text(action, text)           - (optional) text of the element with the 'fake-action' has been set
+    launcher = "com.google.android.apps.nexuslauncher:id"
+
+    def __init__(self, apps=None, folder_name="Auto App Folder", screen_size=(1080, 2400)):
+        self.apps = {} if (apps is None) else apps
+        self.folder_name = folder_name
+        self.screen_size = screen_size
+
+        self.view = "HOME"          # 'HOME', 'FOLDER', 'RECENTS', 'APP'
+        self.previous_view = "HOME"
+        self.active_app = None
+        self.running_apps = []      # In the order that they have been opened
+
+    # =================================================================================================================
+    # XML BUILDING
+    # =================================================================================================================
+    @staticmethod
+    def add_node(parent, cls, bounds, **attributes):
+        # 'bounds' - (x1, y1, x2, y2). Attribute names use '_' in place of '-' (i.e. resource_id -> 'resource-id')
+        node = etree.SubElement(parent, cls)
+        node.set('class', cls)
+        node.set('bounds', f"[{bounds[0]},{bounds[1]}][{bounds[2]},{bounds[3]}]")
+        node.set('displayed', 'true')
+        node.set('enabled', 'true')
+
+        for name, value in attributes.items():
+            node.set(name.replace('_', '-'), str(value))
+
+        return node
+
+    def page_source(self):
+        width, height = self.screen_size
+        hierarchy = etree.Element('hierarchy', rotation='0')
+
+        if (self.view == "APP"):
+            self.apps[self.active_app].build(hierarchy)
+
+        elif (self.view == "RECENTS"):
+            top = FakePhone.add_node(hierarchy, 'android.widget.FrameLayout', (0, 0, width, height), content_desc='')
+            if (len(self.running_apps) == 0):
+                FakePhone.add_node(top, 'android.widget.TextView', (300, 1100, 780, 1200),
+                                   content_desc='No recent items', text='No recent items')
+            for index, name in enumerate(self.running_apps):
+                FakePhone.add_node(top, 'android.view.View', (182, 209, 898, 1936), content_desc=name,
+                                   fake_action=f"recent:{name}", fake_id=f"recent:{name}:{index}")
+            FakePhone.add_node(top, 'android.widget.Button', (440, 2000, 640, 2100), content_desc='Home',
+                               fake_action='home')
+
+        else:
+            top = FakePhone.add_node(hierarchy, 'android.widget.FrameLayout', (0, 0, width, height))
+            drag_layer = FakePhone.add_node(top, 'android.view.ViewGroup', (0, 0, width, height),
+                                            resource_id=f"{FakePhone.launcher}/drag_layer")
+            workspace = FakePhone.add_node(drag_layer, 'android.widget.ScrollView', (0, 200, width, 1800),
+                                           resource_id=f"{FakePhone.launcher}/workspace")
+            if (self.view == "FOLDER"):
+                FakePhone.add_node(drag_layer, 'android.widget.EditText', (200, 600, 880, 700),
+                                   text=self.folder_name)
+                for index, name in enumerate(self.apps):
+                    FakePhone.add_node(drag_layer, 'android.widget.TextView',
+                                       (200 + 230 * (index % 3), 750 + 250 * (index // 3),
+                                        400 + 230 * (index % 3), 950 + 250 * (index // 3)),
+                                       text=name, content_desc=name, fake_action=f"launch:{name}")
+            else:
+                FakePhone.add_node(workspace, 'android.widget.TextView', (100, 1500, 300, 1700),
+                                   text=self.folder_name, content_desc=f"Folder: {self.folder_name}",
+                                   fake_action="open_folder")
+
+        FakePhone.add_node(hierarchy, 'android.view.View', (0, height - 100, width, height),
+                           resource_id='android:id/navigationBarBackground')
+
+        return etree.tostring(hierarchy, xml_declaration=True, encoding='UTF-8', standalone=True).decode('utf-8')
+
+    # =================================================================================================================
+    # EVENTS
+    # =================================================================================================================
+    @staticmethod
+    def action_of(node):
+        # The 'fake-action' of the element, or of the nearest parent which has one
+        while (node is not None):
+            if (node.get('fake-action') is not None):
+                return node.get('fake-action')
+            node = node.getparent()
+
+        return None
+
+    def __open_app(self, name):
+        if (name not in self.running_apps):
+            self.running_apps.append(name)
+            self.apps[name].on_launch()
+
+        self.active_app = name
+        self.view = "APP"
+
+    def on_click(self, node):
+        action = FakePhone.action_of(node)
+        if (action is None):
+            return
+
+        if (action == "open_folder"):
+            self.view = "FOLDER"
+        elif (action == "home"):
+            self.view = "HOME"
+        elif (action.startswith("launch:") or action.startswith("recent:")):
+            self.__open_app(action.split(':', 1)[1])
+        elif (self.view == "APP"):
+            self.apps[self.active_app].on_click(action)
+
+    def on_swipe(self, start, end, duration):
+        if (self.view == "APP"):
+            self.apps[self.active_app].on_swipe(start, end, duration)
+
+        elif (self.view == "RECENTS" and len(self.running_apps) != 0 and end[1] < start[1]):
+            # Swiping the app card up closes the app
+            closed = self.running_apps.pop()
+            if (closed == self.active_app):
+                self.active_app = None
+            if (len(self.running_apps) == 0):
+                self.view = "HOME"
+
+    def on_keycode(self, keycode):
+        if (keycode == AndroidKey.APP_SWITCH):
+            if (self.view == "RECENTS"):
+                self.view = "APP" if (self.active_app in self.running_apps) else "HOME"
+            else:
+                self.view = "RECENTS"
+
+        elif (keycode == AndroidKey.HOME):
+            self.view = "HOME"
+
+        elif (keycode == AndroidKey.BACK):
+            self.on_back()
+
+    def on_back(self):
+        if (self.view == "APP"):
+            if (self.apps[self.active_app].on_back() is False):
+                self.view = "HOME"
+        elif (self.view == "RECENTS"):
+            self.view = "APP" if (self.active_app in self.running_apps) else "HOME"
+        else:
+            self.view = "HOME"
+
+    def on_text(self, node, text):
+        if (self.view == "APP" and hasattr(self.apps[self.active_app], "on_text")):
+            self.apps[self.active_app].on_text(FakePhone.action_of(node), text)
+            return
+
+        raise WebDriverException("Element does not accept text input")
+
+    def on_script(self, script, args):
+        if (self.view == "APP" and hasattr(self.apps[self.active_app], "on_script")):
+            return self.apps[self.active_app].on_script(script, args)
+
+        raise WebDriverException(f"Script '{script}' is not supported in the current view")
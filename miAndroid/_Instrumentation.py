@@ -0,0 +1,226 @@
+# This script covers the (opt-in) instrumentation of the 'AndroidCtrl' driver. Every driver command, wait
+# ('phone_wait'/'app_wait' etc.) and pause is timed, and attributed to the method of the controller which made the call
+# (i.e. 'read_diary', 'open_diary_date', 'read_macros'), as well as the "phase" - the outermost method of the controller
+# on the call stack. Allowing for where the time is spent during a scrape to be determined.
+
+# External imports/from statements
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import inspect
+import json     # Import the json module
+import sys
+import time
+
+from selenium.webdriver.remote.webelement import WebElement
+
+
+# noinspection PyRedundantParentheses
+class DriverInstrumentation():
+    # Upper edges of the histogram buckets, in milliseconds
+    histogram_edges_ms = [1, 5, 10, 50, 100, 500, 1000, 5000, 15000, float('inf')]
+
+    def __init__(self, owner):
+        self.owner = owner          # Controller whose methods the calls are attributed to
+        self.records = {}           # (phase, method, kind, name) -> [duration in seconds, ...]
+        self.failures = {}          # (phase, method, kind, name) -> number of calls which raised an exception
+        self.start_time = time.perf_counter()
+
+        # Code objects of every method of the controller (including parent classes), to identify the callers
+        self.owner_code = {}
+        for cls in type(owner).__mro__:
+            for name, member in vars(cls).items():
+                function = member.__func__ if isinstance(member, (staticmethod, classmethod)) else member
+                if (inspect.isfunction(function)):
+                    self.owner_code[function.__code__] = function.__name__
+
+        self.excluded_code = set([code for (code, name) in self.owner_code.items() if (name == 'pause')])
+
+    def reset(self):
+        self.records = {}
+        self.failures = {}
+        self.start_time = time.perf_counter()
+
+    # =================================================================================================================
+    # RECORDING
+    # =================================================================================================================
+    def caller(self):
+        # Return (phase, method) of the current call
+        method = None
+        phase = None
+        fallback = None
+
+        frame = sys._getframe(2)
+        while (frame is not None):
+            code = frame.f_code
+            if (code in self.owner_code and code not in self.excluded_code):
+                if (method is None):
+                    method = self.owner_code[code]
+                phase = self.owner_code[code]
+
+            elif (fallback is None and code.co_filename != __file__ and code not in self.excluded_code):
+                fallback = code.co_name
+
+            frame = frame.f_back
+
+        if (method is None):
+            # Not called from within the controller (i.e. from the 'MyFitnessPal' class)
+            return fallback, fallback
+
+        return phase, method
+
+    def record(self, kind, name, duration, failed=False):
+        phase, method = self.caller()
+        key = (phase, method, kind, name)
+
+        self.records.setdefault(key, []).append(duration)
+        if (failed is True):
+            self.failures[key] = self.failures.get(key, 0) + 1
+
+    def timed(self, kind, name, function, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+
+        except Exception:
+            self.record(kind, name, time.perf_counter() - start, failed=True)
+            raise
+
+        self.record(kind, name, time.perf_counter() - start)
+        return result
+
+    # =================================================================================================================
+    # REPORTING
+    # =================================================================================================================
+    @staticmethod
+    def histogram(durations):
+        buckets = [0] * len(DriverInstrumentation.histogram_edges_ms)
+        for duration in durations:
+            for index, edge in enumerate(DriverInstrumentation.histogram_edges_ms):
+                if ((duration * 1000) <= edge):
+                    buckets[index] += 1
+                    break
+
+        return {f"<={edge}ms": count for (edge, count) in zip(DriverInstrumentation.histogram_edges_ms, buckets)}
+
+    @staticmethod
+    def statistics(durations):
+        ordered = sorted(durations)
+        return {
+            "count": len(ordered),
+            "total_s": sum(ordered),
+            "mean_ms": (sum(ordered) / len(ordered)) * 1000,
+            "p50_ms": ordered[len(ordered) // 2] * 1000,
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            "max_ms": ordered[-1] * 1000
+        }
+
+    def summary(self):
+        phases = {}
+        calls = []
+
+        for (phase, method, kind, name), durations in self.records.items():
+            phase_summary = phases.setdefault(str(phase), {})
+            phase_summary.setdefault(kind, []).extend(durations)
+
+            call = {"phase": phase, "method": method, "kind": kind, "name": name,
+                    "failures": self.failures.get((phase, method, kind, name), 0)}
+            call.update(DriverInstrumentation.statistics(durations))
+            call["histogram"] = DriverInstrumentation.histogram(durations)
+            calls.append(call)
+
+        calls.sort(key=lambda x: x["total_s"], reverse=True)
+
+        return {
+            "elapsed_s": time.perf_counter() - self.start_time,
+            "phases": {phase: {kind: DriverInstrumentation.statistics(durations)
+                               for (kind, durations) in kinds.items()}
+                       for (phase, kinds) in phases.items()},
+            "calls": calls
+        }
+
+    def print_summary(self, top=15):
+        summary = self.summary()
+        print(f"=====Instrumentation ({summary['elapsed_s']:.1f}s elapsed)=====")
+
+        phases = sorted(summary["phases"].items(), key=lambda x: -sum([y["total_s"] for y in x[1].values()]))
+        for phase, kinds in phases:
+            details = [f"{kind} {stats['count']}x {stats['total_s']:.2f}s" for (kind, stats) in kinds.items()]
+            print(f"{phase}: {', '.join(details)}")
+
+        print(f"-----Top {top} calls by total time-----")
+        for call in summary["calls"][:top]:
+            print(f"{call['method']}/{call['kind']}/{call['name']}: {call['count']}x, total {call['total_s']:.2f}s, "
+                  f"p50 {call['p50_ms']:.0f}ms, p95 {call['p95_ms']:.0f}ms, max {call['max_ms']:.0f}ms")
+        print(f"=====END=====")
+
+    def export_json(self, file):
+        temp = open(file, 'w')
+        json.dump(self.summary(), temp, indent = 4)
+        temp.close()
+
+
+# noinspection PyRedundantParentheses
+class InstrumentedProxy():
+    # Wraps the driver (or any WebElement/WebDriverWait returned from it), timing every call made through it. Returned
+    # WebElements are wrapped as well, as each of their functions/properties is also a request to the Appium server
+    def __init__(self, target, instrumentation, kind="driver"):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_instrumentation", instrumentation)
+        object.__setattr__(self, "_kind", kind)
+
+    @staticmethod
+    def unwrap(value):
+        if isinstance(value, InstrumentedProxy):
+            return object.__getattribute__(value, "_target")
+        if isinstance(value, list):
+            return [InstrumentedProxy.unwrap(x) for x in value]
+        if isinstance(value, tuple):
+            return tuple([InstrumentedProxy.unwrap(x) for x in value])
+
+        return value
+
+    @staticmethod
+    def is_element(value):
+        # Anything which behaves as a WebElement (i.e. the elements of '_FakeDriver.py'), the driver itself can find
+        # elements but not be clicked
+        return callable(getattr(value, "find_element", None)) and callable(getattr(value, "click", None))
+
+    def __wrap(self, value):
+        instrumentation = object.__getattribute__(self, "_instrumentation")
+        if isinstance(value, WebElement) or InstrumentedProxy.is_element(value):
+            return InstrumentedProxy(value, instrumentation)
+        if isinstance(value, list):
+            return [self.__wrap(x) for x in value]
+
+        return value
+
+    def __getattr__(self, name):
+        target = object.__getattribute__(self, "_target")
+        instrumentation = object.__getattribute__(self, "_instrumentation")
+        kind = object.__getattribute__(self, "_kind")
+
+        if (name.startswith('_')):
+            return getattr(target, name)
+
+        if isinstance(getattr(type(target), name, None), property):
+            # Properties (i.e. 'page_source', 'rect', 'text') are requests as well, so time the attribute access
+            return self.__wrap(instrumentation.timed(kind, name, getattr, target, name))
+
+        attribute = getattr(target, name)
+        if (callable(attribute) is False):
+            return attribute
+
+        def timed_call(*args, **kwargs):
+            args = InstrumentedProxy.unwrap(args)
+            kwargs = {key: InstrumentedProxy.unwrap(value) for (key, value) in kwargs.items()}
+            return self.__wrap(instrumentation.timed(kind, name, attribute, *args, **kwargs))
+
+        return timed_call
+
+    def __setattr__(self, name, value):
+        setattr(object.__getattribute__(self, "_target"), name, value)
+
+    def __eq__(self, other):
+        return object.__getattribute__(self, "_target") == InstrumentedProxy.unwrap(other)
+
+    def __hash__(self):
+        return hash(object.__getattribute__(self, "_target"))
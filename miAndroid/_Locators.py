@@ -0,0 +1,129 @@
+# This script covers the registry of locators, so that every element looked up via the driver is declared once (see
+# 'PhoneConfig.locators'/'AppConfig.locators') rather than as inline xpath strings.
+# Each locator has a list of candidate (strategy, value) pairs, in order of preference. The native strategies ('id',
+# '-android uiautomator', 'accessibility id') are resolved by UiAutomator2 directly, whereas 'xpath' requires the whole
+# hierarchy to be serialised and searched, so is only the fall back.
+# The first candidate is used unless 'benchmark' has found another to be faster (and to find the same elements as the
+# xpath), against the current version of the app. The benchmark choices can be saved/loaded, see 'save'/'load'.
+# Values may contain '{0}', '{1}'... which are filled in from the arguments given to 'get', i.e. a content-desc.
+
+# External imports/from statements
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import json
+import os
+import time
+
+# -- Import selenium error messages/exceptions
+from selenium.common.exceptions import WebDriverException
+
+
+# noinspection PyRedundantParentheses
+class LocatorRegistry():
+    def __init__(self, *declarations):
+        self.declarations = {}      # name -> [(strategy, value), ...]
+        for declaration in declarations:
+            self.declarations.update(declaration)
+
+        self.choice = {}            # name -> index of the candidate to use, where not the first (see 'benchmark')
+
+    def extended(self, declarations):
+        # New registry, with the declarations (i.e. of an app) added to those of this registry
+        registry = LocatorRegistry(self.declarations, declarations)
+        registry.choice = dict(self.choice)
+        return registry
+
+    def names(self):
+        return list(self.declarations)
+
+    def candidates(self, name, *args):
+        return [(strategy, value.format(*args)) for (strategy, value) in self.declarations[name]]
+
+    def get(self, name, *args):
+        # Locator (strategy, value) to be used for the element, i.e. 'driver.find_element(*registry.get("date_bar"))'
+        return self.candidates(name, *args)[self.choice.get(name, 0)]
+
+    @staticmethod
+    def is_template(name_candidates):
+        return any(('{0}' in value) for (strategy, value) in name_candidates)
+
+    # =================================================================================================================
+    # BENCHMARK
+    # =================================================================================================================
+    def benchmark(self, driver, names=None, repeats=3, args=None):
+        # Time every candidate of each locator against the current screen, and use the fastest which finds the same
+        # number of elements as the last candidate (the xpath, which is what the scripts originally used).
+        # 'args' - name -> arguments, for the locators which are templates (others are skipped).
+        # Locators not present on the current screen are left as they are. Returns
+        # {name: [{"strategy", "value", "seconds", "found"}, ...]}, where 'found' is 'None' if the strategy isn't
+        # supported
+        args = {} if (args is None) else args
+        results = {}
+
+        for name in (self.names() if (names is None) else names):
+            if (LocatorRegistry.is_template(self.declarations[name]) is True and name not in args):
+                continue
+
+            timings = []
+            for strategy, value in self.candidates(name, *args.get(name, ())):
+                found = None
+                start_time = time.perf_counter()
+                try:
+                    for repeat in range(repeats):
+                        found = len(driver.find_elements(strategy, value))
+                except WebDriverException:
+                    found = None
+
+                timings.append({"strategy": strategy, "value": value, "found": found,
+                                "seconds": (time.perf_counter() - start_time) / repeats})
+
+            results[name] = timings
+            reference = timings[-1]["found"]
+            if (reference is None or reference == 0):
+                continue    # Not on the current screen
+
+            matching = [index for (index, x) in enumerate(timings) if (x["found"] == reference)]
+            self.choice[name] = min(matching, key=lambda index: timings[index]["seconds"])
+
+        return results
+
+    @staticmethod
+    def print_benchmark(results):
+        print(f"=====Locators=====")
+        for name, timings in results.items():
+            print(f"{name}:")
+            for x in sorted(timings, key=lambda y: y["seconds"]):
+                found = "unsupported" if (x["found"] is None) else f"{x['found']} found"
+                print(f"    {x['seconds'] * 1000:8.1f}ms  {x['strategy']:<22} {found:<12} {x['value']}")
+        print(f"=====END=====")
+
+    # =================================================================================================================
+    # SAVE/LOAD
+    # =================================================================================================================
+    def save(self, fileLoc, version):
+        # Save the chosen candidates, for the version of the app that they were benchmarked against
+        chosen = {name: list(self.declarations[name][index]) for (name, index) in self.choice.items()}
+        temp = open(fileLoc, 'w')
+        json.dump({"version": version, "choice": chosen}, temp, indent = 4)
+        temp.close()
+
+    def load(self, fileLoc, version):
+        # Use the saved choices, if they were benchmarked against the same version of the app. A choice which is no
+        # longer declared is ignored
+        if (os.path.exists(fileLoc) is False):
+            return 0
+
+        try:
+            temp = open(fileLoc, 'r')
+            contents = json.load(temp)
+            temp.close()
+        except (OSError, ValueError):
+            return 0
+
+        if (contents.get("version") != version):
+            return 0
+
+        for name, chosen in contents.get("choice", {}).items():
+            if (name in self.declarations and tuple(chosen) in self.declarations[name]):
+                self.choice[name] = self.declarations[name].index(tuple(chosen))
+
+        return 1
@@ -0,0 +1,94 @@
+# This script covers the retrying of individual operations upon the Android emulation (i.e. clicking an element,
+# reading the macros of a food), so that a transient fault - a stale element or a slow emulator - costs a retry of that
+# operation, rather than failing the whole scrape.
+# Every retry is preceded by an exponential backoff (capped at 'PhoneConfig.retry_max_backoff'), and each operation
+# has a budget of retries for the session. Once the budget is spent the operation is no longer retried, so a UI which is
+# consistently broken fails quickly.
+
+# External imports/from statements
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# -- Import selenium error messages/exceptions
+from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import StaleElementReferenceException
+
+# Internal imports/from statements
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from miAndroid.PhoneParameters import PhoneConfig as dv
+
+
+# noinspection PyRedundantParentheses
+class RetryPolicy():
+    transient_exceptions = (StaleElementReferenceException, TimeoutException)
+
+    def __init__(self, owner, max_attempts=dv.retry_max_attempts, initial_backoff=dv.retry_initial_backoff,
+                 max_backoff=dv.retry_max_backoff, budget=dv.retry_budget):
+        self.owner = owner          # Controller, whose 'pause' is used for the backoff (so that it is instrumented)
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.budget = budget        # Number of retries allowed per operation
+
+        self.metrics = {}           # operation -> {"calls", "retries", "recovered", "failed", "budget_exhausted"}
+
+    def backoff(self, attempt):
+        # Delay (seconds) before the retry following the 'attempt' (1 = first attempt)
+        return min(self.max_backoff, self.initial_backoff * (2 ** (attempt - 1)))
+
+    def remaining_budget(self, operation):
+        return self.budget - self.metrics.get(operation, {}).get("retries", 0)
+
+    def run(self, operation, function, *args, retry_if=None, recover=None, **kwargs):
+        # Call the function, retrying it whilst it raises one of the 'transient_exceptions' or its result meets
+        # 'retry_if' (i.e. 'lambda x: x == 0', for functions which return 0 upon failure).
+        # 'recover' - optional function called before each retry, to return the UI to where the operation expects it
+        # to start from.
+        # The function is called again in full upon a retry, so any element is found again (rather than re-using a
+        # stale element). Once the attempts/budget are used up, the exception is raised/last result returned as is
+        metrics = self.metrics.setdefault(operation, {"calls": 0, "retries": 0, "recovered": 0, "failed": 0,
+                                                      "budget_exhausted": 0})
+        metrics["calls"] += 1
+
+        attempt = 1
+        while (True):
+            error = None
+            try:
+                result = function(*args, **kwargs)
+                failed = (retry_if is not None and retry_if(result) is True)
+
+            except RetryPolicy.transient_exceptions as e:
+                error = e
+                failed = True
+
+            if (failed is False):
+                if (attempt > 1):
+                    metrics["recovered"] += 1
+                return result
+
+            if (attempt >= self.max_attempts or self.remaining_budget(operation) <= 0):
+                if (self.remaining_budget(operation) <= 0):
+                    metrics["budget_exhausted"] += 1
+                metrics["failed"] += 1
+
+                if (error is not None):
+                    raise error
+                return result
+
+            print(f"'{operation}' failed (attempt {attempt} of {self.max_attempts})" +
+                  ("" if (error is None) else f" - {type(error).__name__}") + ", retrying...")
+            metrics["retries"] += 1
+            self.owner.pause(self.backoff(attempt))
+
+            if (recover is not None):
+                recover()
+            attempt += 1
+
+    def print_summary(self):
+        retried = {operation: x for (operation, x) in self.metrics.items() if (x["retries"] != 0 or x["failed"] != 0)}
+        if (len(retried) == 0):
+            return
+
+        print(f"=====Retries=====")
+        for operation, x in sorted(retried.items(), key=lambda y: -y[1]["retries"]):
+            print(f"{operation}: {x['calls']} call(s), {x['retries']} retries, {x['recovered']} recovered, "
+                  f"{x['failed']} failed" + ("" if (x["budget_exhausted"] == 0) else ", budget exhausted"))
+        print(f"=====END=====")
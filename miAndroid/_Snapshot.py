@@ -0,0 +1,109 @@
+# This script covers the capture and interpretation of a single UI hierarchy "snapshot" of the Android emulation.
+# Reading the 'page_source' once, and then searching the resulting xml locally, removes the need for a round trip to
+# the Appium server for every element/attribute of interest.
+
+# External imports/from statements
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+from lxml import etree
+import re
+
+
+# noinspection PyRedundantParentheses
+class ScreenSnapshot():
+    # Format of the 'bounds' attribute within the UiAutomator2 xml - '[x1,y1][x2,y2]'
+    bounds_format = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+
+    def __init__(self, page_source):
+        if (isinstance(page_source, str)):
+            # lxml will not accept a 'str' which contains an encoding declaration, which the 'page_source' does
+            page_source = page_source.encode('utf-8')
+
+        self.page_source = page_source
+        self.root = etree.fromstring(page_source, parser=etree.XMLParser(huge_tree=True, recover=True))
+
+    def rotation(self):
+        # Orientation of the screen ('rotation' attribute of the hierarchy, '0' being portrait), 'None' if not given
+        return self.root.get('rotation')
+
+    def find_all(self, resource_id, node=None):
+        # Return all elements (within 'node' if provided, otherwise the whole screen) which have the resource-id
+        if (node is None):
+            node = self.root
+
+        return node.xpath(".//*[@resource-id=$rid]", rid=resource_id)
+
+    def find(self, resource_id, node=None):
+        # Return the first element which has the resource-id, or 'None' if there is no such element
+        matches = self.find_all(resource_id, node)
+        if (len(matches) == 0):
+            return None
+
+        return matches[0]
+
+    def index_by_resource_id(self, resource_ids):
+        # Single pass over the screen, returning a dictionary of resource-id -> first element with that resource-id, for
+        # every one of the requested resource-ids which is present
+        wanted = set(resource_ids)
+        index = {}
+
+        for node in self.root.iter():
+            resource_id = node.get('resource-id')
+            if (resource_id in wanted and resource_id not in index):
+                index[resource_id] = node
+
+        return index
+
+    def children(self, resource_id):
+        # Return the immediate children of the first element with the resource-id (empty if not present)
+        parent = self.find(resource_id)
+        if (parent is None):
+            return []
+
+        return list(parent)
+
+    def find_text(self, resource_id, node=None):
+        # Return the 'text' of the first element which has the resource-id, or 'None' if there is no such element
+        match = self.find(resource_id, node)
+        if (match is None):
+            return None
+
+        return ScreenSnapshot.text(match)
+
+    @staticmethod
+    def text(node):
+        return node.get('text', '')
+
+    @staticmethod
+    def first_text(node):
+        # Return the 'text' of the element, or if it has none, of the first element below it which does. Snapshot
+        # equivalent of 'find_element("class name", "android.widget.TextView").text' upon a WebElement
+        for element in node.iter():
+            if (element.get('text', '') != ''):
+                return element.get('text')
+
+        return ''
+
+    @staticmethod
+    def resource_ids(node):
+        # Return the resource-ids of every element below the provided node (equivalent to the ".//child::*" search used
+        # upon WebElements)
+        return [e.get('resource-id', '') for e in node.iterdescendants()]
+
+    @staticmethod
+    def rect(node):
+        # Convert the 'bounds' attribute into the same dictionary format as 'WebElement.rect'
+        match = ScreenSnapshot.bounds_format.match(node.get('bounds', ''))
+        if (match is None):
+            return {'x': 0, 'y': 0, 'width': 0, 'height': 0}
+
+        x1, y1, x2, y2 = [int(x) for x in match.groups()]
+        return {'x': x1, 'y': y1, 'width': x2 - x1, 'height': y2 - y1}
+
+    @staticmethod
+    def subtree_hash(node):
+        # Hash of the element and everything below it, to detect whether part of the screen has changed
+        return hash(etree.tostring(node))
+
+    @staticmethod
+    def centre(rect):
+        return (int(rect['x'] + (rect['width'] / 2)), int(rect['y'] + (rect['height'] / 2)))
@@ -0,0 +1,21 @@
+import sys
+import types
+
+import pytest
+
+# 'MyFitnessPal/FileLocations.py' is local to each machine (it holds the folder of the datastore), so the tests provide
+# their own, pointing at a temporary folder
+if ("MyFitnessPal.FileLocations" not in sys.modules):
+    try:
+        import MyFitnessPal.FileLocations
+    except ImportError:
+        file_locations = types.ModuleType("MyFitnessPal.FileLocations")
+        file_locations.LocalFileLocations = type("LocalFileLocations", (), {"rootFolder": ""})
+        sys.modules["MyFitnessPal.FileLocations"] = file_locations
+
+
+@pytest.fixture
+def folder_root(tmp_path, monkeypatch):
+    from MyFitnessPal.FileLocations import LocalFileLocations
+    monkeypatch.setattr(LocalFileLocations, "rootFolder", str(tmp_path))
+    return str(tmp_path)
@@ -0,0 +1,46 @@
+from datetime import date
+
+from MyFitnessPal.MyFitnessPal import MyFitnessPal
+from MyFitnessPal._Backfill import check_stored_date, find_incomplete_dates
+
+
+def record_with_water_and_exercise(scrape_date="2025-03-08"):
+    # Record as saved by 'scrap_active_diary', the macros are not read for the "Water"/"Exercise" rows
+    return {
+        "expected_date": scrape_date,
+        "DailySummary": {"date": scrape_date, "contents": {"goal": "2000", "calories": "1,215"}},
+        "Diary": {"date": scrape_date, "contents": [
+            {"meal": "Breakfast", "time": "7:00 AM", "name": "Brown Rice, Tilda, 1 cup", "calories": "215"},
+            {"meal": "Dinner", "time": "6:00 PM", "name": "Steak, Generic, 1 steak", "calories": "1,000"},
+            {"meal": "Water", "time": "", "name": "Water", "calories": "0"},
+            {"meal": "Exercise", "time": "", "name": "Running", "calories": "300"}]},
+        "Macro": {"date": scrape_date, "contents": [
+            {"meal": "Breakfast", "name": "Brown Rice", "calories": "215"},
+            {"meal": "Dinner", "name": "Steak", "calories": "1,000"}]}
+    }
+
+
+def test_water_and_exercise_rows_are_consistent_when_saved_and_stored():
+    record = record_with_water_and_exercise()
+
+    assert MyFitnessPal.scrap_consistancy_check(record) == 1
+    assert check_stored_date(record["DailySummary"], record["Diary"], record["Macro"]) == ""
+
+
+def test_backfill_skips_a_stored_date_with_water_and_exercise_rows():
+    record = record_with_water_and_exercise()
+
+    class Datastore:
+        def read_entry(self, section, entry_date):
+            return record[section] if (entry_date == "2025-03-08") else None
+
+    incomplete = find_incomplete_dates(Datastore(), date(2025, 3, 7), date(2025, 3, 8))
+    assert list(incomplete) == [date(2025, 3, 7)]
+
+
+def test_inconsistent_date_is_rejected_by_both():
+    record = record_with_water_and_exercise()
+    record["Macro"]["contents"].pop()
+
+    assert MyFitnessPal.scrap_consistancy_check(record) == 0
+    assert check_stored_date(record["DailySummary"], record["Diary"], record["Macro"]) != ""
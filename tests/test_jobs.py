@@ -0,0 +1,76 @@
+import json
+import os
+import time
+from datetime import date
+
+from MyFitnessPal.AppParameters import AppConfig
+from MyFitnessPal.MyFitnessPal import MyFitnessPal
+from MyFitnessPal._FakeApp import create_fake_driver
+from MyFitnessPal._Jobs import ScrapeJob
+
+
+def crash_upon_food(driver, crash_at):
+    # The fake app raises once the food has been opened for the 'crash_at' time (whilst its view is open), returns the
+    # list of foods opened
+    app = driver.screen_source.apps["MyFitnessPal"]
+    on_click = app.on_click
+    opened = []
+
+    def crashing_on_click(action):
+        if (action.startswith("open_food")):
+            opened.append(action)
+            if (len(opened) == crash_at):
+                on_click(action)
+                raise RuntimeError("Injected crash")
+
+        return on_click(action)
+
+    app.on_click = crashing_on_click
+    return opened
+
+
+def test_job_is_resumed_from_its_checkpoint(folder_root, monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(AppConfig, "macro_cache_size", 0)  # So only the checkpoint can save opening a food again
+
+    driver = create_fake_driver()
+    mfp = MyFitnessPal(internal_appium_service=False, driver=driver)
+    assert mfp.goto_diary_page() == 1
+
+    # The fake diaries of 2025-03-06/07/08 have 4/7/8 foods, so the crash is upon the third food of 2025-03-08
+    opened = crash_upon_food(driver, 4 + 7 + 3)
+    assert mfp.scrap_diary_from_date(date(2025, 3, 8), 3, -1) == 0
+
+    job = ScrapeJob.latest_unfinished(folder_root)
+    assert job.contents["completed"] == ["2025-03-06", "2025-03-07"]
+    partial = job.partial_of(date(2025, 3, 8))
+    assert len(partial["macros"]) == 2
+
+    # Resumed within the same session, left upon the food that crashed
+    opened.clear()
+    assert mfp.resume_job() == 1
+    assert len(opened) == 8 - 2
+    mfp.app.am_active = 0
+
+    temp = open(os.path.join(folder_root, ".mem"), 'r')
+    contents = json.load(temp)
+    temp.close()
+
+    stored = [x for x in contents["Macro"] if (x["date"] == "2025-03-08")]
+    assert len(stored) == 1 and len(stored[0]["contents"]) == 8
+    # Re-used macros take the time of their diary row, rather than that of the food view
+    without_time = lambda macros: [{x: y for (x, y) in z.items() if (x != "time")} for z in macros]
+    assert without_time(stored[0]["contents"][:2]) == without_time(partial["macros"])
+    assert ScrapeJob.latest_unfinished(folder_root) is None
+
+
+def test_only_the_latest_finished_journals_are_retained(folder_root):
+    for number in range(4):
+        job = ScrapeJob.create(folder_root, "scrap", [date(2025, 3, 1 + number)])
+        job.complete(date(2025, 3, 1 + number))
+    unfinished = ScrapeJob.create(folder_root, "scrap", [date(2025, 3, 8)])
+
+    assert ScrapeJob.prune_finished(folder_root, retained=2) == 2
+    jobs = ScrapeJob.list_jobs(folder_root)
+    assert [x.contents["spec"]["dates"] for x in jobs] == [["2025-03-03"], ["2025-03-04"], ["2025-03-08"]]
+    assert jobs[-1].job_id == unfinished.job_id
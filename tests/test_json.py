@@ -0,0 +1,127 @@
+import gc
+import json
+import os
+import weakref
+
+import pytest
+
+from MyFitnessPal._JSON import JSONCtrl
+
+
+def entry_of(day):
+    return {"date": f"2025-03-{day:02d}", "contents": {"goal": "2000", "calories": str(1000 + day)}}
+
+
+def append_date(datastore, day):
+    datastore.append_DailySummary(entry_of(day))
+    datastore.append_Diary(entry_of(day))
+    datastore.append_Macro(entry_of(day))
+    return datastore.write_datastore()
+
+
+def dates_on_disk(fileLoc):
+    temp = open(fileLoc, 'r')
+    contents = json.load(temp)
+    temp.close()
+    return [x["date"] for x in contents["Diary"]]
+
+
+def test_dates_are_written_once_the_flush_policy_is_met(tmp_path):
+    fileLoc = str(tmp_path / ".mem")
+    datastore = JSONCtrl(fileLoc, flush_days=3, flush_seconds=3600)
+
+    assert [append_date(datastore, day) for day in range(1, 5)] == [0, 0, 1, 0]
+    assert dates_on_disk(fileLoc) == ["2025-03-01", "2025-03-02", "2025-03-03"]
+
+    datastore.close_datastore()
+    assert dates_on_disk(fileLoc) == ["2025-03-01", "2025-03-02", "2025-03-03", "2025-03-04"]
+
+
+def test_dates_are_written_once_the_flush_seconds_have_passed(tmp_path):
+    fileLoc = str(tmp_path / ".mem")
+    datastore = JSONCtrl(fileLoc, flush_days=100, flush_seconds=0)
+
+    assert append_date(datastore, 1) == 1
+    assert dates_on_disk(fileLoc) == ["2025-03-01"]
+    datastore.close_datastore()
+
+
+def test_closed_datastore_is_released(tmp_path):
+    datastore = JSONCtrl(str(tmp_path / ".mem"))
+    append_date(datastore, 1)
+    datastore.close_datastore()
+
+    reference = weakref.ref(datastore)
+    del datastore
+    gc.collect()
+    assert reference() is None
+
+
+def test_interrupted_write_leaves_the_previous_file(tmp_path, monkeypatch):
+    fileLoc = str(tmp_path / ".mem")
+    datastore = JSONCtrl(fileLoc, flush_days=1)
+    append_date(datastore, 1)
+
+    def interrupted_replace(source, destination):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(os, "replace", interrupted_replace)
+        with pytest.raises(KeyboardInterrupt):
+            append_date(datastore, 2)
+
+    assert dates_on_disk(fileLoc) == ["2025-03-01"]
+    assert JSONCtrl(fileLoc).read_dates("Diary") == ["2025-03-01"]
+
+    # The entries already written are still read from the (previous) file, and the date waiting is written upon close
+    assert datastore.read_entry("Diary", "2025-03-01") == entry_of(1)
+    datastore.close_datastore()
+    assert dates_on_disk(fileLoc) == ["2025-03-01", "2025-03-02"]
+
+
+def test_entries_are_read_lazily_through_the_index(tmp_path):
+    fileLoc = str(tmp_path / ".mem")
+    datastore = JSONCtrl(fileLoc, flush_days=100)
+    for day in range(1, 11):
+        append_date(datastore, day)
+    datastore.close_datastore()
+
+    reopened = JSONCtrl(fileLoc)
+    assert all([x[3] is None for x in reopened.entries["Diary"]])     # Only the index has been read
+    assert reopened.read_dates("Macro") == [entry_of(day)["date"] for day in range(1, 11)]
+    assert reopened.read_entry("Diary", "2025-03-07") == entry_of(7)
+    assert reopened.read_entry("Diary", "2025-03-11") is None
+
+    # Untouched entries are copied across when the file is next written
+    append_date(reopened, 11)
+    reopened.close_datastore()
+    assert JSONCtrl(fileLoc).read_entry("DailySummary", "2025-03-04") == entry_of(4)
+
+
+def test_file_edited_by_hand_is_read_in_full_and_indexed_again(tmp_path):
+    fileLoc = str(tmp_path / ".mem")
+    datastore = JSONCtrl(fileLoc, flush_days=100)
+    for day in range(1, 4):
+        append_date(datastore, day)
+    datastore.close_datastore()
+
+    temp = open(fileLoc, 'r')
+    contents = json.load(temp)
+    temp.close()
+    contents["Diary"].append(entry_of(4))
+    contents["Diary"][0]["contents"]["calories"] = "1,500"
+    temp = open(fileLoc, 'w')
+    json.dump(contents, temp, indent = 2)              # Offsets of the index no longer match
+    temp.close()
+
+    reopened = JSONCtrl(fileLoc)
+    assert reopened.read_dates("Diary") == ["2025-03-01", "2025-03-02", "2025-03-03", "2025-03-04"]
+    assert reopened.read_entry("Diary", "2025-03-01")["contents"]["calories"] == "1,500"
+    reopened.close_datastore()
+
+    # Re-written along with its index, so the next read only uses the index
+    temp = open(f"{fileLoc}.idx", 'r')
+    index = json.load(temp)
+    temp.close()
+    assert index["size"] == os.stat(fileLoc).st_size
+    assert JSONCtrl(fileLoc).read_entry("Diary", "2025-03-04") == entry_of(4)
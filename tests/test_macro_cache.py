@@ -0,0 +1,35 @@
+from MyFitnessPal._MacroCache import MacroCache
+
+
+def entry(description, details):
+    return {"description": description, "details": details}
+
+
+def banana_macros():
+    return {"meal": "Breakfast", "name": "Banana", "units": "1 medium", "servings": "1.0", "calories": "105",
+            "carbohydrates": "27g", "protein": "1.3g"}
+
+
+def test_servings_are_derived_for_the_same_product(tmp_path):
+    cache = MacroCache(str(tmp_path / ".macro_cache"), derive_servings=True)
+    cache.store(entry("Banana", "Generic, 1 medium"), banana_macros())
+
+    derived = cache.lookup(entry("Banana", "Generic, 2 medium"))
+    assert derived["calories"] == "210" and derived["carbohydrates"] == "54g"
+
+
+def test_servings_are_not_derived_from_another_brand(tmp_path):
+    cache = MacroCache(str(tmp_path / ".macro_cache"), derive_servings=True)
+    cache.store(entry("Banana", "Generic, 1 medium"), banana_macros())
+
+    assert cache.lookup(entry("Banana", "Tesco Organic, 2 medium")) is None
+    assert cache.lookup(entry("Banana", "Generic, 2 large")) is None
+
+
+def test_cache_is_written_and_read_back(tmp_path):
+    cache = MacroCache(str(tmp_path / ".macro_cache"))
+    cache.store(entry("Banana", "Generic, 1 medium"), banana_macros())
+    cache.write_cache()
+
+    assert MacroCache(str(tmp_path / ".macro_cache")).lookup(entry("Banana", "Generic, 1 medium")) == banana_macros()
+    assert (tmp_path / ".macro_cache.tmp").exists() is False
@@ -0,0 +1,43 @@
+import json
+import os
+
+import pytest
+
+from MyFitnessPal.MyFitnessPal import MyFitnessPal
+from MyFitnessPal._SQLite import SQLiteCtrl
+from MyFitnessPal._Segmented import SegmentedJSONCtrl
+
+
+def write_json_datastore(folder, dates):
+    # '.mem' as written by the 'JSONCtrl' datastore, one entry per section for each date
+    contents = {"app_sw_version": "test"}
+    for section in ("DailySummary", "Diary", "Macro"):
+        contents[section] = [{"date": x, "contents": []} for x in dates]
+
+    temp = open(os.path.join(folder, ".mem"), 'w')
+    json.dump(contents, temp)
+    temp.close()
+
+
+def interrupt_import(self, json_file):
+    raise KeyboardInterrupt
+
+
+@pytest.mark.parametrize("backend, datastore_class", [("sqlite", SQLiteCtrl), ("segmented", SegmentedJSONCtrl)])
+def test_interrupted_migration_is_carried_out_again(tmp_path, monkeypatch, backend, datastore_class):
+    dates = ["2025-02-27", "2025-03-01", "2025-03-02"]
+    write_json_datastore(str(tmp_path), dates)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(datastore_class, "import_json", interrupt_import)
+        with pytest.raises(KeyboardInterrupt):
+            MyFitnessPal.open_datastore(str(tmp_path), backend)
+
+    datastore = MyFitnessPal.open_datastore(str(tmp_path), backend)
+    for section in ("DailySummary", "Diary", "Macro"):
+        assert datastore.read_dates(section) == dates
+    datastore.close_datastore()
+
+    # Once migrated, the '.mem' is no longer read
+    write_json_datastore(str(tmp_path), ["2025-03-03"])
+    assert MyFitnessPal.open_datastore(str(tmp_path), backend).read_dates("Diary") == dates
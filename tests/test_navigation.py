@@ -0,0 +1,48 @@
+import time
+
+from MyFitnessPal.AppParameters import AppConfig
+from MyFitnessPal._FakeApp import create_fake_driver
+from MyFitnessPal._MyFitnessPalApp_Controller import MyFitnessPalAppControl
+from MyFitnessPal._Navigation import NavigationPlanner
+
+
+def test_text_input_is_disabled_after_consecutive_failures():
+    planner = NavigationPlanner()
+    for _ in range(AppConfig.calendar_text_input_max_failures - 1):
+        planner.record_text_input(False)
+        assert planner.text_input_available is True
+
+    planner.record_text_input(True)
+    for _ in range(AppConfig.calendar_text_input_max_failures - 1):
+        planner.record_text_input(False)
+    assert planner.text_input_available is True
+
+    planner.record_text_input(False)
+    assert planner.text_input_available is False
+
+
+def test_text_input_is_disabled_once_it_is_missing():
+    planner = NavigationPlanner()
+    planner.record_text_input(False, missing=True)
+    assert planner.text_input_available is False
+
+
+def test_diary_is_returned_to_when_already_upon_the_date(monkeypatch):
+    # i.e. a scrap which failed whilst a food was open, the planner still holds the date of the diary
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    app = MyFitnessPalAppControl(driver=create_fake_driver())
+    app.open()
+    app.open_diary_tab()
+    shown = app.current_diary_date()
+
+    foods = [rect for (entry, rect) in
+             MyFitnessPalAppControl.find_visible_diary_entries_in_snapshot(app.get_screen_snapshot())
+             if (entry["type"] == "Food")]
+    app.tap_rect(foods[0])
+    app.wait_for_settle(resource_id=MyFitnessPalAppControl.macro_food_template['name'])
+    assert app.classify_view()["view"] == "FOOD_DETAIL"
+
+    assert app.goto_diary_date(shown) == 1
+    assert app.classify_view()["view"] == "DIARY"
+    assert app.current_diary_date() == shown
+    app.am_active = 0
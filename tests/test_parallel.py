@@ -0,0 +1,50 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from MyFitnessPal.MyFitnessPal import MyFitnessPal
+from MyFitnessPal._FakeApp import create_fake_driver
+from MyFitnessPal._Parallel import shard_dates
+
+
+def test_every_sharded_date_is_stored_once(folder_root, monkeypatch):
+    # The worker processes are forked, so inherit the patched 'time.sleep' (and the folder root)
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    start_date = datetime(2025, 3, 8)
+
+    result = MyFitnessPal.scrap_diary_parallel(start_date, 7, -1, devices=[{}] * 3,
+                                               driver_factory=create_fake_driver)
+    assert result == 1
+
+    # Seven dates back from the start date, split between the three devices
+    expected = [(start_date - timedelta(days=x)).strftime("%Y-%m-%d") for x in range(7)]
+    assert len(shard_dates(start_date, 7, -1, 3)) == 3
+
+    temp = open(os.path.join(folder_root, ".mem"), 'r')
+    contents = json.load(temp)
+    temp.close()
+
+    for section in ("DailySummary", "Diary", "Macro"):
+        assert sorted([x["date"] for x in contents[section]]) == sorted(expected)
+
+
+def test_a_shard_missing_a_date_fails_the_scrape(folder_root, monkeypatch):
+    # The date is rejected by the consistency check within its worker, so the shard returns without it
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    check = MyFitnessPal.scrap_consistancy_check
+    monkeypatch.setattr(MyFitnessPal, "scrap_consistancy_check",
+                        staticmethod(lambda record: 0 if (record["DailySummary"]["date"] == "2025-03-05")
+                                     else check(record)))
+
+    result = MyFitnessPal.scrap_diary_parallel(datetime(2025, 3, 8), 7, -1, devices=[{}] * 3,
+                                               driver_factory=create_fake_driver)
+    assert result == 0
+
+    temp = open(os.path.join(folder_root, ".mem"), 'r')
+    contents = json.load(temp)
+    temp.close()
+
+    # The dates of the other shards (and the rest of the failing shard) are still stored
+    assert "2025-03-05" not in [x["date"] for x in contents["Diary"]]
+    assert len(contents["Diary"]) == 6
@@ -0,0 +1,43 @@
+import time
+
+from miAndroid.PhoneParameters import PhoneConfig
+from miAndroid.SessionDaemon import SessionDaemon
+
+
+class FakeSession:
+    session_id = "fake-session"
+    caps = {}
+
+
+def daemon_with_session(monkeypatch):
+    daemon = SessionDaemon(internal_appium_service=False)
+    monkeypatch.setattr(daemon, "ensure_session", lambda: None)
+    daemon.driver = FakeSession()
+    return daemon
+
+
+def test_renewed_lease_is_kept_beyond_its_expiry(monkeypatch):
+    daemon = daemon_with_session(monkeypatch)
+    renewed = daemon.handle({"command": "session"})["lease"]
+    abandoned = daemon.handle({"command": "session"})["lease"]
+
+    # Both were handed out longer ago than the expiry, but one has been renewed since
+    for lease in (renewed, abandoned):
+        daemon.leases[lease] -= PhoneConfig.session_daemon_lease_expiry + 1
+    assert daemon.handle({"command": "renew", "lease": renewed})["ok"] is True
+
+    daemon.expire_leases()
+    assert list(daemon.leases) == [renewed]
+
+    daemon.handle({"command": "release", "lease": renewed})
+    assert daemon.describe()["leases"] == 0
+
+
+def test_lease_dropped_whilst_the_client_was_unresponsive_is_held_once_more(monkeypatch):
+    daemon = daemon_with_session(monkeypatch)
+    lease = daemon.handle({"command": "session"})["lease"]
+    daemon.leases[lease] -= PhoneConfig.session_daemon_lease_expiry + 1
+    daemon.expire_leases()
+
+    daemon.handle({"command": "renew", "lease": lease})
+    assert time.time() - daemon.leases[lease] < 1